@@ -0,0 +1,186 @@
+"""Aggregations behind the dashboard tables and charts.
+
+The dashboard only ever shows SALES_QTY / OPENING_STOCK sums per dimension
+value or per month, for a Year/Month selection. build_sales_cube() computes
+those sums once per upload, as one aggregate row per (YEAR, MONTH, dimension
+values) combination plus per-dimension rollups held as small
+(period x dimension value) matrices, so answering a sidebar selection is a
+couple of NumPy reductions over the selected periods instead of a groupby
+over every raw row.
+"""
+import numpy as np
+import pandas as pd
+
+# Dimensions the cube is built over, in the order the full combination is grouped
+CUBE_DIMENSIONS = ['Maketplace', 'Season', 'Subcategory', 'Color', 'Brand', 'Heel_Type_1']
+MEASURES = ['SALES_QTY', 'OPENING_STOCK']
+
+
+def sales_percentage(sales_qty, opening_stock):
+    """Sales Qty / Opening Stock * 100, or 0 where there is no opening stock"""
+    sales_qty = np.asarray(sales_qty, dtype=np.float64)
+    opening_stock = np.asarray(opening_stock, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(opening_stock > 0, sales_qty / opening_stock * 100, 0)
+
+
+def _dimension_codes(values):
+    """Integer codes and their labels for a dimension column (-1 marks a missing value)"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories
+    codes, labels = pd.factorize(values, sort=True)
+    return codes, labels
+
+
+def _sum_by(index, weights, size):
+    return np.bincount(index, weights=weights, minlength=size)
+
+
+def _stock_table(group_name, labels, categorical, present, sums, dtypes):
+    """Sales / opening stock / sales % frame for the label positions in present, largest sellers first.
+
+    sums holds float64 measure totals aligned with present; they are handed
+    back in the source frame's dtypes.
+    """
+    order = np.argsort(-sums['SALES_QTY'], kind='stable')
+    present = present[order]
+    sums = {col: values[order] for col, values in sums.items()}
+
+    if categorical:
+        labels = pd.Categorical.from_codes(present, categories=labels)
+    else:
+        labels = labels.take(present)
+
+    table = {group_name: labels}
+    table.update({col: sums[col].astype(dtypes[col], copy=False) for col in MEASURES})
+    table['SALES_PERCENTAGE'] = sales_percentage(sums['SALES_QTY'], sums['OPENING_STOCK'])
+    return pd.DataFrame(table)
+
+
+def build_sales_cube(df):
+    """Aggregate a processed sales frame into the dashboard cube.
+
+    Returns a dict with:
+        combinations: one row per (YEAR, MONTH, dimension values) with the
+            summed measures and the number of source rows (ROWS)
+        periods: the distinct (YEAR, MONTH, MONTH_NAME) periods in order,
+            with their totals; period_year / period_month as arrays
+        rollups: per dimension, its labels and (period x label) matrices of
+            the summed measures and row counts
+    plus each combination's period (period_codes) and dimension value codes
+    (dimension_codes), from which filter_cube() rebuilds periods and rollups.
+    """
+    dimensions = [col for col in CUBE_DIMENSIONS if col in df.columns]
+    keys = ['YEAR', 'MONTH'] + dimensions
+    if 'MONTH_NAME' in df.columns:
+        # Determined by MONTH, so it adds no groups; carried along for display
+        keys.append('MONTH_NAME')
+
+    combinations = df.groupby(keys, observed=True, dropna=False, sort=True).agg(
+        SALES_QTY=('SALES_QTY', 'sum'),
+        OPENING_STOCK=('OPENING_STOCK', 'sum'),
+        ROWS=('SALES_QTY', 'size'),
+    ).reset_index()
+
+    # Periods in (YEAR, MONTH) order; every combination row points at one of them
+    period_codes, period_index = pd.MultiIndex.from_arrays(
+        [combinations['YEAR'], combinations['MONTH']]).factorize(sort=True)
+    _, first_rows = np.unique(period_codes, return_index=True)
+
+    periods = period_index.to_frame(index=False, name=['YEAR', 'MONTH'])
+    if 'MONTH_NAME' in combinations.columns:
+        periods['MONTH_NAME'] = combinations['MONTH_NAME'].take(first_rows).reset_index(drop=True)
+
+    cube = {
+        'combinations': combinations,
+        'period_codes': period_codes,
+        'dimension_codes': {dimension: _dimension_codes(combinations[dimension]) for dimension in dimensions},
+        'categorical': {dimension: isinstance(combinations[dimension].dtype, pd.CategoricalDtype)
+                        for dimension in dimensions},
+        'period_year': periods['YEAR'].to_numpy(),
+        'period_month': periods['MONTH'].to_numpy(),
+        'dtypes': {col: df[col].dtype for col in MEASURES},
+    }
+    _add_rollups(cube, periods, np.arange(len(combinations)))
+    return cube
+
+
+def _add_rollups(cube, periods, rows):
+    """Period totals and per-dimension rollups of the combination rows at positions rows"""
+    combinations = cube['combinations']
+    period_codes = cube['period_codes'][rows]
+    n_periods = len(periods)
+    periods = periods[[col for col in ('YEAR', 'MONTH', 'MONTH_NAME') if col in periods.columns]].copy()
+
+    measures = {col: combinations[col].to_numpy(dtype=np.float64)[rows] for col in MEASURES}
+    measures['ROWS'] = combinations['ROWS'].to_numpy(dtype=np.float64)[rows]
+    for col, values in measures.items():
+        periods[col] = _sum_by(period_codes, values, n_periods)
+
+    rollups = {}
+    for dimension, (codes, labels) in cube['dimension_codes'].items():
+        codes = codes[rows]
+        # Missing dimension values are left out, as a groupby on the column would
+        valid = codes >= 0
+        cells = period_codes[valid] * len(labels) + codes[valid]
+        rollup = {'labels': labels, 'categorical': cube['categorical'][dimension]}
+        for col, values in measures.items():
+            rollup[col] = _sum_by(cells, values[valid], n_periods * len(labels)).reshape(n_periods, len(labels))
+        rollups[dimension] = rollup
+
+    cube['periods'] = periods
+    cube['rollups'] = rollups
+
+
+def filter_cube(cube, rows):
+    """The cube restricted to the combination rows at positions rows (e.g. from a dimension filter).
+
+    Periods keep their positions, so select_periods() masks apply to both
+    cubes alike; dimension_table(), monthly_table() and selected_rows() read
+    only the kept rows.
+    """
+    filtered = {key: value for key, value in cube.items() if key not in ('periods', 'rollups')}
+    _add_rollups(filtered, cube['periods'], rows)
+    return filtered
+
+
+def select_periods(cube, year='All', month='All'):
+    """Boolean mask over the cube periods for a Year / Month (number) selection"""
+    mask = np.ones(len(cube['periods']), dtype=bool)
+    if year != 'All':
+        mask &= cube['period_year'] == year
+    if month != 'All':
+        mask &= cube['period_month'] == month
+    return mask
+
+
+def selected_rows(cube, periods):
+    """Number of processed records inside the selected periods"""
+    return int(cube['periods']['ROWS'].to_numpy()[periods].sum())
+
+
+def dimension_table(cube, dimension, group_name, periods):
+    """Sales / opening stock / sales % per value of dimension over the selected periods.
+
+    Same table a groupby of the selected raw rows on dimension gives, sorted by Sales Qty.
+    """
+    rollup = cube['rollups'].get(dimension)
+    if rollup is None:
+        return pd.DataFrame()
+
+    rows = rollup['ROWS'][periods].sum(axis=0)
+    present = np.flatnonzero(rows)
+    sums = {col: rollup[col][periods].sum(axis=0)[present] for col in MEASURES}
+    return _stock_table(group_name, rollup['labels'], rollup['categorical'], present, sums, cube['dtypes'])
+
+
+def monthly_table(cube, periods):
+    """Per-month sales / opening stock / sales % over the selected periods, in date order"""
+    selected = np.flatnonzero(periods & (cube['periods']['ROWS'].to_numpy() > 0))
+    sums = {col: cube['periods'][col].to_numpy()[selected] for col in MEASURES}
+
+    table = {col: cube['periods'][col].take(selected).reset_index(drop=True)
+             for col in ('YEAR', 'MONTH', 'MONTH_NAME') if col in cube['periods'].columns}
+    table.update({col: sums[col].astype(cube['dtypes'][col], copy=False) for col in MEASURES})
+    table['SALES_PERCENTAGE'] = sales_percentage(sums['SALES_QTY'], sums['OPENING_STOCK'])
+    return pd.DataFrame(table)
@@ -1,14 +1,81 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import numpy as np
 import warnings
+import functools
+from contextlib import nullcontext
+from instrumentation import RerunTimings, append_log, timing_requested
 warnings.filterwarnings('ignore')
 
 # Page configuration
 st.set_page_config(page_title="Sales Analytics Dashboard", layout="wide", page_icon="📊")
 
+# Opt-in stage timings (?timing=1 in the URL or SALES_TIMING=1), shown in the sidebar at the end of each rerun
+TIMING_ENABLED = timing_requested(st.query_params.get('timing'))
+if TIMING_ENABLED:
+    st.session_state['rerun_timings'] = RerunTimings('Full rerun')
+
+def timed(name):
+    """Time the block as a stage of the current rerun (nothing to do unless timing is on)"""
+    timings = st.session_state.get('rerun_timings') if TIMING_ENABLED else None
+    return timings.stage(name) if timings is not None else nullcontext()
+
+def note_timing(**values):
+    """Attach values (upload, selection) to the timings of the current rerun"""
+    timings = st.session_state.get('rerun_timings') if TIMING_ENABLED else None
+    if timings is not None:
+        timings.context.update(values)
+
+def timed_section(name):
+    """Time a dashboard section as one stage, or as a rerun of its own when the fragment reruns alone"""
+    def decorate(section):
+        @functools.wraps(section)
+        def run(*args, **kwargs):
+            if not TIMING_ENABLED or st.session_state.get('rerun_timings') is not None:
+                with timed(name):
+                    return section(*args, **kwargs)
+            
+            # Fragments cannot write to the sidebar: kept for the next full rerun to show
+            timings = RerunTimings(name)
+            st.session_state['rerun_timings'] = timings
+            try:
+                with timings.stage(name):
+                    return section(*args, **kwargs)
+            finally:
+                del st.session_state['rerun_timings']
+                record = timings.record()
+                append_log(record)
+                st.session_state['section_timings'] = (st.session_state.get('section_timings', []) + [record])[-10:]
+        return run
+    return decorate
+
+def timings_table(record):
+    """Display frame of one rerun's stages, nested stages indented under their parent"""
+    import pandas as pd
+    
+    return pd.DataFrame({
+        'Stage': ['· ' * entry['depth'] + entry['stage'] for entry in record['stages']],
+        'ms': [entry['ms'] for entry in record['stages']],
+        'RSS (MB)': [entry['rss_mb'] for entry in record['stages']],
+        'RSS Change (MB)': [entry['rss_delta_mb'] for entry in record['stages']],
+        'Peak RSS (MB)': [entry['peak_rss_mb'] for entry in record['stages']],
+    })
+
+def show_timings():
+    """Sidebar breakdown of this rerun, and of the sections that reran alone since the last one"""
+    timings = st.session_state.pop('rerun_timings', None)
+    if timings is None:
+        return
+    record = timings.record()
+    append_log(record)
+    section_records = st.session_state.pop('section_timings', [])
+    
+    with st.sidebar.expander("⏱️ Rerun Timings", expanded=True):
+        st.caption(f"Full rerun: {record['total_ms']:,.0f} ms")
+        st.dataframe(timings_table(record), hide_index=True, use_container_width=True)
+        for section_record in section_records:
+            st.caption(f"{section_record['scope']} alone at {section_record['time'][11:]}: "
+                       f"{section_record['total_ms']:,.0f} ms")
+            st.dataframe(timings_table(section_record), hide_index=True, use_container_width=True)
+
 # Custom CSS for better styling
 st.markdown("""
     <style>
@@ -72,514 +139,639 @@ st.markdown("<h1 style='text-align: center; color: #1f77b4;'>📊 Sales Analytic
 st.markdown("<h3 style='text-align: center; color: #666;'>Sales Performance Analysis with Stock Metrics</h3>", unsafe_allow_html=True)
 st.markdown("---")
 
-# File uploader
-uploaded_file = st.file_uploader("Upload Excel File with 'Sales' sheet", type=['xlsx', 'xls'])
+# File uploader (several files, e.g. one workbook per month, are analyzed together)
+uploaded_files = st.file_uploader("Upload Excel File with 'Sales' sheet (or a CSV / Parquet / Feather export)",
+                                  type=['xlsx', 'xls', 'csv', 'parquet', 'feather'], accept_multiple_files=True)
+
+# The data path (pandas, NumPy, the readers) is only imported once there is something to analyze, so the
+# landing page renders without it; plotly.express follows with the first chart
+if uploaded_files:
+    import pandas as pd
+    from analytics import (CUBE_DIMENSIONS, build_sales_cube, dimension_table, filter_cube, monthly_table,
+                           select_periods, selected_rows)
+    from bitmap_index import build_bitmap_index, matching_rows
+    from charts import build_marketplace_figures, build_trend_figure
+    from dataset_store import has_upload
+    from disk_cache import content_hash, has_frame
+    from ingest_jobs import INGEST_WORKERS, discard_job, job_status, submit_upload
+    from loader import MissingColumnsError
+    from paging import PAGE_ROWS, arrow_table, page_count, table_page
+    from quality import quality_tables
+    from style_index import build_style_index, search_styles, style_history
+    from uploads import NoRowsError, load_upload, merge_uploads
+
+def get_upload_key(uploaded_file):
+    """SHA-256 of the upload, hashed once per uploaded file rather than on every rerun"""
+    upload_keys = st.session_state.setdefault('upload_keys', {})
+    if uploaded_file.file_id not in upload_keys:
+        upload_keys[uploaded_file.file_id] = content_hash(uploaded_file)
+    return upload_keys[uploaded_file.file_id]
 
-@st.cache_data(ttl=3600)
-def load_and_process_data(uploaded_file):
-    """Load and process the Excel file with sales data including opening stock"""
+def progress_state(rows_read, total_rows):
+    """(fraction, text) of the progress bar while a Sales sheet is read (total_rows may be unknown)"""
+    if not rows_read:
+        return 0.0, "Reading 'Sales' sheet..."
+    if total_rows:
+        return min(rows_read / total_rows, 1.0), f"Reading 'Sales' sheet... {rows_read:,} / {total_rows:,} rows"
+    return 0.5, f"Reading 'Sales' sheet... {rows_read:,} rows"
+
+def report_load_error(error):
+    """Show why an upload could not be loaded and stop the script"""
+    if isinstance(error, MissingColumnsError):
+        st.error(f"❌ {error}")
+        st.info("Available columns: " + ", ".join(error.available))
+    else:
+        st.error(f"Error loading data: {str(error)}")
+        import traceback
+        st.write("Detailed error:", ''.join(traceback.format_exception(error)))
+    st.stop()
+
+def process_upload(upload_key, uploaded_file):
+    """Load and process the Excel file (or CSV / Parquet / Feather export) with sales data including opening stock"""
+    # Only shown when the upload is parsed here, not when it comes from disk or from a worker
+    progress_bar = None
+    
+    def report_progress(rows_read, total_rows):
+        nonlocal progress_bar
+        if progress_bar is None:
+            progress_bar = st.progress(0.0)
+        progress_bar.progress(*progress_state(rows_read, total_rows))
+    
     try:
-        # Read only sales sheet
-        sales_df = pd.read_excel(uploaded_file, sheet_name='Sales')
-        
-        # Clean column names - preserve original case but strip spaces
-        def clean_columns(df):
-            df.columns = df.columns.astype(str).str.strip()
-            return df
-        
-        # Clean column names
-        sales_df = clean_columns(sales_df)
-        
-        # Function to find column with case-insensitive matching
-        def find_column(df, possible_names):
-            df_cols_upper = {col.upper(): col for col in df.columns}
-            for name in possible_names:
-                if name.upper() in df_cols_upper:
-                    return df_cols_upper[name.upper()]
-            return None
-        
-        # Identify key columns for SALES sheet
-        sales_style_col = find_column(sales_df, ['Style_ID', 'STYLE_ID', 'StyleID', 'SKU', 'STYLE CODE', 'STYLE-CODE', 'Style Code'])
-        sales_year_col = find_column(sales_df, ['YEAR', 'Year', 'SALES_YEAR', 'Sale Year'])
-        sales_month_col = find_column(sales_df, ['MONTH', 'Month', 'SALES_MONTH', 'Sale Month'])
-        sales_qty_col = find_column(sales_df, ['Qty', 'QTY', 'sales Qty', 'sales_Qty', 'Sales_Qty', 'Sales Qty', 'Quantity', 'Sales_QTY', 'SALES'])
-        opening_stock_col = find_column(sales_df, ['Opening_stock', 'Opening Stock', 'OPENING_STOCK', 'Opening_Stock', 
-                                                  'opening stock', 'OpeningStock', 'OP_STOCK', 'Opening_Stock_Qty'])
-        
-        # Verify required columns exist
-        required_cols_sales = {
-            'Style': sales_style_col,
-            'Year': sales_year_col,
-            'Month': sales_month_col,
-            'Sales Qty': sales_qty_col,
-            'Opening Stock': opening_stock_col
-        }
-        
-        missing_sales = [k for k, v in required_cols_sales.items() if v is None]
-        
-        if missing_sales:
-            st.error(f"❌ Missing required columns in Sales sheet: {', '.join(missing_sales)}")
-            st.info("Available columns: " + ", ".join(sales_df.columns))
-            st.stop()
-        
-        # Create clean dataframe with standardized names
-        sales_clean = pd.DataFrame({
-            'STYLE_ID': sales_df[sales_style_col].astype(str).str.strip().str.upper(),  # UPPERCASE for consistency
-            'YEAR': pd.to_numeric(sales_df[sales_year_col], errors='coerce'),
-            'MONTH': pd.to_numeric(sales_df[sales_month_col], errors='coerce'),
-            'SALES_QTY': pd.to_numeric(sales_df[sales_qty_col], errors='coerce').fillna(0),
-            'OPENING_STOCK': pd.to_numeric(sales_df[opening_stock_col], errors='coerce').fillna(0)
-        })
-        
-        # Add additional columns from sales if they exist - with PROPER TRIMMING and UPPERCASE
-        additional_cols_mapping = {
-            'Subcategory': ['Subcategory', 'SUBCATEGORY', 'Sub_Category'],
-            'Season': ['Season', 'SEASON'],
-            'Brand': ['Brand', 'BRAND'],
-            'Color': ['Color', 'COLOR'],
-            'Heel_Type_1': ['Heel_Type 1', 'Heel Type 1', 'HEEL_TYPE_1', 'Heel_Type_1'],
-            'Maketplace': ['Maketplace', 'MAKETPLACE', 'Marketplace', 'MARKETPLACE'],
-            'Closing_stock': ['Closing_stock', 'Closing Stock', 'CLOSING_STOCK'],
-            'Date': ['Date', 'DATE']
-        }
-        
-        for standard_name, possible_names in additional_cols_mapping.items():
-            found_col = find_column(sales_df, possible_names)
-            if found_col:
-                # PROPERLY TRIM TEXT COLUMNS to remove leading/trailing spaces and convert to UPPERCASE
-                if sales_df[found_col].dtype == 'object':  # Text columns
-                    sales_clean[standard_name] = sales_df[found_col].astype(str).str.strip().str.upper()
-                else:
-                    sales_clean[standard_name] = sales_df[found_col]
-        
-        # Handle duplicate sales records silently
-        duplicate_subset = ['STYLE_ID', 'YEAR', 'MONTH']
-        
-        # Check if Maketplace column exists and add it to subset
-        if 'Maketplace' in sales_clean.columns:
-            duplicate_subset.append('Maketplace')
-        
-        # Get list of columns to aggregate
-        agg_dict = {'SALES_QTY': 'sum', 'OPENING_STOCK': 'first'}
-        for col in sales_clean.columns:
-            if col not in duplicate_subset + ['SALES_QTY', 'OPENING_STOCK']:
-                agg_dict[col] = 'first'  # Take first value for categorical columns
-        
-        sales_clean = sales_clean.groupby(duplicate_subset, as_index=False).agg(agg_dict)
-        
-        # Add month name for display
-        month_names = {1: 'January', 2: 'February', 3: 'March', 4: 'April', 5: 'May', 
-                      6: 'June', 7: 'July', 8: 'August', 9: 'September', 
-                      10: 'October', 11: 'November', 12: 'December'}
-        sales_clean['MONTH_NAME'] = sales_clean['MONTH'].map(month_names)
-        
-        # Calculate sales percentage (Sales Qty / Opening Stock)
-        # Handle division by zero and cases where opening stock is 0
-        sales_clean['SALES_PERCENTAGE'] = np.where(
-            sales_clean['OPENING_STOCK'] > 0,
-            (sales_clean['SALES_QTY'] / sales_clean['OPENING_STOCK']) * 100,
-            0
-        )
-        
-        return sales_clean
-        
+        sales_clean = load_upload(upload_key, uploaded_file, progress=report_progress, stage=timed)
+    except Exception as e:
+        report_load_error(e)
+    if progress_bar is not None:
+        progress_bar.empty()
+    return sales_clean
+
+# Cached as a resource: every rerun gets the same frame instead of an unpickled copy of it,
+# so the frame is treated as read-only from here on
+@st.cache_resource(ttl=3600)
+def load_and_process_data(upload_key, _uploaded_file):
+    """Processed frame of one upload"""
+    return process_upload(upload_key, _uploaded_file)
+
+def combined_upload_key(upload_keys):
+    """Key of a set of uploads, for the caches that otherwise key on one upload"""
+    return content_hash('\n'.join(upload_keys).encode())
+
+@st.cache_resource(ttl=3600, max_entries=8)
+def load_uploads(upload_keys, _uploaded_files):
+    """Union of several uploads (e.g. one workbook per month).
+
+    Each upload is parsed only the first time the dataset store sees it and
+    kept there as one Parquet partition per Year/Month; every later set of
+    uploads containing it reads those partitions back instead.
+    """
+    try:
+        return merge_uploads(upload_keys, _uploaded_files, load=process_upload, stage=timed)
+    except NoRowsError as e:
+        st.error(f"❌ {e}")
+        st.stop()
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         import traceback
         st.write("Detailed error:", traceback.format_exc())
         st.stop()
 
-if uploaded_file is not None:
+# Shared by reference across reruns (never mutated), so no per-rerun copy of the cube
+@st.cache_resource(ttl=3600, max_entries=8)
+def get_sales_cube(upload_key, _df):
+    """Year/Month x dimension aggregates of the processed data, built once per upload"""
+    return build_sales_cube(_df)
+
+@st.cache_resource(ttl=3600, max_entries=8)
+def get_style_index(upload_key, _df):
+    """Rows of every STYLE_ID in the processed data, for the style drilldown"""
+    return build_style_index(_df)
+
+@st.cache_resource(ttl=3600, max_entries=8)
+def get_filter_index(upload_key, _cube):
+    """Bitmaps of every dimension value over the cube's combinations, for the sidebar dimension filters"""
+    return build_bitmap_index(_cube['combinations'], CUBE_DIMENSIONS)
+
+@st.cache_resource(ttl=3600, max_entries=32)
+def get_filtered_cube(upload_key, dimension_filters, _cube, _filter_index):
+    """The cube restricted to the combinations matching the dimension filters ((dimension, values) pairs)"""
+    return filter_cube(_cube, matching_rows(_filter_index, dict(dimension_filters)))
+
+# Figures depend only on the upload and the Year/Month and dimension selection: each is built once per selection and
+# reused by every rerun that does not change it, least recently used ones evicted past max_entries
+@st.cache_resource(ttl=3600, max_entries=64)
+def get_marketplace_figures(upload_key, selected_year, selected_month, dimension_filters, _marketplace_data):
+    """Marketplace charts of the Year/Month selection"""
+    return build_marketplace_figures(_marketplace_data)
+
+@st.cache_resource(ttl=3600, max_entries=64)
+def get_monthly_figure(upload_key, selected_year, selected_month, dimension_filters, _monthly_data):
+    """Monthly trend chart of the Year/Month selection"""
+    return build_trend_figure(_monthly_data)
+
+@st.cache_resource(ttl=3600, max_entries=64)
+def get_style_figure(upload_key, style, _style_data):
+    """Monthly trend chart of a single style"""
+    return build_trend_figure(_style_data)
+
+def to_title_case(values):
+    """Title-case labels (numbers included) for display; categorical columns only touch their categories"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.rename_categories(values.cat.categories.astype(str).str.title())
+    return values.astype(str).str.title()
+
+# Function to create styled dataframe with proper sorting
+def create_sortable_dataframe(data, columns_mapping):
+    """
+    Create a dataframe with proper formatting that maintains sortability
+    
+    Parameters:
+    data: DataFrame with numeric values
+    columns_mapping: dict mapping original column names to display names
+    """
+    # Create a copy for display
+    display_df = data.copy()
+    
+    # Configure column display formats
+    column_config = {}
+    
+    for col in display_df.columns:
+        if col in columns_mapping:
+            display_name = columns_mapping[col]
+            
+            if 'COVER' in col.upper():
+                # Months, to one decimal
+                column_config[col] = st.column_config.NumberColumn(
+                    display_name,
+                    help="Click to sort",
+                    format="%.1f"
+                )
+            elif 'QTY' in col.upper() or 'STOCK' in col.upper():
+                # Format as numbers with commas
+                column_config[col] = st.column_config.NumberColumn(
+                    display_name,
+                    help="Click to sort",
+                    format="%d"
+                )
+            elif 'PERCENTAGE' in col.upper() or 'SELL_THROUGH' in col.upper():
+                # Format as percentages
+                column_config[col] = st.column_config.NumberColumn(
+                    display_name,
+                    help="Click to sort",
+                    format="%.1f%%"
+                )
+            else:
+                # For text columns - convert to title case for display
+                column_config[col] = st.column_config.TextColumn(
+                    display_name,
+                    help="Click to sort"
+                )
+    
+    return display_df, column_config
+
+def render_table(data, column_mapping, key, label_col=None, height='auto'):
+    """Show a stock table; one longer than a page is sorted and paged on the server.
+    
+    Only the visible page is copied, title-cased and sent to the browser, so
+    the cost per rerun does not grow with the number of labels. The sort and
+    page widgets are keyed on key.
+    """
+    page_info = None
+    if len(data) > PAGE_ROWS:
+        sort_options = {column_mapping[col]: col for col in data.columns if col in column_mapping}
+        n_pages = page_count(len(data))
+        page_key = f"{key}_page"
+        # The selection may have shrunk the table under the page shown last
+        if st.session_state.get(page_key, 1) > n_pages:
+            st.session_state[page_key] = n_pages
+        
+        sort_col, order_col, page_col = st.columns(3)
+        sort_by = sort_col.selectbox("Sort by", list(sort_options), key=f"{key}_sort",
+                                     index=list(sort_options.values()).index('SALES_QTY'))
+        order = order_col.selectbox("Order", ['Descending', 'Ascending'], key=f"{key}_order")
+        page = page_col.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, step=1, key=page_key)
+        
+        first_row = (page - 1) * PAGE_ROWS
+        page_info = f"Rows {first_row + 1:,}–{min(first_row + PAGE_ROWS, len(data)):,} of {len(data):,}"
+        data = table_page(data, sort_options[sort_by], ascending=order == 'Ascending', page=page)
+        if label_col in data.columns and isinstance(data[label_col].dtype, pd.CategoricalDtype):
+            # Title-case only the labels on this page
+            data[label_col] = data[label_col].cat.remove_unused_categories()
+    
+    # Create sortable dataframe
+    display_df, column_config = create_sortable_dataframe(data, column_mapping)
+    
+    # Convert text columns to title case for better display
+    if label_col in display_df.columns:
+        display_df[label_col] = to_title_case(display_df[label_col])
+    
+    # Display with column configuration
+    with timed(f"{label_col or key} table"):
+        st.dataframe(
+            arrow_table(display_df),
+            column_config=column_config,
+            hide_index=True,
+            use_container_width=True,
+            height=height
+        )
+    if page_info:
+        st.caption(page_info)
+
+# Seconds between two looks at the uploads being parsed in the background
+INGEST_POLL_SECONDS = 0.5
+
+# Polls the ingestion workers on a timer, so the script itself is not held up while uploads are parsed
+@st.fragment(run_every=INGEST_POLL_SECONDS)
+def ingestion_progress(jobs):
+    """Progress of the uploads being parsed in the background ((upload key, file name) pairs).
+    
+    Reruns the whole page once every one of them has finished, or when one of them
+    is no longer known (the page then submits it again).
+    """
+    statuses = [(name, job_status(upload_key)) for upload_key, name in jobs]
+    if any(status is None for _, status in statuses) or all(status['state'] in ('done', 'failed')
+                                                            for _, status in statuses):
+        st.rerun()
+    
+    for name, status in statuses:
+        if status['state'] == 'queued':
+            st.progress(0.0, text=f"{name}: waiting for a free ingestion worker...")
+        elif status['state'] == 'running' and status['rows_read'] is None:
+            st.progress(0.0, text=f"{name}: opening the file...")
+        elif status['state'] == 'running':
+            fraction, text = progress_state(status['rows_read'], status['total_rows'])
+            st.progress(fraction, text=f"{name}: {text}")
+        else:
+            st.progress(1.0, text=f"{name}: done")
+
+# Dashboard sections. Each is a fragment that only reads the arguments it is given, so an
+# interaction inside a section reruns that section alone, and a full rerun hands every section
+# its inputs (upload, cube, Year/Month selection) explicitly instead of through shared globals
+@st.fragment
+@timed_section("Data quality")
+def data_quality_section(df):
+    """Data quality panel: depends on the upload only, never on the Year/Month selection"""
+    with st.expander("🔍 Data Quality Check (Text Columns)"):
+        # Profiled from the raw values while loading and cached with the data
+        text_quality_df, numeric_quality_df = quality_tables(df.attrs.get('quality', {}))
+        st.dataframe(text_quality_df, use_container_width=True, hide_index=True)
+        
+        if not text_quality_df.empty and text_quality_df['Rows With Leading/Trailing Spaces'].sum() > 0:
+            st.info("ℹ️ Leading/trailing spaces have been automatically trimmed from all text columns.")
+        
+        # Numbers that could not be read: Year/Month rows are left out, quantities count as 0
+        if not numeric_quality_df.empty:
+            st.dataframe(numeric_quality_df, use_container_width=True, hide_index=True)
+        
+        # Duplicate records (same Style, Year, Month and Marketplace) merged while loading
+        dedup_stats = df.attrs.get('dedup')
+        if dedup_stats:
+            dup_col1, dup_col2, dup_col3 = st.columns(3)
+            dup_col1.metric("Rows Read", f"{dedup_stats['rows_in']:,}")
+            dup_col2.metric("Duplicate Rows Merged", f"{dedup_stats['duplicates_collapsed']:,}",
+                            help="Rows with the same Style, Year, Month and Marketplace: quantities summed, "
+                                 "other fields taken from the first row")
+            dup_col3.metric("Rows Without Year/Month", f"{dedup_stats['missing_key_rows']:,}",
+                            help="Rows whose Year or Month could not be read are left out")
+        
+        # Reported closing stock against opening stock - sales, reconciled while loading
+        stock_stats = df.attrs.get('stock')
+        if stock_stats and stock_stats['closing_reported_rows']:
+            stock_col1, stock_col2, _ = st.columns(3)
+            stock_col1.metric("Rows With Closing Stock", f"{stock_stats['closing_reported_rows']:,}")
+            stock_col2.metric("Closing Stock Mismatches", f"{stock_stats['closing_mismatch_rows']:,}",
+                              help="Rows whose reported closing stock differs from opening stock minus sales")
+
+@st.fragment
+@timed_section("Marketplace")
+def marketplace_section(upload_key, cube, selected_year, selected_month, selected_periods, dimension_filters=()):
+    """Marketplace charts and table for the selected periods"""
+    st.markdown("### 📊 Marketplace Performance with Stock Metrics")
+    
+    # Group by marketplace
+    with timed("Aggregate"):
+        marketplace_data = dimension_table(cube, 'Maketplace', 'Marketplace', selected_periods)
+    
+    if not marketplace_data.empty:
+        # Create two bar charts side by side (built once per upload and filter selection)
+        with timed("Build figures"):
+            fig_sales, fig_percent = get_marketplace_figures(upload_key, selected_year, selected_month,
+                                                             dimension_filters, marketplace_data)
+        with timed("Send charts"):
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.plotly_chart(fig_sales, use_container_width=True)
+            
+            with col2:
+                st.plotly_chart(fig_percent, use_container_width=True)
+        
+        # Marketplace data table with all metrics
+        with st.expander("📋 Marketplace Data Table with Stock Metrics"):
+            # Prepare column mapping for display
+            column_mapping = {
+                'Marketplace': 'Marketplace',
+                'SALES_QTY': 'Sales Qty',
+                'OPENING_STOCK': 'Opening Stock',
+                'SALES_PERCENTAGE': 'Sales %'
+            }
+            
+            render_table(marketplace_data, column_mapping, key="table_marketplace", label_col='Marketplace')
+    
+    st.markdown("---")
+
+@st.fragment
+@timed_section("Categories")
+def category_section(cube, available_categories, selected_periods):
+    """Sales / stock tables per category column for the selected periods"""
+    st.markdown("### 📈 Sales Analysis by Category with Stock Metrics")
+    
+    # Display tables in rows of 2
+    for i in range(0, len(available_categories), 2):
+        cols = st.columns(2)
+        
+        for j in range(2):
+            if i + j < len(available_categories):
+                col_name, display_name = available_categories[i + j]
+                
+                with cols[j]:
+                    st.markdown(f"<div class='table-container'>", unsafe_allow_html=True)
+                    st.markdown(f"#### {display_name}")
+                    
+                    with timed(f"Aggregate {display_name}"):
+                        category_data = dimension_table(cube, col_name, display_name, selected_periods)
+                    
+                    if not category_data.empty:
+                        # Prepare column mapping for display
+                        column_mapping = {
+                            display_name: display_name,
+                            'SALES_QTY': 'Sales Qty',
+                            'OPENING_STOCK': 'Opening Stock',
+                            'SALES_PERCENTAGE': 'Sales %'
+                        }
+                        
+                        render_table(category_data, column_mapping, key=f"table_{col_name}",
+                                     label_col=display_name, height=300)
+                    else:
+                        st.info(f"No data available for {display_name}")
+                    
+                    st.markdown(f"</div>", unsafe_allow_html=True)
+    
+    st.markdown("---")
+
+@st.fragment
+@timed_section("Monthly trend")
+def monthly_section(upload_key, cube, selected_year, selected_month, selected_periods, dimension_filters=()):
+    """Monthly trend chart and table for the selected periods"""
+    st.markdown("### 📅 Monthly Sales Trend with Stock Metrics")
+    
+    # Monthly totals for the selection, already in year/month order
+    with timed("Aggregate"):
+        monthly_data = monthly_table(cube, selected_periods)
+        
+        # Create X-axis labels
+        monthly_data['Period'] = monthly_data['MONTH_NAME'].astype(str) + ' ' + monthly_data['YEAR'].astype(str)
+    
+    with timed("Build figure"):
+        fig_monthly = get_monthly_figure(upload_key, selected_year, selected_month, dimension_filters, monthly_data)
+    with timed("Send chart"):
+        st.plotly_chart(fig_monthly, use_container_width=True)
+    
+    # Monthly data table with all metrics
+    with st.expander("📋 Monthly Trend Data Table with Stock Metrics"):
+        # Create a copy for display
+        trend_table = monthly_data[['Period', 'SALES_QTY', 'OPENING_STOCK', 'SALES_PERCENTAGE']].copy()
+        
+        # Prepare column mapping for display
+        column_mapping = {
+            'Period': 'Period',
+            'SALES_QTY': 'Sales Quantity',
+            'OPENING_STOCK': 'Opening Stock',
+            'SALES_PERCENTAGE': 'Sales %'
+        }
+        
+        # Create sortable dataframe
+        display_df, column_config = create_sortable_dataframe(trend_table, column_mapping)
+        
+        # Display with column configuration
+        with timed("Monthly table"):
+            st.dataframe(
+                arrow_table(display_df),
+                column_config=column_config,
+                hide_index=True,
+                use_container_width=True
+            )
+    
+    st.markdown("---")
+
+@st.fragment
+@timed_section("Style drilldown")
+def style_drilldown_section(upload_key, df, style_index):
+    """Monthly history of a single style: depends on the upload only, not on the Year/Month selection"""
+    st.markdown("### 🔎 Style Drilldown")
+    
+    # Type-ahead: the search box narrows the style list to the codes starting with what was typed
+    search_col, style_col = st.columns(2)
+    query = search_col.text_input("Search Style ID", key="style_search", placeholder="Start of a style code")
+    matches, match_count = search_styles(style_index, query)
+    
+    if not matches:
+        st.caption(f"No style starts with '{query.strip().upper()}'")
+    else:
+        style = style_col.selectbox(f"Style ({match_count:,} matching)", matches, key="style_pick")
+        if match_count > len(matches):
+            st.caption(f"Showing the first {len(matches):,} matches: type more of the code to narrow them down")
+        
+        with timed("Style history"):
+            style_data = style_history(df, style_index, style)
+            style_data['Period'] = style_data['MONTH_NAME'].astype(str) + ' ' + style_data['YEAR'].astype(str)
+        
+        with timed("Build figure"):
+            fig_style = get_style_figure(upload_key, style, style_data)
+        with timed("Send chart"):
+            # Keyed: a style whose history is the whole selection's draws the same figure as the monthly trend
+            st.plotly_chart(fig_style, use_container_width=True, key="style_chart")
+        
+        with st.expander(f"📋 {style} Monthly Data Table with Stock Metrics"):
+            # Prepare column mapping for display
+            column_mapping = {
+                'Period': 'Period',
+                'SALES_QTY': 'Sales Quantity',
+                'OPENING_STOCK': 'Opening Stock',
+                'SALES_PERCENTAGE': 'Sales %',
+                'CLOSING_STOCK': 'Closing Stock',
+                'CUM_SELL_THROUGH': 'Sell-Through % (Cumulative)',
+                'STOCK_COVER_MONTHS': 'Stock Cover (Months)'
+            }
+            
+            # Create sortable dataframe
+            display_df, column_config = create_sortable_dataframe(
+                style_data[[col for col in column_mapping if col in style_data.columns]], column_mapping)
+            
+            # Display with column configuration
+            with timed("Style table"):
+                st.dataframe(
+                    arrow_table(display_df),
+                    column_config=column_config,
+                    hide_index=True,
+                    use_container_width=True
+                )
+    
+    st.markdown("---")
+
+if uploaded_files:
     try:
         # Load and process data
         with st.spinner('🔍 Loading and processing data...'):
-            df = load_and_process_data(uploaded_file)
+            # The same file uploaded twice is only counted once
+            uploads = {}
+            with timed("Hash uploads"):
+                for uploaded_file in uploaded_files:
+                    uploads.setdefault(get_upload_key(uploaded_file), uploaded_file)
+            
+            # Uploads that are neither in the disk cache nor in the dataset store are parsed by the
+            # ingestion workers; until they are all in, the page only shows their progress
+            if INGEST_WORKERS:
+                with timed("Submit uploads"):
+                    new_uploads = [upload_key for upload_key in uploads
+                                   if not has_frame(upload_key) and not has_upload(upload_key)]
+                    statuses = [submit_upload(upload_key, uploads[upload_key]) for upload_key in new_uploads]
+                for upload_key, status in zip(new_uploads, statuses):
+                    if status['state'] == 'failed':
+                        # Reported once: the file uploaded again is parsed again instead of replaying the error
+                        discard_job(upload_key)
+                        report_load_error(status['error'])
+                if any(status['state'] in ('queued', 'running') for status in statuses):
+                    ingestion_progress(tuple((upload_key, uploads[upload_key].name) for upload_key in new_uploads))
+                    st.stop()
+            
+            with timed("Load data"):
+                if len(uploads) == 1:
+                    upload_key, uploaded_file = next(iter(uploads.items()))
+                    df = load_and_process_data(upload_key, uploaded_file)
+                else:
+                    upload_key = combined_upload_key(list(uploads))
+                    df = load_uploads(tuple(uploads), list(uploads.values()))
+            with timed("Sales cube"):
+                cube = get_sales_cube(upload_key, df)
+            with timed("Style index"):
+                style_index = get_style_index(upload_key, df)
+            with timed("Filter index"):
+                filter_index = get_filter_index(upload_key, cube)
         
         # Display success message only
-        st.success(f"✅ Data loaded successfully! {len(df):,} records processed")
+        files_note = f" from {len(uploads)} files" if len(uploads) > 1 else ""
+        st.success(f"✅ Data loaded successfully! {len(df):,} records processed{files_note}")
         
         # Display data quality check for text columns
-        with st.expander("🔍 Data Quality Check (Text Columns)"):
-            text_columns = ['Brand', 'Subcategory', 'Season', 'Color', 'Heel_Type_1', 'Maketplace']
-            available_text_cols = [col for col in text_columns if col in df.columns]
-            
-            quality_info = []
-            for col in available_text_cols:
-                unique_count = df[col].nunique()
-                sample_values = df[col].dropna().unique()[:5].tolist()
-                has_spaces = any(str(val).strip() != str(val) for val in df[col].dropna().unique()[:20])
-                
-                quality_info.append({
-                    'Column': col,
-                    'Unique Values': unique_count,
-                    'Sample Values': ', '.join(str(v) for v in sample_values),
-                    'Has Leading/Trailing Spaces': 'Yes' if has_spaces else 'No'
-                })
-            
-            quality_df = pd.DataFrame(quality_info)
-            st.dataframe(quality_df, use_container_width=True)
-            
-            if any(q['Has Leading/Trailing Spaces'] == 'Yes' for q in quality_info):
-                st.info("ℹ️ Leading/trailing spaces have been automatically trimmed from all text columns.")
+        data_quality_section(df)
         
         st.markdown("---")
         
         # Sidebar filters
         st.sidebar.header("🔍 Filter Options")
         
-        # Get unique years and months
-        years = sorted([int(y) for y in df['YEAR'].dropna().unique() if not pd.isna(y)])
-        months = sorted([int(m) for m in df['MONTH'].dropna().unique() if not pd.isna(m)])
-        month_names_dict = {1: 'January', 2: 'February', 3: 'March', 4: 'April', 5: 'May', 
-                          6: 'June', 7: 'July', 8: 'August', 9: 'September', 
+        # Get unique years and months (from the cube's periods, not the raw rows)
+        years = sorted({int(y) for y in cube['period_year'] if not pd.isna(y)})
+        months = sorted({int(m) for m in cube['period_month'] if not pd.isna(m)})
+        month_names_dict = {1: 'January', 2: 'February', 3: 'March', 4: 'April', 5: 'May',
+                          6: 'June', 7: 'July', 8: 'August', 9: 'September',
                           10: 'October', 11: 'November', 12: 'December'}
         
         selected_year = st.sidebar.selectbox("Select Year", ['All'] + years)
         selected_month = st.sidebar.selectbox("Select Month", ['All'] + [month_names_dict[m] for m in months if m in month_names_dict])
         
-        # Filter data
-        filtered_df = df.copy()
-        
-        if selected_year != 'All':
-            filtered_df = filtered_df[filtered_df['YEAR'] == selected_year]
+        # Dimension filters: the values picked for one dimension are combined with OR, the dimensions
+        # with AND; nothing picked means no filter on that dimension
+        filter_options = {
+            'Maketplace': 'Marketplace',
+            'Season': 'Season',
+            'Subcategory': 'Subcategory',
+            'Color': 'Color',
+            'Brand': 'Brand',
+            'Heel_Type_1': 'Heel Type'
+        }
         
+        dimension_filters = []
+        for col, name in filter_options.items():
+            rollup = cube['rollups'].get(col)
+            if rollup is None:
+                continue
+            labels = rollup['labels'][rollup['ROWS'].sum(axis=0) > 0]
+            # The labels themselves are the options (a Season may be a number): the bitmap index looks them up as is
+            picked = st.sidebar.multiselect(f"Select {name}", labels.tolist(),
+                                            format_func=lambda value: str(value).title(), key=f"filter_{col}")
+            if picked:
+                dimension_filters.append((col, tuple(picked)))
+        dimension_filters = tuple(dimension_filters)
+        
+        # Filter data: the selection picks periods of the cube, the rows themselves are never touched
+        month_num = 'All'
         if selected_month != 'All':
             month_num = [k for k, v in month_names_dict.items() if v == selected_month][0]
-            filtered_df = filtered_df[filtered_df['MONTH'] == month_num]
+        
+        with timed("Filter"):
+            # Periods of the cube covered by the selection; every table below is read from these
+            selected_periods = select_periods(cube, selected_year, month_num)
+            
+            # Dimension filters resolve to combinations of the cube through its bitmap index (no pass over
+            # the rows); the filtered cube keeps the period axis, so the period selection applies unchanged
+            if dimension_filters:
+                cube = get_filtered_cube(upload_key, dimension_filters, cube, filter_index)
+            record_count = selected_rows(cube, selected_periods)
+        note_timing(upload=upload_key, rows=len(df), filtered_rows=record_count,
+                    year=selected_year, month=selected_month, filters=dimension_filters)
         
         # Display filter summary
         st.sidebar.markdown("---")
+        filter_lines = ''.join(f"\n        - 🏷️ {filter_options[col]}: {', '.join(str(value) for value in values)}"
+                               for col, values in dimension_filters)
         st.sidebar.info(f"""
         **Filter Applied:**
         - 📅 Year: {selected_year}
-        - 📆 Month: {selected_month}
-        - 📊 Records: {len(filtered_df):,}
+        - 📆 Month: {selected_month}{filter_lines}
+        - 📊 Records: {record_count:,}
         """)
         
-        if len(filtered_df) == 0:
+        if record_count == 0:
             st.warning("⚠️ No data available for the selected filters.")
         else:
-            # Helper function for grouped analysis with stock metrics
-            def analyze_with_stock(df, group_col, group_name):
-                if group_col not in df.columns:
-                    return pd.DataFrame()
-                
-                # IMPORTANT: Trim text column values before grouping and ensure UPPERCASE
-                if df[group_col].dtype == 'object':
-                    df = df.copy()
-                    df[group_col] = df[group_col].astype(str).str.strip().str.upper()
-                
-                # Group by category with stock metrics
-                grouped = df.groupby(group_col, observed=True).agg({
-                    'SALES_QTY': 'sum',
-                    'OPENING_STOCK': 'sum'
-                }).reset_index()
-                
-                # Calculate sales percentage
-                grouped['SALES_PERCENTAGE'] = np.where(
-                    grouped['OPENING_STOCK'] > 0,
-                    (grouped['SALES_QTY'] / grouped['OPENING_STOCK']) * 100,
-                    0
-                )
-                
-                # Sort by Sales Qty descending by default
-                grouped = grouped.sort_values('SALES_QTY', ascending=False)
-                grouped.rename(columns={group_col: group_name}, inplace=True)
-                
-                return grouped
-            
-            # Function to create styled dataframe with proper sorting
-            def create_sortable_dataframe(data, columns_mapping):
-                """
-                Create a dataframe with proper formatting that maintains sortability
-                
-                Parameters:
-                data: DataFrame with numeric values
-                columns_mapping: dict mapping original column names to display names
-                """
-                # Create a copy for display
-                display_df = data.copy()
-                
-                # Configure column display formats
-                column_config = {}
-                
-                for col in display_df.columns:
-                    if col in columns_mapping:
-                        display_name = columns_mapping[col]
-                        
-                        if 'QTY' in col.upper() or 'STOCK' in col.upper():
-                            # Format as numbers with commas
-                            column_config[col] = st.column_config.NumberColumn(
-                                display_name,
-                                help="Click to sort",
-                                format="%d"
-                            )
-                        elif 'PERCENTAGE' in col.upper():
-                            # Format as percentages
-                            column_config[col] = st.column_config.NumberColumn(
-                                display_name,
-                                help="Click to sort",
-                                format="%.1f%%"
-                            )
-                        else:
-                            # For text columns - convert to title case for display
-                            column_config[col] = st.column_config.TextColumn(
-                                display_name,
-                                help="Click to sort"
-                            )
-                
-                return display_df, column_config
-            
             # Marketplace Bar Chart with Stock Metrics
-            if 'Maketplace' in filtered_df.columns:
-                st.markdown("### 📊 Marketplace Performance with Stock Metrics")
-                
-                # Group by marketplace
-                marketplace_data = analyze_with_stock(filtered_df, 'Maketplace', 'Marketplace')
-                
-                if not marketplace_data.empty:
-                    # Create two bar charts side by side
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        # Sales Quantity chart
-                        fig_sales = px.bar(
-                            marketplace_data, 
-                            x='Marketplace', 
-                            y='SALES_QTY',
-                            color='SALES_QTY',
-                            color_continuous_scale='viridis',
-                            title=f"Sales Quantity by Marketplace",
-                            text='SALES_QTY'
-                        )
-                        fig_sales.update_traces(
-                            texttemplate='%{text:,.0f}',
-                            textposition='outside'
-                        )
-                        fig_sales.update_layout(
-                            height=400,
-                            showlegend=False,
-                            xaxis_title="Marketplace",
-                            yaxis_title="Sales Quantity",
-                            xaxis={'categoryorder': 'total descending', 'tickangle': 45},
-                            title_x=0.5,
-                            hovermode='x unified'
-                        )
-                        st.plotly_chart(fig_sales, use_container_width=True)
-                    
-                    with col2:
-                        # Sales Percentage chart
-                        fig_percent = px.bar(
-                            marketplace_data, 
-                            x='Marketplace', 
-                            y='SALES_PERCENTAGE',
-                            color='SALES_PERCENTAGE',
-                            color_continuous_scale='RdYlGn',
-                            title=f"Sales % by Marketplace",
-                            text='SALES_PERCENTAGE'
-                        )
-                        fig_percent.update_traces(
-                            texttemplate='%{text:.1f}%',
-                            textposition='outside'
-                        )
-                        fig_percent.update_layout(
-                            height=400,
-                            showlegend=False,
-                            xaxis_title="Marketplace",
-                            yaxis_title="Sales Percentage (%)",
-                            xaxis={'categoryorder': 'total descending', 'tickangle': 45},
-                            title_x=0.5,
-                            hovermode='x unified'
-                        )
-                        st.plotly_chart(fig_percent, use_container_width=True)
-                    
-                    # Marketplace data table with all metrics
-                    with st.expander("📋 Marketplace Data Table with Stock Metrics"):
-                        # Prepare column mapping for display
-                        column_mapping = {
-                            'Marketplace': 'Marketplace',
-                            'SALES_QTY': 'Sales Qty',
-                            'OPENING_STOCK': 'Opening Stock',
-                            'SALES_PERCENTAGE': 'Sales %'
-                        }
-                        
-                        # Create sortable dataframe
-                        display_df, column_config = create_sortable_dataframe(marketplace_data, column_mapping)
-                        
-                        # Convert text columns to title case for better display
-                        if 'Marketplace' in display_df.columns:
-                            display_df['Marketplace'] = display_df['Marketplace'].str.title()
-                        
-                        # Display with column configuration
-                        st.dataframe(
-                            display_df,
-                            column_config=column_config,
-                            hide_index=True,
-                            use_container_width=True
-                        )
-                
-                st.markdown("---")
+            if 'Maketplace' in df.columns:
+                marketplace_section(upload_key, cube, selected_year, selected_month, selected_periods,
+                                    dimension_filters)
             
             # Category Analysis Tables with Stock Metrics
             # Identify which categorical columns are available
             available_categories = []
             category_options = {
                 'Season': 'Season',
-                'Subcategory': 'Subcategory', 
+                'Subcategory': 'Subcategory',
                 'Color': 'Color',
                 'Brand': 'Brand',
                 'Heel_Type_1': 'Heel Type'
             }
             
             for col, name in category_options.items():
-                if col in filtered_df.columns:
+                if col in df.columns:
                     available_categories.append((col, name))
             
             if available_categories:
-                st.markdown("### 📈 Sales Analysis by Category with Stock Metrics")
-                
-                # Display tables in rows of 2
-                for i in range(0, len(available_categories), 2):
-                    cols = st.columns(2)
-                    
-                    for j in range(2):
-                        if i + j < len(available_categories):
-                            col_name, display_name = available_categories[i + j]
-                            
-                            with cols[j]:
-                                st.markdown(f"<div class='table-container'>", unsafe_allow_html=True)
-                                st.markdown(f"#### {display_name}")
-                                
-                                category_data = analyze_with_stock(filtered_df, col_name, display_name)
-                                
-                                if not category_data.empty:
-                                    # Prepare column mapping for display
-                                    column_mapping = {
-                                        display_name: display_name,
-                                        'SALES_QTY': 'Sales Qty',
-                                        'OPENING_STOCK': 'Opening Stock',
-                                        'SALES_PERCENTAGE': 'Sales %'
-                                    }
-                                    
-                                    # Create sortable dataframe
-                                    display_df, column_config = create_sortable_dataframe(category_data, column_mapping)
-                                    
-                                    # Convert text columns to title case for better display
-                                    if display_name in display_df.columns:
-                                        display_df[display_name] = display_df[display_name].str.title()
-                                    
-                                    # Display with column configuration
-                                    st.dataframe(
-                                        display_df,
-                                        column_config=column_config,
-                                        hide_index=True,
-                                        use_container_width=True,
-                                        height=300
-                                    )
-                                else:
-                                    st.info(f"No data available for {display_name}")
-                                
-                                st.markdown(f"</div>", unsafe_allow_html=True)
-                
-                st.markdown("---")
+                category_section(cube, available_categories, selected_periods)
             
             # Monthly Trend Chart with Stock Metrics
-            st.markdown("### 📅 Monthly Sales Trend with Stock Metrics")
-            
-            # Group by month for trend analysis
-            monthly_data = filtered_df.groupby(['YEAR', 'MONTH', 'MONTH_NAME']).agg({
-                'SALES_QTY': 'sum',
-                'OPENING_STOCK': 'sum'
-            }).reset_index()
-            
-            # Calculate sales percentage for monthly data
-            monthly_data['SALES_PERCENTAGE'] = np.where(
-                monthly_data['OPENING_STOCK'] > 0,
-                (monthly_data['SALES_QTY'] / monthly_data['OPENING_STOCK']) * 100,
-                0
-            )
-            
-            # Sort by year and month
-            monthly_data = monthly_data.sort_values(['YEAR', 'MONTH'])
-            
-            # Create X-axis labels
-            monthly_data['Period'] = monthly_data['MONTH_NAME'] + ' ' + monthly_data['YEAR'].astype(str)
-            
-            # Create dual-axis chart
-            fig_monthly = go.Figure()
-            
-            # Add Sales Quantity bars
-            fig_monthly.add_trace(go.Bar(
-                x=monthly_data['Period'],
-                y=monthly_data['SALES_QTY'],
-                name='Sales Quantity',
-                marker_color='#1f77b4',
-                yaxis='y1'
-            ))
-            
-            # Add Sales Percentage line
-            fig_monthly.add_trace(go.Scatter(
-                x=monthly_data['Period'],
-                y=monthly_data['SALES_PERCENTAGE'],
-                name='Sales %',
-                mode='lines+markers',
-                line=dict(color='#ff7f0e', width=3),
-                marker=dict(size=10),
-                yaxis='y2'
-            ))
-            
-            # Update layout for dual y-axes
-            fig_monthly.update_layout(
-                height=500,
-                xaxis_title="Month",
-                yaxis_title="Sales Quantity",
-                yaxis2=dict(
-                    title="Sales Percentage (%)",
-                    overlaying='y',
-                    side='right',
-                    range=[0, max(monthly_data['SALES_PERCENTAGE'].max() * 1.2, 100)],
-                    tickformat='.0f%'
-                ),
-                hovermode='x unified',
-                template='plotly_white',
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-                xaxis={'tickangle': 45}
-            )
-            
-            st.plotly_chart(fig_monthly, use_container_width=True)
-            
-            # Monthly data table with all metrics
-            with st.expander("📋 Monthly Trend Data Table with Stock Metrics"):
-                # Create a copy for display
-                trend_table = monthly_data[['Period', 'SALES_QTY', 'OPENING_STOCK', 'SALES_PERCENTAGE']].copy()
-                
-                # Prepare column mapping for display
-                column_mapping = {
-                    'Period': 'Period',
-                    'SALES_QTY': 'Sales Quantity',
-                    'OPENING_STOCK': 'Opening Stock',
-                    'SALES_PERCENTAGE': 'Sales %'
-                }
-                
-                # Create sortable dataframe
-                display_df, column_config = create_sortable_dataframe(trend_table, column_mapping)
-                
-                # Display with column configuration
-                st.dataframe(
-                    display_df,
-                    column_config=column_config,
-                    hide_index=True,
-                    use_container_width=True
-                )
-            
-            st.markdown("---")
+            monthly_section(upload_key, cube, selected_year, selected_month, selected_periods,
+                            dimension_filters)
+        
+        # Single-style history (all periods, whatever the filters)
+        style_drilldown_section(upload_key, df, style_index)
             
     except Exception as e:
         st.error(f"❌ Error: {str(e)}")
         import traceback
         st.write("Detailed error:", traceback.format_exc())
 else:
-    st.info("👆 Please upload an Excel file to begin analyzing your data.")
+    st.info("👆 Please upload an Excel file (or a CSV / Parquet / Feather export) to begin analyzing your data. "
+            "Several files, e.g. one per month, can be uploaded together.")
     
     # Instructions for Excel preparation
     with st.expander("📋 Required Excel File Structure"):
@@ -599,6 +791,11 @@ else:
         - `Brand` - Product brand
         - `Color` - Product color
         
+        ### **Other File Formats:**
+        - **CSV / Parquet / Feather** exports are read directly (no 'Sales' sheet needed), with the same column names
+        - **Several files** (e.g. one workbook per month) can be uploaded at once and are analyzed together;
+          files seen before are not parsed again
+        
         ### **Key Features:**
         - **Opening Stock Metrics** - Displayed alongside sales
         - **Sales Percentage** - Calculated as (Sales Qty / Opening Stock) * 100
@@ -610,3 +807,7 @@ else:
         2. **Opening Stock** - Starting inventory
         3. **Sales %** - Percentage of stock sold
         """)
+
+# Last in the script (and in the sidebar), so that every stage above is in the breakdown
+if TIMING_ENABLED:
+    show_timings()
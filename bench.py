@@ -0,0 +1,1121 @@
+"""Benchmarks for the Sales dashboard data path.
+
+Usage:
+    python bench.py ingest --rows 500000
+    python bench.py categorical --rows 500000
+    python bench.py cube --rows 500000
+    python bench.py filter --rows 1000000
+    python bench.py load --rows 1000000 --chunk-rows 0 250000 100000
+    python bench.py formats --rows 500000
+    python bench.py dedup --rows 500000
+    python bench.py months --rows 20000 --months 12
+    python bench.py paging --labels 300 3000 30000
+    python bench.py style --rows 1000000
+    python bench.py kpis --rows 1000000
+    python bench.py filters --rows 1000000
+    python bench.py normalize --rows 250000 --columns 7 28 --threads 1 2 4 8
+    python bench.py cardinality --rows 500000 --cardinality 10 100 1000 10000 100000
+    python bench.py arrow --rows 1000000
+    python bench.py suite --rows 10000 100000 1000000 --duplicate-ratio 0.05 --output suite.json
+    python bench.py suite --rows 100000 --compare suite.json
+    python bench.py startup --runs 5
+
+Synthetic workbooks are written straight as SpreadsheetML (shared strings and
+a <dimension> element, like files saved by Excel) so that generating a
+500k-row benchmark file takes seconds rather than minutes.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+HEADER = ['Style_ID', 'YEAR', 'MONTH', 'Qty', 'Opening_stock', 'Subcategory', 'Season', 'Brand',
+          'Color', 'Heel_Type 1', 'Maketplace', 'Closing_stock', 'MRP', 'Remarks', 'Size']
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/sharedStrings.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/></Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Sales" sheetId="1" r:id="rId1"/></sheets></workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings" '
+    'Target="sharedStrings.xml"/>'
+    '<Relationship Id="rId3" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/></Relationships>'
+)
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+    '<borders count="1"><border/></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+    '</styleSheet>'
+)
+
+
+def _column_letter(index):
+    letters = ''
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+MARKETPLACES = ['Myntra', 'AJIO', ' Nykaa', 'Amazon ', 'Flipkart', 'Tata Cliq']
+
+
+def make_sales_columns(rows, seed=0, styles=20000, brands=40, colors=300, subcategories=60, marketplaces=6,
+                       duplicate_ratio=0.0):
+    """Synthetic Sales sheet columns (raw, untrimmed, mixed case like real exports).
+
+    The cardinality arguments set the number of distinct values per column.
+    Random keys already repeat now and then; duplicate_ratio additionally
+    gives that share of rows the (style, year, month, marketplace) of
+    another row, so the loader has that many more records to merge.
+    """
+    rng = np.random.default_rng(seed)
+
+    def pick(values, size=rows):
+        values = np.asarray(values, dtype=object)
+        return values[rng.integers(0, len(values), size)]
+
+    columns = {
+        'Style_ID': pick([f' st-{i:05d}' if i % 7 else f'ST-{i:05d} ' for i in range(styles)]),
+        'YEAR': rng.integers(2023, 2025, rows),
+        'MONTH': rng.integers(1, 13, rows),
+        'Qty': rng.integers(0, 60, rows),
+        'Opening_stock': rng.integers(0, 400, rows),
+        'Subcategory': pick([f'Subcat {i}' for i in range(subcategories)]),
+        'Season': pick(['SS24', 'AW24', ' ss25', 'AW25 ', 'Core']),
+        'Brand': pick([f'Brand {i}' if i % 3 else f' brand {i} ' for i in range(brands)]),
+        'Color': pick([f'Color {i}' if i % 5 else f'color {i} ' for i in range(colors)]),
+        'Heel_Type 1': pick(['Block', 'Stiletto', 'Wedge', 'Flat', ' kitten']),
+        'Maketplace': pick((MARKETPLACES + [f'Marketplace {i}' for i in range(len(MARKETPLACES), marketplaces)])
+                           [:marketplaces]),
+        'Closing_stock': rng.integers(0, 400, rows),
+        'MRP': np.round(rng.uniform(499, 4999, rows), 2),
+        'Remarks': pick(['', 'ok', 'check', 'promo']),
+        'Size': rng.integers(35, 42, rows),
+    }
+
+    duplicates = int(rows * duplicate_ratio)
+    if duplicates:
+        targets = rng.choice(rows, duplicates, replace=False)
+        sources = rng.integers(0, rows, duplicates)
+        for name in ('Style_ID', 'YEAR', 'MONTH', 'Maketplace'):
+            columns[name][targets] = columns[name][sources]
+    return columns
+
+
+def write_sales_workbook(path, columns):
+    """Write columns as an .xlsx workbook with a single 'Sales' sheet"""
+    names = list(columns)
+    rows = len(next(iter(columns.values())))
+    letters = [_column_letter(i) for i in range(len(names))]
+
+    # Shared string table for every text value, header first as Excel does
+    strings = {}
+    header_codes = [strings.setdefault(name, len(strings)) for name in names]
+    encoded = []
+    for name in names:
+        values = columns[name]
+        if values.dtype == object:
+            codes = np.empty(rows, dtype=np.int64)
+            for i, value in enumerate(values):
+                codes[i] = strings.setdefault(value, len(strings))
+            encoded.append(('s', codes.astype(str)))
+        else:
+            encoded.append(('n', values.astype(str)))
+
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        archive.writestr('_rels/.rels', _ROOT_RELS)
+        archive.writestr('xl/workbook.xml', _WORKBOOK)
+        archive.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+        archive.writestr('xl/styles.xml', _STYLES)
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+            sheet.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                f'<dimension ref="A1:{letters[-1]}{rows + 1}"/><sheetData>'
+            ).encode())
+            header = ''.join(f'<c r="{letters[i]}1" t="s"><v>{code}</v></c>' for i, code in enumerate(header_codes))
+            sheet.write(f'<row r="1">{header}</row>'.encode())
+            for start in range(0, rows, 10000):
+                chunk = []
+                for r in range(start, min(start + 10000, rows)):
+                    cells = ''.join(
+                        f'<c r="{letters[i]}{r + 2}" t="s"><v>{values[r]}</v></c>' if kind == 's'
+                        else f'<c r="{letters[i]}{r + 2}"><v>{values[r]}</v></c>'
+                        for i, (kind, values) in enumerate(encoded)
+                    )
+                    chunk.append(f'<row r="{r + 2}">{cells}</row>')
+                sheet.write(''.join(chunk).encode())
+            sheet.write(b'</sheetData></worksheet>')
+
+        items = ''.join(f'<si><t xml:space="preserve">{escape(str(s))}</t></si>' for s in strings)
+        archive.writestr('xl/sharedStrings.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            f'count="{len(strings)}" uniqueCount="{len(strings)}">{items}</sst>'
+        ))
+
+
+def make_sales_workbook(path, rows, seed=0):
+    write_sales_workbook(path, make_sales_columns(rows, seed))
+    return path
+
+
+def _run_isolated(code, env=None):
+    """Run a snippet in a fresh interpreter; it must leave its result dict in `result`.
+
+    Returns the result plus the child's peak RSS in MB. VmHWM is used where
+    available because ru_maxrss survives execve and would report the parent's
+    footprint.
+    """
+    code += (
+        '\nimport json, resource\n'
+        'peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n'
+        'try:\n'
+        '    with open("/proc/self/status") as status:\n'
+        '        peak_kb = int(next(l for l in status if l.startswith("VmHWM")).split()[1])\n'
+        'except (OSError, StopIteration):\n'
+        '    pass\n'
+        'result.setdefault("peak_rss_mb", round(peak_kb / 1024, 1))\n'
+        'print(json.dumps(result))\n'
+    )
+    out = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True,
+                         cwd=os.path.dirname(os.path.abspath(__file__)),
+                         env=dict(os.environ, **(env or {}))).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def bench_ingest(path, engines=('pandas', 'stream')):
+    """Time each ingestion engine on the same workbook, one process per engine"""
+    results = {}
+    for engine in engines:
+        results[engine] = _run_isolated(
+            'import time\n'
+            'from ingestion import read_sales_sheet, resolve_sales_columns, scan_sales_header\n'
+            'start = time.perf_counter()\n'
+            f'required, additional = resolve_sales_columns(scan_sales_header({path!r}))\n'
+            'usecols = list(dict.fromkeys(list(required.values()) + list(additional.values())))\n'
+            f'df = read_sales_sheet({path!r}, engine={engine!r}, usecols=usecols)\n'
+            'result = {"seconds": round(time.perf_counter() - start, 3), "rows": len(df)}\n'
+        )
+    return results
+
+
+def bench_load(path, chunk_sizes=(0, 250000, 100000)):
+    """Full load_upload (read, clean, collapse duplicates) per chunk size, one process each.
+
+    A chunk size of 0 reads the sheet as a single frame. The disk cache points
+    at an empty directory so every run really loads.
+    """
+    results = {}
+    for chunk_rows in chunk_sizes:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            results[chunk_rows] = _run_isolated(
+                'import logging, time\n'
+                'logging.disable(logging.CRITICAL)\n'
+                'from uploads import load_upload\n'
+                'start = time.perf_counter()\n'
+                f'with open({path!r}, "rb") as f:\n'
+                '    df = load_upload("bench", f)\n'
+                'result = {"seconds": round(time.perf_counter() - start, 3), "rows": len(df)}\n',
+                env={'SALES_CHUNK_ROWS': str(chunk_rows), 'SALES_CACHE_DIR': cache_dir},
+            )
+    return results
+
+
+def bench_months(rows, months, tmp):
+    """A year of monthly workbooks: one hand-merged workbook vs the partitioned dataset store.
+
+    Times a full parse of the merged workbook, a first multi-file load of all
+    but the last month into an empty store, and then the same files plus the
+    last month, which should only parse that one. Each in a fresh process
+    with its own cache directory.
+    """
+    paths = []
+    monthly = []
+    for month in range(1, months + 1):
+        columns = make_sales_columns(rows, seed=month)
+        columns['YEAR'] = np.full(rows, 2024)
+        columns['MONTH'] = np.full(rows, month)
+        path = os.path.join(tmp, f'sales_{month:02d}.xlsx')
+        write_sales_workbook(path, columns)
+        paths.append(path)
+        monthly.append(columns)
+    merged_path = os.path.join(tmp, 'sales_merged.xlsx')
+    write_sales_workbook(merged_path, {name: np.concatenate([columns[name] for columns in monthly])
+                                       for name in HEADER})
+
+    results = {'rows_per_month': rows, 'months': months}
+    with tempfile.TemporaryDirectory() as cache_dir:
+        results['merged_workbook'] = _run_isolated(
+            'import logging, time\n'
+            'logging.disable(logging.CRITICAL)\n'
+            'from uploads import load_upload\n'
+            'start = time.perf_counter()\n'
+            f'with open({merged_path!r}, "rb") as f:\n'
+            '    df = load_upload("bench", f)\n'
+            'result = {"seconds": round(time.perf_counter() - start, 3), "rows": len(df)}\n',
+            env={'SALES_CACHE_DIR': cache_dir},
+        )
+    with tempfile.TemporaryDirectory() as cache_dir:
+        results['store'] = _run_isolated(
+            'import logging, time\n'
+            'logging.disable(logging.CRITICAL)\n'
+            'from disk_cache import content_hash\n'
+            'from uploads import merge_uploads\n'
+            f'paths = {paths!r}\n'
+            'keys = [content_hash(path) for path in paths]\n'
+            'def load(n):\n'
+            '    files = [open(path, "rb") for path in paths[:n]]\n'
+            '    start = time.perf_counter()\n'
+            '    df = merge_uploads(keys[:n], files)\n'
+            '    seconds = time.perf_counter() - start\n'
+            '    for f in files:\n'
+            '        f.close()\n'
+            '    return {"seconds": round(seconds, 3), "rows": len(df)}\n'
+            'result = {"first_months": load(len(paths) - 1), "add_last_month": load(len(paths))}\n',
+            env={'SALES_CACHE_DIR': cache_dir},
+        )
+    return results
+
+
+def bench_formats(rows, tmp):
+    """The same synthetic sales data loaded from xlsx, CSV, Parquet and Feather"""
+    import pandas as pd
+
+    columns = make_sales_columns(rows)
+    frame = pd.DataFrame(columns)
+    paths = {'xlsx': os.path.join(tmp, 'sales.xlsx')}
+    write_sales_workbook(paths['xlsx'], columns)
+    paths['csv'] = os.path.join(tmp, 'sales.csv')
+    frame.to_csv(paths['csv'], index=False)
+    paths['parquet'] = os.path.join(tmp, 'sales.parquet')
+    frame.to_parquet(paths['parquet'], index=False)
+    paths['feather'] = os.path.join(tmp, 'sales.feather')
+    frame.to_feather(paths['feather'])
+    del frame, columns
+
+    from ingestion import CHUNK_ROWS
+
+    results = {}
+    for name, path in paths.items():
+        # Chunked as the dashboard runs by default
+        results[name] = dict(bench_load(path, chunk_sizes=(CHUNK_ROWS,))[CHUNK_ROWS],
+                             file_mb=round(os.path.getsize(path) / 1024 ** 2, 1))
+    return results
+
+
+def _best_of(fn, repeat=5):
+    """Fastest of repeat runs, in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 3)
+
+
+TEXT_DIMENSIONS = {'Style_ID': 'STYLE_ID', 'Subcategory': 'Subcategory', 'Season': 'Season', 'Brand': 'Brand',
+                   'Color': 'Color', 'Heel_Type 1': 'Heel_Type_1', 'Maketplace': 'Maketplace'}
+
+
+def make_sales_frame(rows, seed=0, categorical=True, **shape):
+    """A sales_clean-shaped frame built straight from synthetic columns (no Excel round trip).
+
+    shape takes make_sales_columns' cardinality / duplicate_ratio arguments.
+    """
+    import pandas as pd
+
+    raw = make_sales_columns(rows, seed, **shape)
+    month_names = ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+                   'August', 'September', 'October', 'November', 'December']
+    df = pd.DataFrame({
+        'YEAR': raw['YEAR'],
+        'MONTH': raw['MONTH'],
+        'SALES_QTY': raw['Qty'].astype(np.float64),
+        'OPENING_STOCK': raw['Opening_stock'].astype(np.float64),
+    })
+    for source, name in TEXT_DIMENSIONS.items():
+        df[name] = pd.Series(raw[source]).astype(str).str.strip().str.upper()
+    df['MONTH_NAME'] = np.array(month_names, dtype=object)[raw['MONTH'] - 1]
+    if categorical:
+        for name in list(TEXT_DIMENSIONS.values()) + ['MONTH_NAME']:
+            df[name] = df[name].astype('category')
+    return df
+
+
+def sort_by_period(df):
+    """Rows ordered by (YEAR, MONTH), keeping the existing order inside a period, as the loader returns them"""
+    return df.sort_values(['YEAR', 'MONTH'], kind='stable', ignore_index=True)
+
+
+def bench_categorical(rows):
+    """Memory footprint and per-dimension groupby latency, object vs category columns"""
+    results = {}
+    for label, categorical in (('object', False), ('category', True)):
+        df = make_sales_frame(rows, categorical=categorical)
+        groupby_ms = {
+            name: _best_of(lambda name=name: df.groupby(name, observed=True).agg(
+                {'SALES_QTY': 'sum', 'OPENING_STOCK': 'sum'}))
+            for name in TEXT_DIMENSIONS.values()
+        }
+        results[label] = {
+            'memory_mb': round(df.memory_usage(deep=True).sum() / 1024 ** 2, 1),
+            'groupby_ms': groupby_ms,
+            'groupby_total_ms': round(sum(groupby_ms.values()), 3),
+        }
+    return results
+
+
+def legacy_analyze_with_stock(df, group_col, group_name):
+    """The per-column aggregation the dashboard used to run once per table"""
+    import pandas as pd
+
+    if group_col not in df.columns:
+        return pd.DataFrame()
+    if df[group_col].dtype == 'object':
+        df = df.copy()
+        df[group_col] = df[group_col].astype(str).str.strip().str.upper()
+    grouped = df.groupby(group_col, observed=True).agg({'SALES_QTY': 'sum', 'OPENING_STOCK': 'sum'}).reset_index()
+    grouped['SALES_PERCENTAGE'] = np.where(grouped['OPENING_STOCK'] > 0,
+                                           (grouped['SALES_QTY'] / grouped['OPENING_STOCK']) * 100, 0)
+    grouped = grouped.sort_values('SALES_QTY', ascending=False)
+    return grouped.rename(columns={group_col: group_name})
+
+
+def bench_cube(rows):
+    """Cube build cost and per-rerun table latency, cube queries vs groupbys over the raw rows"""
+    from analytics import CUBE_DIMENSIONS, build_sales_cube, dimension_table, monthly_table, select_periods
+
+    df = make_sales_frame(rows)
+    start = time.perf_counter()
+    cube = build_sales_cube(df)
+    results = {
+        'build_seconds': round(time.perf_counter() - start, 3),
+        'combinations': len(cube['combinations']),
+        'selections': {},
+    }
+
+    year = int(cube['period_year'][0])
+    for label, selected_year, selected_month in (('All/All', 'All', 'All'), (f'{year}/All', year, 'All'),
+                                                 (f'{year}/1', year, 1)):
+        def raw_path():
+            filtered = df
+            if selected_year != 'All':
+                filtered = filtered[filtered['YEAR'] == selected_year]
+            if selected_month != 'All':
+                filtered = filtered[filtered['MONTH'] == selected_month]
+            for dimension in CUBE_DIMENSIONS:
+                legacy_analyze_with_stock(filtered, dimension, dimension)
+            filtered.groupby(['YEAR', 'MONTH', 'MONTH_NAME'], observed=True).agg(
+                {'SALES_QTY': 'sum', 'OPENING_STOCK': 'sum'})
+
+        def cube_path():
+            periods = select_periods(cube, selected_year, selected_month)
+            for dimension in CUBE_DIMENSIONS:
+                dimension_table(cube, dimension, dimension, periods)
+            monthly_table(cube, periods)
+
+        results['selections'][label] = {'raw_ms': _best_of(raw_path), 'cube_ms': _best_of(cube_path)}
+    return results
+
+
+def bench_dedup(rows, extra_columns=20):
+    """Duplicate collapsing: groupby with 'first' per column vs the composite-key kernel.
+
+    Run on the synthetic frame as is (a few percent duplicates), with every
+    duplicate removed up front (the skip path), and widened with
+    extra_columns more 'first' columns.
+    """
+    from dedup import collapse_duplicates
+
+    keys = ['YEAR', 'MONTH', 'STYLE_ID', 'Maketplace']
+    df = make_sales_frame(rows)
+    unique = df.drop_duplicates(keys, ignore_index=True)
+    wide = df.copy()
+    for i in range(extra_columns):
+        wide[f'EXTRA_{i}'] = wide['SALES_QTY'] * i if i % 2 else wide['Color']
+
+    def groupby(frame):
+        agg_dict = {'SALES_QTY': 'sum'}
+        agg_dict.update({col: 'first' for col in frame.columns if col not in keys + ['SALES_QTY']})
+        return frame.groupby(keys, as_index=False, observed=True).agg(agg_dict)
+
+    results = {}
+    for label, frame in (('as_is', df), ('no_duplicates', unique), (f'wide_{len(wide.columns)}_columns', wide)):
+        results[label] = {
+            'rows': len(frame),
+            'duplicates': collapse_duplicates(frame, keys, ['SALES_QTY'])[1]['duplicates_collapsed'],
+            'groupby_ms': _best_of(lambda: groupby(frame), repeat=3),
+            'kernel_ms': _best_of(lambda: collapse_duplicates(frame, keys, ['SALES_QTY']), repeat=3),
+        }
+    return results
+
+
+def bench_paging(cardinalities):
+    """Sending a whole stock table to st.dataframe vs one server-sorted page, per table size.
+
+    Each payload is what st.dataframe serializes: the display copy of the
+    table (labels title-cased) converted to Arrow IPC bytes.
+    """
+    import pandas as pd
+    from streamlit.dataframe_util import convert_pandas_df_to_arrow_bytes
+
+    from paging import PAGE_ROWS, table_page
+
+    rng = np.random.default_rng(0)
+    results = {}
+    for labels in cardinalities:
+        sales = rng.integers(0, 5000, labels).astype(np.float64)
+        stock = rng.integers(0, 20000, labels).astype(np.float64)
+        table = pd.DataFrame({
+            'Color': pd.Categorical([f'COLOR {i}' for i in range(labels)]),
+            'SALES_QTY': sales,
+            'OPENING_STOCK': stock,
+            'SALES_PERCENTAGE': np.where(stock > 0, sales / np.maximum(stock, 1) * 100, 0),
+        })
+
+        def payload(frame):
+            display = frame.copy()
+            display['Color'] = display['Color'].cat.rename_categories(display['Color'].cat.categories.str.title())
+            return convert_pandas_df_to_arrow_bytes(display)
+
+        def page(number):
+            frame = table_page(table, 'SALES_QTY', page=number)
+            frame['Color'] = frame['Color'].cat.remove_unused_categories()
+            return payload(frame)
+
+        last_page = -(-labels // PAGE_ROWS)
+        results[labels] = {
+            'full_table_kb': round(len(payload(table)) / 1024, 1),
+            'full_table_ms': _best_of(lambda: payload(table)),
+            'page_kb': round(len(page(1)) / 1024, 1),
+            'first_page_ms': _best_of(lambda: page(1)),
+            'last_page_ms': _best_of(lambda: page(last_page)),
+        }
+    return results
+
+
+def bench_style(rows):
+    """Single-style monthly history: ad hoc mask + groupby over the frame vs the style index.
+
+    The ad hoc lookup is timed on both an object and a categorical STYLE_ID.
+    The frame is period-sorted, as the loader returns it.
+    """
+    from style_index import build_style_index, search_styles, style_history
+
+    df = sort_by_period(make_sales_frame(rows))
+    text_df = df.assign(STYLE_ID=df['STYLE_ID'].astype(str))
+    style = df['STYLE_ID'].cat.categories[len(df['STYLE_ID'].cat.categories) // 2]
+
+    def adhoc(frame):
+        rows = frame[frame['STYLE_ID'] == style]
+        return rows.groupby(['YEAR', 'MONTH'], observed=True)[['SALES_QTY', 'OPENING_STOCK']].sum()
+
+    start = time.perf_counter()
+    index = build_style_index(df)
+    build_ms = round((time.perf_counter() - start) * 1000, 3)
+    return {
+        'rows': rows,
+        'styles': len(index['labels']),
+        'adhoc_object_ms': _best_of(lambda: adhoc(text_df), repeat=3),
+        'adhoc_categorical_ms': _best_of(lambda: adhoc(df), repeat=3),
+        'index_build_ms': build_ms,
+        'index_history_ms': _best_of(lambda: style_history(df, index, style)),
+        'prefix_search_ms': _best_of(lambda: search_styles(index, style[:6])),
+    }
+
+
+def bench_kpis(rows):
+    """Stock KPIs at load: pandas groupby cumsum / cumcount vs the sorted single-cumsum kernel"""
+    from kpis import add_stock_kpis, sell_through, stock_cover
+
+    keys = ['STYLE_ID', 'Maketplace']
+    df = sort_by_period(make_sales_frame(rows)).drop_duplicates(['YEAR', 'MONTH'] + keys, ignore_index=True)
+    df['Closing_stock'] = df['OPENING_STOCK'] - df['SALES_QTY']
+
+    def groupby(frame):
+        frame = frame.copy()
+        expected = frame['OPENING_STOCK'] - frame['SALES_QTY']
+        frame['CLOSING_STOCK_VARIANCE'] = frame['Closing_stock'] - expected
+        frame['PERIOD'] = frame['YEAR'] * 12 + frame['MONTH']
+        groups = frame.groupby(keys, observed=True)
+        cum_sales = groups['SALES_QTY'].cumsum()
+        months = frame['PERIOD'] - groups['PERIOD'].transform('first') + 1
+        frame['CUM_SELL_THROUGH'] = sell_through(cum_sales, frame['Closing_stock'])
+        frame['STOCK_COVER_MONTHS'] = stock_cover(frame['Closing_stock'], cum_sales, months)
+        return frame
+
+    return {
+        'rows': len(df),
+        'groupby_ms': _best_of(lambda: groupby(df), repeat=3),
+        'kernel_ms': _best_of(lambda: add_stock_kpis(df.copy(), keys, closing_col='Closing_stock'), repeat=3),
+    }
+
+
+def bench_filters(rows):
+    """Sidebar dimension filters: masks over the raw rows vs the cube's bitmap index.
+
+    The mask path compares the text columns (object and categorical) row by
+    row and aggregates what is left; the bitmap path resolves the filter to
+    cube combinations and rebuilds the cube's rollups from them. Both end
+    with every dimension table for all periods.
+    """
+    from analytics import CUBE_DIMENSIONS, build_sales_cube, dimension_table, filter_cube, select_periods
+    from bitmap_index import build_bitmap_index, index_nbytes, matching_rows
+
+    df = make_sales_frame(rows)
+    text_df = df.astype({col: str for col in CUBE_DIMENSIONS})
+    cube = build_sales_cube(df)
+    start = time.perf_counter()
+    index = build_bitmap_index(cube['combinations'], CUBE_DIMENSIONS)
+    build_ms = round((time.perf_counter() - start) * 1000, 3)
+
+    def labels(col, count):
+        return [str(label) for label in cube['rollups'][col]['labels'][:count]]
+
+    cases = {
+        'one_brand': {'Brand': labels('Brand', 1)},
+        'two_marketplaces_five_colors': {'Maketplace': labels('Maketplace', 2), 'Color': labels('Color', 5)},
+        'four_dimensions': {'Maketplace': labels('Maketplace', 3), 'Season': labels('Season', 2),
+                            'Brand': labels('Brand', 10), 'Subcategory': labels('Subcategory', 20)},
+    }
+
+    def masked(frame, filters):
+        mask = np.ones(len(frame), dtype=bool)
+        for col, values in filters.items():
+            mask &= frame[col].isin(values).to_numpy()
+        return {col: legacy_analyze_with_stock(frame[mask], col, col) for col in CUBE_DIMENSIONS}
+
+    def bitmap(filters):
+        filtered = filter_cube(cube, matching_rows(index, filters))
+        periods = select_periods(filtered)
+        return {col: dimension_table(filtered, col, col, periods) for col in CUBE_DIMENSIONS}
+
+    results = {
+        'rows': rows,
+        'combinations': len(cube['combinations']),
+        'index_build_ms': build_ms,
+        'index_mb': round(index_nbytes(index) / 1024 ** 2, 2),
+        'filters': {},
+    }
+    for label, filters in cases.items():
+        results['filters'][label] = {
+            'matching_combinations': len(matching_rows(index, filters)),
+            'object_mask_ms': _best_of(lambda: masked(text_df, filters), repeat=3),
+            'categorical_mask_ms': _best_of(lambda: masked(df, filters), repeat=3),
+            'bitmap_resolve_ms': _best_of(lambda: matching_rows(index, filters)),
+            'bitmap_tables_ms': _best_of(lambda: bitmap(filters)),
+        }
+    return results
+
+
+def bench_normalize(rows, columns, threads):
+    """Trimming and upper-casing the text columns of one chunk: pandas .str
+    methods column by column vs the pyarrow kernels over each thread count.
+
+    The loader's seven text columns are repeated (with other values) up to
+    columns, for wider sheets. Threads beyond the CPU count cannot scale.
+    """
+    import pandas as pd
+
+    from normalize import normalize_columns
+
+    text = {}
+    for copy in range(-(-columns // len(TEXT_DIMENSIONS))):
+        raw = make_sales_columns(rows, seed=copy)
+        for source in TEXT_DIMENSIONS:
+            text[f'{source} {copy}' if copy else source] = (pd.Series(raw[source]), True)
+    text = dict(list(text.items())[:columns])
+
+    def pandas_path():
+        return {name: values.astype(str).str.strip().str.upper().astype('category')
+                for name, (values, categorical) in text.items()}
+
+    results = {
+        'rows': rows,
+        'columns': len(text),
+        'cpu_count': os.cpu_count(),
+        'pandas_ms': _best_of(pandas_path, repeat=3),
+        'arrow_ms': {},
+    }
+    for count in threads:
+        results['arrow_ms'][count] = _best_of(lambda: normalize_columns(text, threads=count), repeat=3)
+    single = results['arrow_ms'][threads[0]]
+    results['speedup_vs_pandas'] = {count: round(results['pandas_ms'] / ms, 2) for count, ms in results['arrow_ms'].items()}
+    results['scaling_vs_first'] = {count: round(single / ms, 2) for count, ms in results['arrow_ms'].items()}
+    return results
+
+
+def bench_cardinality(rows, cardinalities):
+    """Normalizing one text column by its number of distinct values:
+    pandas .str methods over every row vs normalize_text() over the
+    distinct values, with and without a factorization handed in (the loader
+    reuses the one it profiles the column with)."""
+    import pandas as pd
+
+    from normalize import normalize_text
+
+    rng = np.random.default_rng(0)
+    results = {'rows': rows, 'cardinality': {}}
+    for cardinality in cardinalities:
+        spellings = np.array([f' value {i}' if i % 3 else f'VALUE {i} ' for i in range(cardinality)], dtype=object)
+        values = pd.Series(spellings[rng.integers(0, cardinality, rows)])
+        factorized = pd.factorize(values)
+        row_ms = _best_of(lambda: values.astype(str).str.strip().str.upper().astype('category'), repeat=3)
+        distinct_ms = _best_of(lambda: normalize_text(values, categorical=True), repeat=3)
+        reused_ms = _best_of(lambda: normalize_text(values, categorical=True, factorized=factorized), repeat=3)
+        results['cardinality'][cardinality] = {
+            'per_row_ms': row_ms,
+            'distinct_ms': distinct_ms,
+            'distinct_reusing_factorization_ms': reused_ms,
+            'speedup': round(row_ms / distinct_ms, 2),
+            'speedup_reusing_factorization': round(row_ms / reused_ms, 2),
+        }
+    return results
+
+
+def bench_arrow(rows):
+    """Arrow-backed data path for the category tables.
+
+    tables: per dimension, one page of its table as the dashboard sends it,
+    handed to st.dataframe as a pandas frame (converted with
+    pa.Table.from_pandas) vs as the Arrow table built by arrow_table():
+    serialization time and in-memory size. frame: the text columns held as
+    category, as string[pyarrow] and as Arrow dictionaries, with the
+    per-dimension groupbys the tables start from.
+    """
+    import pandas as pd
+    from streamlit.dataframe_util import convert_arrow_table_to_arrow_bytes, convert_pandas_df_to_arrow_bytes
+
+    from paging import arrow_table, table_page
+
+    df = make_sales_frame(rows)
+    results = {'rows': rows, 'tables': {}, 'frame': {}}
+    for name in TEXT_DIMENSIONS.values():
+        table = df.groupby(name, observed=True)[['SALES_QTY', 'OPENING_STOCK']].sum().reset_index()
+        table['SALES_PERCENTAGE'] = np.where(table['OPENING_STOCK'] > 0,
+                                             table['SALES_QTY'] / table['OPENING_STOCK'] * 100, 0)
+        display = table_page(table, 'SALES_QTY')
+        display[name] = display[name].cat.remove_unused_categories()
+        display[name] = display[name].cat.rename_categories(display[name].cat.categories.str.title())
+        pandas_ms = _best_of(lambda: convert_pandas_df_to_arrow_bytes(display), repeat=50)
+        arrow_ms = _best_of(lambda: convert_arrow_table_to_arrow_bytes(arrow_table(display)), repeat=50)
+        results['tables'][name] = {
+            'labels': len(table),
+            'pandas_ms': pandas_ms,
+            'arrow_ms': arrow_ms,
+            'speedup': round(pandas_ms / arrow_ms, 2),
+            'pandas_bytes': int(display.memory_usage(deep=True).sum()),
+            'arrow_bytes': arrow_table(display).nbytes,
+        }
+
+    text_columns = list(TEXT_DIMENSIONS.values()) + ['MONTH_NAME']
+    variants = {
+        'category': lambda: df,
+        'string[pyarrow]': lambda: df.astype({col: 'string[pyarrow]' for col in text_columns}),
+        'arrow_dictionary': lambda: df.astype({col: pd.ArrowDtype(arrow_table(df[[col]]).schema.field(col).type)
+                                               for col in text_columns}),
+    }
+    for label, build in variants.items():
+        start = time.perf_counter()
+        frame = build()
+        convert_ms = round((time.perf_counter() - start) * 1000, 3)
+        groupby_ms = sum(_best_of(lambda name=name: frame.groupby(name, observed=True)[['SALES_QTY', 'OPENING_STOCK']].sum(),
+                                  repeat=3)
+                         for name in TEXT_DIMENSIONS.values())
+        results['frame'][label] = {
+            'text_memory_mb': round(frame[text_columns].memory_usage(deep=True).sum() / 1024 ** 2, 1),
+            'convert_ms': convert_ms if frame is not df else 0,
+            'groupby_total_ms': round(groupby_ms, 3),
+        }
+    return results
+
+
+def _traced(fn):
+    """Wall time (ms) and peak Python-side allocation (MB) of one call"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'ms': round(elapsed * 1000, 3), 'peak_mb': round(peak / 1024 ** 2, 1)}
+
+
+def bench_filter(rows):
+    """Sidebar filter cost: copy + boolean masks over the rows vs the cube's period selection
+    (select_periods() and the record count of the selected periods)"""
+    from analytics import build_sales_cube, select_periods, selected_rows
+
+    df = sort_by_period(make_sales_frame(rows))
+    cube = build_sales_cube(df)
+    year = int(cube['period_year'][0])
+
+    def masked(selected_year, selected_month):
+        filtered = df.copy()
+        if selected_year != 'All':
+            filtered = filtered[filtered['YEAR'] == selected_year]
+        if selected_month != 'All':
+            filtered = filtered[filtered['MONTH'] == selected_month]
+        return filtered
+
+    # Warm up pandas code paths so the first measured call is not penalised
+    masked(year, 1), selected_rows(cube, select_periods(cube, 'All', 1))
+
+    results = {}
+    for selected_year, selected_month in (('All', 'All'), (year, 'All'), (year, 1), ('All', 1)):
+        results[f'{selected_year}/{selected_month}'] = {
+            'copy_and_mask': _traced(lambda: masked(selected_year, selected_month)),
+            'cube_periods': _traced(lambda: selected_rows(cube, select_periods(cube, selected_year, selected_month))),
+        }
+    return results
+
+
+def _stage(stages, name, fn, repeat=1):
+    """Run fn repeat times, record its best wall time and peak RSS under name; return its result"""
+    from instrumentation import peak_rss_mb, reset_peak_rss
+
+    reset_peak_rss()
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = fn()
+        best = min(best, time.perf_counter() - start)
+    stages[name] = {'ms': round(best * 1000, 3), 'peak_rss_mb': peak_rss_mb()}
+    return value
+
+
+def suite_stages(path, rows, seed=0, **shape):
+    """Every stage of one dashboard load and one rerun on the workbook at path, timed separately.
+
+    Meant to run in a fresh process (see bench_suite) with an empty disk
+    cache. The per-rerun stages repeat for their best time, on the selection
+    that touches every period of one month. Dedup is timed on its own on a
+    frame of the same shape, as the loader only collapses chunk by chunk.
+    """
+    import logging
+
+    logging.disable(logging.CRITICAL)
+    from analytics import (CUBE_DIMENSIONS, build_sales_cube, dimension_table, monthly_table, select_periods,
+                           selected_rows)
+    from charts import build_marketplace_figures, build_trend_figure
+    from dedup import collapse_duplicates
+    from style_index import build_style_index
+    from uploads import load_upload
+
+    stages = {}
+    with open(path, 'rb') as f:
+        df = _stage(stages, 'load', lambda: load_upload('bench', f))
+
+    raw = sort_by_period(make_sales_frame(rows, seed, **shape))
+    keys = ['YEAR', 'MONTH', 'STYLE_ID', 'Maketplace']
+    _stage(stages, 'dedup', lambda: collapse_duplicates(raw, keys, ['SALES_QTY', 'OPENING_STOCK']), repeat=3)
+    del raw
+
+    cube = _stage(stages, 'cube', lambda: build_sales_cube(df))
+    style_index = _stage(stages, 'style_index', lambda: build_style_index(df))
+
+    month = int(cube['period_month'][0])
+    _stage(stages, 'filter', lambda: selected_rows(cube, select_periods(cube, 'All', month)), repeat=5)
+    # The per-rerun aggregation the cube replaced, on the rows of the same selection
+    filtered = df[df['MONTH'] == month]
+    _stage(stages, 'analyze_with_stock',
+           lambda: [legacy_analyze_with_stock(filtered, col, col) for col in CUBE_DIMENSIONS], repeat=3)
+    periods = select_periods(cube, 'All', month)
+    tables = _stage(stages, 'dimension_tables',
+                    lambda: {col: dimension_table(cube, col, col, periods) for col in CUBE_DIMENSIONS}, repeat=5)
+    def monthly_data():
+        # As monthly_section() prepares it for the trend chart
+        monthly = monthly_table(cube, select_periods(cube))
+        monthly['Period'] = monthly['MONTH_NAME'].astype(str) + ' ' + monthly['YEAR'].astype(str)
+        return monthly
+
+    monthly = _stage(stages, 'monthly', monthly_data, repeat=5)
+    marketplace_data = tables['Maketplace'].rename(columns={'Maketplace': 'Marketplace'})
+    _stage(stages, 'figures', lambda: (build_marketplace_figures(marketplace_data), build_trend_figure(monthly)),
+           repeat=3)
+    return {
+        'rows': rows,
+        # _stage() resets the high-water mark, so the process peak is the largest stage peak
+        'peak_rss_mb': max((stage['peak_rss_mb'] for stage in stages.values()), default=None),
+        'processed_rows': len(df),
+        'duplicates_collapsed': df.attrs.get('dedup', {}).get('duplicates_collapsed'),
+        'frame_mb': round(df.memory_usage(deep=True).sum() / 1024 ** 2, 1),
+        'combinations': len(cube['combinations']),
+        'styles': len(style_index['labels']),
+        'stages': stages,
+    }
+
+
+def bench_suite(row_counts, tmp, seed=0, **shape):
+    """The full load + rerun path per workbook size, one fresh process (and empty cache) per size"""
+    results = {}
+    for rows in row_counts:
+        path = os.path.join(tmp, f'suite_{rows}.xlsx')
+        start = time.perf_counter()
+        write_sales_workbook(path, make_sales_columns(rows, seed, **shape))
+        generate_seconds = round(time.perf_counter() - start, 3)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            result = _run_isolated(
+                'import bench\n'
+                f'result = bench.suite_stages({path!r}, {rows!r}, {seed!r}, **{shape!r})\n',
+                env={'SALES_CACHE_DIR': cache_dir},
+            )
+        result['file_mb'] = round(os.path.getsize(path) / 1024 ** 2, 1)
+        result['generate_seconds'] = generate_seconds
+        os.remove(path)
+        results[rows] = result
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], check=True, capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_suites(baseline, current):
+    """Per size and stage: current / baseline wall time (above 1 is slower), for the sizes both ran"""
+    ratios = {}
+    for rows, result in current['sizes'].items():
+        before = baseline['sizes'].get(rows)
+        if before is None:
+            continue
+        ratios[rows] = {
+            stage: round(timing['ms'] / before['stages'][stage]['ms'], 2)
+            for stage, timing in result['stages'].items()
+            if before['stages'].get(stage, {}).get('ms')
+        }
+    return ratios
+
+
+# Modules the landing page should render without (streamlit itself brings plotly.graph_objects)
+DEFERRED_MODULES = ['pandas', 'numpy', 'pyarrow', 'plotly.express', 'openpyxl']
+
+
+def bench_startup(runs=5):
+    """Cold start: time to first paint of the landing page (no upload), one fresh process per run.
+
+    Each run imports streamlit and renders app.py once through AppTest, as
+    the server does for a new session. Reported: medians, the heavy modules
+    loaded by then, and what importing the deferred ones costs afterwards
+    (paid with the first upload instead).
+    """
+    timings = []
+    for _ in range(runs):
+        result = _run_isolated(
+            'import logging, sys, time\n'
+            'start = time.perf_counter()\n'
+            'import streamlit\n'
+            'from streamlit.testing.v1 import AppTest\n'
+            'import_ms = (time.perf_counter() - start) * 1000\n'
+            'logging.disable(logging.CRITICAL)\n'
+            'at = AppTest.from_file("app.py", default_timeout=60)\n'
+            'start = time.perf_counter()\n'
+            'at.run()\n'
+            'paint_ms = (time.perf_counter() - start) * 1000\n'
+            'from instrumentation import rss_mb\n'
+            'rss_at_paint = rss_mb()\n'
+            f'loaded = [name for name in {DEFERRED_MODULES!r} if name in sys.modules]\n'
+            'start = time.perf_counter()\n'
+            f'for name in {DEFERRED_MODULES!r}:\n'
+            '    __import__(name)\n'
+            'deferred_ms = (time.perf_counter() - start) * 1000\n'
+            'result = {"import_streamlit_ms": import_ms, "first_paint_ms": paint_ms, "loaded": loaded,\n'
+            '          "rss_mb": rss_at_paint, "deferred_import_ms": deferred_ms, "failed": bool(at.exception)}\n'
+        )
+        timings.append(result)
+
+    def median(name):
+        return round(float(np.median([run[name] for run in timings])), 1)
+
+    return {
+        'runs': runs,
+        'import_streamlit_ms': median('import_streamlit_ms'),
+        'first_paint_ms': median('first_paint_ms'),
+        'to_first_paint_ms': round(median('import_streamlit_ms') + median('first_paint_ms'), 1),
+        'deferred_import_ms': median('deferred_import_ms'),
+        'loaded_at_first_paint': timings[0]['loaded'],
+        'rss_at_first_paint_mb': median('rss_mb') if timings[0]['rss_mb'] is not None else None,
+        'failed_runs': sum(run['failed'] for run in timings),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    ingest = sub.add_parser('ingest', help='compare Excel ingestion engines')
+    ingest.add_argument('--rows', type=int, default=500000)
+    ingest.add_argument('--workbook', help='existing workbook to read instead of a synthetic one')
+
+    categorical = sub.add_parser('categorical', help='object vs category columns: memory and groupby latency')
+    categorical.add_argument('--rows', type=int, default=500000)
+
+    cube = sub.add_parser('cube', help='cube build cost and per-rerun table latency vs raw groupbys')
+    cube.add_argument('--rows', type=int, default=500000)
+
+    filter_parser = sub.add_parser('filter', help='sidebar filter cost: copy + masks vs the cube period selection')
+    filter_parser.add_argument('--rows', type=int, default=1000000)
+
+    load = sub.add_parser('load', help='peak memory of the full loader per chunk size')
+    load.add_argument('--rows', type=int, default=1000000)
+    load.add_argument('--workbook', help='existing workbook to read instead of a synthetic one')
+    load.add_argument('--chunk-rows', type=int, nargs='+', default=[0, 250000, 100000])
+
+    formats = sub.add_parser('formats', help='load time and memory per upload format')
+    formats.add_argument('--rows', type=int, default=500000)
+
+    dedup = sub.add_parser('dedup', help="duplicate collapsing: groupby 'first' vs composite-key kernel")
+    dedup.add_argument('--rows', type=int, default=500000)
+
+    months = sub.add_parser('months', help='monthly workbooks: merged workbook vs incremental dataset store')
+    months.add_argument('--rows', type=int, default=20000, help='rows per monthly workbook')
+    months.add_argument('--months', type=int, default=12)
+
+    paging = sub.add_parser('paging', help='table payload: whole table vs one server-sorted page')
+    paging.add_argument('--labels', type=int, nargs='+', default=[300, 3000, 30000])
+
+    style = sub.add_parser('style', help='single-style history: ad hoc filtering vs the style index')
+    style.add_argument('--rows', type=int, default=1000000)
+
+    kpis = sub.add_parser('kpis', help='stock KPIs: pandas grouped cumsums vs the sorted cumsum kernel')
+    kpis.add_argument('--rows', type=int, default=1000000)
+
+    suite = sub.add_parser('suite', help='per-stage time and peak memory of the load and rerun path, as JSON')
+    suite.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000])
+    suite.add_argument('--seed', type=int, default=0)
+    suite.add_argument('--styles', type=int, default=20000)
+    suite.add_argument('--brands', type=int, default=40)
+    suite.add_argument('--colors', type=int, default=300)
+    suite.add_argument('--subcategories', type=int, default=60)
+    suite.add_argument('--marketplaces', type=int, default=6)
+    suite.add_argument('--duplicate-ratio', type=float, default=0.0,
+                       help='share of rows repeating the key of another row')
+    suite.add_argument('--output', help='also write the results to this JSON file')
+    suite.add_argument('--compare', help='results file of an earlier run to report time ratios against')
+
+    startup = sub.add_parser('startup', help='cold start: time to first paint of the landing page')
+    startup.add_argument('--runs', type=int, default=5)
+
+    filters = sub.add_parser('filters', help='dimension filters: row masks vs the bitmap index over cube combinations')
+    filters.add_argument('--rows', type=int, default=1000000)
+
+    normalize = sub.add_parser('normalize', help='text column normalization: pandas vs pyarrow kernels over threads')
+    normalize.add_argument('--rows', type=int, default=250000, help='rows per chunk (SALES_CHUNK_ROWS)')
+    normalize.add_argument('--columns', type=int, nargs='+', default=[7, 28])
+    normalize.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8])
+
+    cardinality = sub.add_parser('cardinality', help='text normalization per row vs per distinct value')
+    cardinality.add_argument('--rows', type=int, default=500000)
+    cardinality.add_argument('--cardinality', type=int, nargs='+', default=[10, 100, 1000, 10000, 100000])
+
+    arrow = sub.add_parser('arrow', help='category tables sent as pandas frames vs Arrow tables; Arrow-backed frame')
+    arrow.add_argument('--rows', type=int, default=1000000)
+
+    args = parser.parse_args()
+
+    if args.command == 'ingest':
+        with tempfile.TemporaryDirectory() as tmp:
+            path = args.workbook or make_sales_workbook(os.path.join(tmp, 'sales.xlsx'), args.rows)
+            print(json.dumps(bench_ingest(path), indent=2))
+    elif args.command == 'categorical':
+        print(json.dumps(bench_categorical(args.rows), indent=2))
+    elif args.command == 'cube':
+        print(json.dumps(bench_cube(args.rows), indent=2))
+    elif args.command == 'filter':
+        print(json.dumps(bench_filter(args.rows), indent=2))
+    elif args.command == 'load':
+        with tempfile.TemporaryDirectory() as tmp:
+            path = args.workbook or make_sales_workbook(os.path.join(tmp, 'sales.xlsx'), args.rows)
+            print(json.dumps(bench_load(path, args.chunk_rows), indent=2))
+    elif args.command == 'formats':
+        with tempfile.TemporaryDirectory() as tmp:
+            print(json.dumps(bench_formats(args.rows, tmp), indent=2))
+    elif args.command == 'months':
+        with tempfile.TemporaryDirectory() as tmp:
+            print(json.dumps(bench_months(args.rows, args.months, tmp), indent=2))
+    elif args.command == 'paging':
+        print(json.dumps(bench_paging(args.labels), indent=2))
+    elif args.command == 'style':
+        print(json.dumps(bench_style(args.rows), indent=2))
+    elif args.command == 'kpis':
+        print(json.dumps(bench_kpis(args.rows), indent=2))
+    elif args.command == 'filters':
+        print(json.dumps(bench_filters(args.rows), indent=2))
+    elif args.command == 'cardinality':
+        print(json.dumps(bench_cardinality(args.rows, args.cardinality), indent=2))
+    elif args.command == 'arrow':
+        print(json.dumps(bench_arrow(args.rows), indent=2))
+    elif args.command == 'normalize':
+        print(json.dumps([bench_normalize(args.rows, columns, args.threads) for columns in args.columns], indent=2))
+    elif args.command == 'dedup':
+        print(json.dumps(bench_dedup(args.rows), indent=2))
+    elif args.command == 'startup':
+        print(json.dumps(bench_startup(args.runs), indent=2))
+    elif args.command == 'suite':
+        shape = {'styles': args.styles, 'brands': args.brands, 'colors': args.colors,
+                 'subcategories': args.subcategories, 'marketplaces': args.marketplaces,
+                 'duplicate_ratio': args.duplicate_ratio}
+        with tempfile.TemporaryDirectory() as tmp:
+            sizes = bench_suite(args.rows, tmp, seed=args.seed, **shape)
+        # JSON object keys are strings: keep them that way so saved and fresh results compare alike
+        results = {'commit': _git_commit(), 'seed': args.seed, 'shape': shape,
+                   'sizes': {str(rows): result for rows, result in sizes.items()}}
+        if args.compare:
+            with open(args.compare) as f:
+                results['vs_baseline'] = compare_suites(json.load(f), results)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(results, f, indent=2)
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
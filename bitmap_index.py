@@ -0,0 +1,103 @@
+"""Per-value row bitmaps for the sidebar's dimension filters.
+
+build_bitmap_index() records, once per upload, which rows hold each value of
+each dimension. A filter (any values of any dimensions) is then answered
+with bitwise operations instead of comparing strings over the whole column:
+the rows of the chosen values of one dimension are ORed together, and the
+dimensions are ANDed.
+
+Each value's rows are kept like a Roaring bitmap container: a packed bitset
+(np.packbits, one bit per row) when the value is common, or its sorted row
+positions when it covers under 1/32 of the rows, which is then the smaller of
+the two. A dimension therefore costs at most 4 bytes per row however many
+values it has.
+"""
+import numpy as np
+import pandas as pd
+
+# A value on fewer than 1 in _SPARSE_RATIO rows stores positions (4 bytes each) instead of n / 8 bytes of bitset
+_SPARSE_RATIO = 32
+
+
+def _codes_and_labels(values):
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), pd.Index(values.cat.categories)
+    codes, labels = pd.factorize(values, sort=True)
+    return codes, pd.Index(labels)
+
+
+def build_bitmap_index(df, columns):
+    """Bitmaps of every value of every column of df that exists.
+
+    Returns {'rows': len(df), 'columns': {column: {'labels', 'bitmaps'}}},
+    where bitmaps[i] holds the rows of labels[i]: a packed uint8 bitset or
+    an int32 array of row positions.
+    """
+    n = len(df)
+    index = {'rows': n, 'columns': {}}
+    for column in columns:
+        if column not in df.columns:
+            continue
+        codes, labels = _codes_and_labels(df[column])
+        valid = codes >= 0
+        # Row positions grouped by value, ascending within each value
+        positions = np.flatnonzero(valid)[np.argsort(codes[valid], kind='stable')].astype(np.int32)
+        bounds = np.concatenate(([0], np.cumsum(np.bincount(codes[valid], minlength=len(labels)))))
+
+        bitmaps = []
+        for i in range(len(labels)):
+            rows = positions[bounds[i]:bounds[i + 1]]
+            if len(rows) * _SPARSE_RATIO < n:
+                bitmaps.append(rows)
+            else:
+                bitmaps.append(_pack(rows, n))
+        index['columns'][column] = {'labels': labels, 'bitmaps': bitmaps}
+    return index
+
+
+def _pack(positions, n):
+    bits = np.zeros(n, dtype=bool)
+    bits[positions] = True
+    return np.packbits(bits)
+
+
+def _union(column_index, values, n):
+    """Packed bitset of the rows holding any of values"""
+    labels = column_index['labels']
+    codes = labels.get_indexer(list(values))
+    packed = np.zeros((n + 7) // 8, dtype=np.uint8)
+    sparse = []
+    for code in codes[codes >= 0]:
+        bitmap = column_index['bitmaps'][code]
+        if bitmap.dtype == np.uint8:
+            packed |= bitmap
+        else:
+            sparse.append(bitmap)
+    if sparse:
+        packed |= _pack(np.concatenate(sparse), n)
+    return packed
+
+
+def matching_rows(index, filters):
+    """Positions of the rows matching every filter, in row order.
+
+    filters maps a column to the values to keep (empty or missing: keep
+    all). Columns the index does not hold are ignored, and values it has
+    never seen match nothing.
+    """
+    n = index['rows']
+    selected = None
+    for column, values in filters.items():
+        column_index = index['columns'].get(column)
+        if column_index is None or not len(values):
+            continue
+        packed = _union(column_index, values, n)
+        selected = packed if selected is None else np.bitwise_and(selected, packed, out=selected)
+    if selected is None:
+        return np.arange(n)
+    return np.flatnonzero(np.unpackbits(selected, count=n))
+
+
+def index_nbytes(index):
+    """Memory held by the bitmaps"""
+    return sum(bitmap.nbytes for column_index in index['columns'].values() for bitmap in column_index['bitmaps'])
@@ -0,0 +1,108 @@
+"""Plotly figures of the dashboard, built from the tables of the sales cube.
+
+Plain functions of their input tables, without Streamlit: the app caches
+them per selection and bench.py times them.
+"""
+
+
+def build_marketplace_figures(marketplace_data):
+    """Sales Quantity and Sales % bar charts by marketplace"""
+    import plotly.express as px
+
+    # Sales Quantity chart
+    fig_sales = px.bar(
+        marketplace_data,
+        x='Marketplace',
+        y='SALES_QTY',
+        color='SALES_QTY',
+        color_continuous_scale='viridis',
+        title=f"Sales Quantity by Marketplace",
+        text='SALES_QTY'
+    )
+    fig_sales.update_traces(
+        texttemplate='%{text:,.0f}',
+        textposition='outside'
+    )
+    fig_sales.update_layout(
+        height=400,
+        showlegend=False,
+        xaxis_title="Marketplace",
+        yaxis_title="Sales Quantity",
+        xaxis={'categoryorder': 'total descending', 'tickangle': 45},
+        title_x=0.5,
+        hovermode='x unified'
+    )
+
+    # Sales Percentage chart
+    fig_percent = px.bar(
+        marketplace_data,
+        x='Marketplace',
+        y='SALES_PERCENTAGE',
+        color='SALES_PERCENTAGE',
+        color_continuous_scale='RdYlGn',
+        title=f"Sales % by Marketplace",
+        text='SALES_PERCENTAGE'
+    )
+    fig_percent.update_traces(
+        texttemplate='%{text:.1f}%',
+        textposition='outside'
+    )
+    fig_percent.update_layout(
+        height=400,
+        showlegend=False,
+        xaxis_title="Marketplace",
+        yaxis_title="Sales Percentage (%)",
+        xaxis={'categoryorder': 'total descending', 'tickangle': 45},
+        title_x=0.5,
+        hovermode='x unified'
+    )
+
+    return fig_sales, fig_percent
+
+
+def build_trend_figure(monthly_data):
+    """Dual-axis monthly trend: Sales Quantity bars with the Sales % line"""
+    import plotly.graph_objects as go
+
+    # Create dual-axis chart
+    fig_monthly = go.Figure()
+
+    # Add Sales Quantity bars
+    fig_monthly.add_trace(go.Bar(
+        x=monthly_data['Period'],
+        y=monthly_data['SALES_QTY'],
+        name='Sales Quantity',
+        marker_color='#1f77b4',
+        yaxis='y1'
+    ))
+
+    # Add Sales Percentage line
+    fig_monthly.add_trace(go.Scatter(
+        x=monthly_data['Period'],
+        y=monthly_data['SALES_PERCENTAGE'],
+        name='Sales %',
+        mode='lines+markers',
+        line=dict(color='#ff7f0e', width=3),
+        marker=dict(size=10),
+        yaxis='y2'
+    ))
+
+    # Update layout for dual y-axes
+    fig_monthly.update_layout(
+        height=500,
+        xaxis_title="Month",
+        yaxis_title="Sales Quantity",
+        yaxis2=dict(
+            title="Sales Percentage (%)",
+            overlaying='y',
+            side='right',
+            range=[0, max(monthly_data['SALES_PERCENTAGE'].max() * 1.2, 100)],
+            tickformat='.0f%'
+        ),
+        hovermode='x unified',
+        template='plotly_white',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        xaxis={'tickangle': 45}
+    )
+
+    return fig_monthly
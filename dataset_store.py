@@ -0,0 +1,194 @@
+"""Append-only store of processed uploads, partitioned by period.
+
+Every processed upload is written once, as one Parquet file per (YEAR,
+MONTH) it contains:
+
+    <store>/v<CACHE_VERSION>/YEAR=2024/MONTH=3/<upload hash>.parquet
+
+plus a small JSON manifest per upload listing its partitions and the
+statistics the loader attached to it (duplicates merged, data quality).
+The manifest is written last, so an upload only counts as stored once all
+its partitions are on disk. Uploading a set of monthly workbooks then only
+parses the ones the store has not seen; the others are read back from
+their partitions.
+
+The store counts against the disk cache's size budget: disk_cache.evict
+removes least recently used uploads from it as a whole, and drops the
+partitions of other CACHE_VERSIONs.
+"""
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from disk_cache import CACHE_DIR, CACHE_VERSION
+from ingestion import concat_chunks
+
+STORE_DIR = os.environ.get('SALES_STORE_DIR', os.path.join(CACHE_DIR, 'store'))
+
+_MANIFESTS = 'uploads'
+
+
+def _root(store_dir):
+    # Versioned like the disk cache: partitions written by older loader code are never read
+    return os.path.join(store_dir or STORE_DIR, f'v{CACHE_VERSION}')
+
+
+def _partition_path(root, year, month, key):
+    return os.path.join(root, f'YEAR={int(year)}', f'MONTH={int(month)}', f'{key}.parquet')
+
+
+def _manifest_path(root, key):
+    return os.path.join(root, _MANIFESTS, f'{key}.json')
+
+
+def _period_ranges(df):
+    """(YEAR, MONTH, start, stop) of every period's block of rows in a period-sorted frame"""
+    if len(df) == 0:
+        return []
+    years = df['YEAR'].to_numpy()
+    months = df['MONTH'].to_numpy()
+    # A new period starts wherever YEAR or MONTH differs from the row above
+    changed = (years[1:] != years[:-1]) | (months[1:] != months[:-1])
+    starts = np.concatenate(([0], np.flatnonzero(changed) + 1))
+    stops = np.append(starts[1:], len(df))
+    return zip(years[starts], months[starts], starts, stops)
+
+
+def _write_atomic(path, write):
+    """Write path through a temporary file in the same directory, so readers never see a partial file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _dump_json(obj, path):
+    with open(path, 'w') as f:
+        json.dump(obj, f)
+
+
+def read_manifest(key, store_dir=None):
+    """Manifest of a stored upload, or None if the store does not hold it"""
+    try:
+        with open(_manifest_path(_root(store_dir), key)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def has_upload(key, store_dir=None):
+    return read_manifest(key, store_dir) is not None
+
+
+def stored_uploads(store_dir=None):
+    """(last used, bytes on disk, key) of every upload in the store"""
+    root = _root(store_dir)
+    try:
+        names = os.listdir(os.path.join(root, _MANIFESTS))
+    except FileNotFoundError:
+        return []
+    uploads = []
+    for name in names:
+        key, ext = os.path.splitext(name)
+        if ext != '.json':
+            continue
+        manifest = read_manifest(key, store_dir)
+        if manifest is None:
+            continue
+        try:
+            stat = os.stat(_manifest_path(root, key))
+        except FileNotFoundError:
+            continue
+        used, size = stat.st_mtime, stat.st_size
+        for year, month, _ in manifest['partitions']:
+            try:
+                size += os.stat(_partition_path(root, year, month, key)).st_size
+            except FileNotFoundError:
+                pass
+        uploads.append((used, size, key))
+    return uploads
+
+
+def remove_upload(key, store_dir=None):
+    """Delete a stored upload: the manifest first, so it stops counting as stored before its partitions go"""
+    root = _root(store_dir)
+    manifest = read_manifest(key, store_dir)
+    if manifest is None:
+        return
+    for path in [_manifest_path(root, key)] + [_partition_path(root, year, month, key)
+                                               for year, month, _ in manifest['partitions']]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def prune_versions(store_dir=None):
+    """Delete the store directories written under other CACHE_VERSIONs (never read again)"""
+    store_dir = store_dir or STORE_DIR
+    current = os.path.basename(_root(store_dir))
+    try:
+        names = os.listdir(store_dir)
+    except FileNotFoundError:
+        return
+    for name in names:
+        if name != current and name.startswith('v') and name[1:].isdigit():
+            shutil.rmtree(os.path.join(store_dir, name), ignore_errors=True)
+
+
+def append_upload(key, df, store_dir=None):
+    """Store a processed (period-sorted) upload under key, one file per period.
+
+    Returns the manifest. Stores nothing new when key is already present.
+    """
+    root = _root(store_dir)
+    manifest = read_manifest(key, store_dir)
+    if manifest is not None:
+        return manifest
+
+    partitions = []
+    for year, month, start, stop in _period_ranges(df):
+        part = df.iloc[start:stop]
+        _write_atomic(_partition_path(root, year, month, key),
+                      lambda path: part.to_parquet(path, index=False))
+        partitions.append([int(year), int(month), int(stop - start)])
+
+    manifest = {'key': key, 'partitions': partitions, 'attrs': df.attrs}
+    _write_atomic(_manifest_path(root, key),
+                  lambda path: _dump_json(manifest, path))
+    return manifest
+
+
+def read_uploads(keys, store_dir=None):
+    """Union of the stored uploads keys, ordered by (YEAR, MONTH) and then by upload.
+
+    Only the partition files of those uploads are opened. Rows are returned
+    as stored: duplicates across uploads are left for the caller to merge.
+    The per-upload manifests are attached as attrs['uploads'].
+    """
+    root = _root(store_dir)
+    manifests = []
+    paths = []
+    for key in keys:
+        manifest = read_manifest(key, store_dir)
+        if manifest is None:
+            raise KeyError(f'upload {key} is not in the store')
+        manifests.append(manifest)
+        # Mark as recently used, for eviction
+        os.utime(_manifest_path(root, key))
+        for year, month, _ in manifest['partitions']:
+            paths.append(((year, month, len(manifests)), _partition_path(root, year, month, key)))
+
+    frames = [pd.read_parquet(path) for _, path in sorted(paths)]
+    df = concat_chunks(frames) if frames else pd.DataFrame()
+    df.attrs = {'uploads': manifests}
+    return df
@@ -0,0 +1,124 @@
+"""Collapsing of duplicate sales records.
+
+Rows sharing the same key values (style, year, month and marketplace) are
+merged into one: quantities are summed and every other column keeps its
+first non-missing value, exactly like
+groupby(keys, observed=True).agg({...: 'sum', other: 'first'}).
+
+Instead of a multi-key groupby, the key columns are folded into a single
+int64 composite key (category codes / factorized values), which is sorted
+once. Equal neighbours in the sorted key are duplicates: when there are
+none the groupby is skipped altogether, otherwise sums are taken with
+np.add.reduceat over the sorted runs and "first" is a positional gather.
+"""
+import numpy as np
+import pandas as pd
+
+# Re-densify the composite key before the next key column could overflow int64
+_KEY_LIMIT = 1 << 62
+
+
+def _key_codes(values):
+    """Sorted-order integer codes of a key column and their cardinality (-1 marks a missing value)"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy().astype(np.int64), len(values.cat.categories)
+    codes, uniques = pd.factorize(values, sort=True)
+    return codes.astype(np.int64, copy=False), len(uniques)
+
+
+def composite_key(df, keys):
+    """One int64 per row that sorts like the rows sorted by keys.
+
+    Returns the key, a mask of rows with a missing key value and the number
+    of distinct key values the key can take (its span).
+    """
+    key = np.zeros(len(df), dtype=np.int64)
+    missing = np.zeros(len(df), dtype=bool)
+    span = 1
+    for col in keys:
+        codes, cardinality = _key_codes(df[col])
+        cardinality = max(cardinality, 1)
+        missing |= codes < 0
+        if span * cardinality >= _KEY_LIMIT:
+            # Replace the key so far by its rank among the distinct values seen
+            uniques, key = np.unique(key, return_inverse=True)
+            key = key.astype(np.int64, copy=False)
+            span = len(uniques)
+        key = key * cardinality + np.maximum(codes, 0)
+        span *= cardinality
+    return key, missing, span
+
+
+def stable_order(key, span):
+    """Stable argsort of key.
+
+    Ties are broken by row position folded into the key itself, which lets
+    the much faster unstable sort be used whenever that still fits in int64.
+    """
+    n = len(key)
+    if n and span * n < _KEY_LIMIT:
+        return np.argsort(key * n + np.arange(n, dtype=np.int64))
+    return np.argsort(key, kind='stable')
+
+
+def collapse_duplicates(df, keys, sum_cols):
+    """Merge rows with equal keys; returns (frame, stats).
+
+    The frame is ordered by keys, as a groupby would return it, with a fresh
+    RangeIndex; rows with a missing key value are dropped, as groupby does.
+    stats counts rows_in, missing_key_rows and duplicates_collapsed.
+    """
+    key, missing, span = composite_key(df, keys)
+    n_missing = int(missing.sum())
+    rows = np.flatnonzero(~missing) if n_missing else None
+    if rows is not None:
+        key = key[rows]
+
+    order = stable_order(key, span)
+    sorted_key = key[order]
+    if rows is not None:
+        order = rows[order]
+
+    if len(sorted_key):
+        starts = np.flatnonzero(np.concatenate(([True], sorted_key[1:] != sorted_key[:-1])))
+    else:
+        starts = np.array([], dtype=np.int64)
+
+    stats = {
+        'rows_in': len(df),
+        'missing_key_rows': n_missing,
+        'duplicates_collapsed': len(order) - len(starts),
+    }
+
+    if len(starts) == len(order):
+        # No duplicates: at most a reorder, no aggregation at all (a missing
+        # quantity still sums to 0, as in groupby().sum())
+        missing_sums = {col: df[col].fillna(0) for col in sum_cols if df[col].hasnans}
+        if missing_sums:
+            df = df.assign(**missing_sums)
+        if n_missing == 0 and (len(order) < 2 or np.all(order[1:] > order[:-1])):
+            return df, stats
+        return df.take(order).reset_index(drop=True), stats
+
+    first_rows = order[starts]
+    collapsed = df.take(first_rows).reset_index(drop=True)
+
+    for col in sum_cols:
+        values = df[col].to_numpy()[order]
+        if values.dtype.kind == 'f' and np.isnan(values).any():
+            # groupby().sum() skips missing values
+            values = np.nan_to_num(values)
+        collapsed[col] = np.add.reduceat(values, starts)
+
+    # 'first' is the first non-missing value of each group, not simply its first row
+    group_of = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(order))))
+    for col in df.columns:
+        if col in keys or col in sum_cols or not collapsed[col].hasnans:
+            continue
+        present = np.flatnonzero(df[col].notna().to_numpy()[order])
+        groups, first_present = np.unique(group_of[present], return_index=True)
+        chosen = first_rows.copy()
+        chosen[groups] = order[present[first_present]]
+        collapsed[col] = df[col].take(chosen).reset_index(drop=True)
+
+    return collapsed, stats
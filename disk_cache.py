@@ -0,0 +1,148 @@
+"""Persistent on-disk cache of processed uploads.
+
+Processed frames are stored as Parquet files named after the SHA-256 of the
+uploaded bytes, so a known workbook is served from disk even after a server
+restart. The cache directory, together with the dataset store, is kept
+under a total size budget by evicting the least recently used entries (file
+mtime is refreshed on every hit).
+"""
+import functools
+import hashlib
+import os
+import tempfile
+
+import pandas as pd
+
+CACHE_DIR = os.environ.get('SALES_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'sales_dashboard'))
+CACHE_MAX_BYTES = int(os.environ.get('SALES_CACHE_MAX_BYTES', 2 * 1024 ** 3))
+
+# Bump whenever load_sales changes the shape or content of its
+# output so that entries written by older code are never served
+CACHE_VERSION = 9
+
+_SUFFIX = '.parquet'
+
+
+def content_hash(source):
+    """SHA-256 hex digest of an upload given as bytes, a file-like object or a path"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(source).hexdigest()
+    if hasattr(source, 'getvalue'):
+        return hashlib.sha256(source.getvalue()).hexdigest()
+
+    digest = hashlib.sha256()
+    if hasattr(source, 'read'):
+        source.seek(0)
+        for block in iter(lambda: source.read(1 << 20), b''):
+            digest.update(block)
+        source.seek(0)
+    else:
+        with open(source, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def _entry_path(key, cache_dir):
+    return os.path.join(cache_dir, f'{key}-v{CACHE_VERSION}{_SUFFIX}')
+
+
+def has_frame(key, cache_dir=None):
+    """Whether the cache holds an entry for key, without reading it"""
+    return os.path.exists(_entry_path(key, cache_dir or CACHE_DIR))
+
+
+def load_frame(key, cache_dir=None):
+    """Return the cached frame for key, or None on a miss"""
+    path = _entry_path(key, cache_dir or CACHE_DIR)
+    if not os.path.exists(path):
+        return None
+    try:
+        df = pd.read_parquet(path)
+    except Exception:
+        # Truncated or unreadable entry: drop it and treat as a miss
+        _remove(path)
+        return None
+    # Mark as recently used
+    os.utime(path)
+    return df
+
+
+def discard_frame(key, cache_dir=None):
+    """Delete the entry for key, if any"""
+    _remove(_entry_path(key, cache_dir or CACHE_DIR))
+
+
+def store_frame(key, df, cache_dir=None, max_bytes=None):
+    """Write df under key and evict old entries past the size budget.
+
+    Returns whether the entry is on disk afterwards: False when the write
+    failed or when the entry alone is past the budget. Failures are
+    swallowed: the cache must never break a load.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    path = _entry_path(key, cache_dir)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to a temporary file first so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        os.close(fd)
+        try:
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        finally:
+            _remove(tmp_path)
+    except Exception:
+        return False
+    evict(cache_dir, max_bytes)
+    return os.path.exists(path)
+
+
+def evict(cache_dir=None, max_bytes=None, store_dir=None):
+    """Delete least recently used entries until the cache and the dataset store fit in max_bytes.
+
+    Entries and store directories of other CACHE_VERSIONs are deleted outright;
+    a stored upload is evicted as a whole.
+    """
+    # Imported here: the dataset store itself builds on this module
+    import dataset_store
+
+    cache_dir = cache_dir or CACHE_DIR
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+
+    entries = []
+    try:
+        names = os.listdir(cache_dir)
+    except FileNotFoundError:
+        names = []
+    current = f'-v{CACHE_VERSION}{_SUFFIX}'
+    for name in names:
+        if not name.endswith(_SUFFIX):
+            continue
+        path = os.path.join(cache_dir, name)
+        if not name.endswith(current):
+            _remove(path)
+            continue
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, functools.partial(_remove, path)))
+
+    dataset_store.prune_versions(store_dir)
+    for used, size, key in dataset_store.stored_uploads(store_dir):
+        entries.append((used, size, functools.partial(dataset_store.remove_upload, key, store_dir)))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, remove in sorted(entries, key=lambda entry: entry[0]):
+        if total <= max_bytes:
+            break
+        remove()
+        total -= size
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,184 @@
+"""Background parsing of uploads in a pool of worker processes.
+
+Parsing a large workbook takes seconds to minutes of CPU. Run in the
+Streamlit script thread it holds up the whole session for that long, and
+uploads from several analysts queue up behind one another in the same
+process. submit_upload() hands the parse to a process pool instead and
+returns at once: the page polls job_status() for progress and, once the job
+is done, reads the processed frame back from the disk cache the worker
+stored it in (or, when the worker could not store it, takes the frame the
+job returned: take_frame()).
+
+Jobs are keyed by the upload's content hash in a registry shared by every
+session of the server process, so a workbook uploaded again while its first
+parse is still running joins that job instead of starting another one.
+Workers report progress through a small JSON file per job, rewritten after
+every batch of rows.
+
+SALES_INGEST_WORKERS sets the number of worker processes (default: one per
+CPU), started from a fork server; 0 turns the pool off and uploads are parsed in the script thread.
+Each worker gets its share of the CPUs for the threads of pyarrow and of
+normalize, so that busy workers do not run one thread pool per CPU each.
+"""
+import atexit
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from disk_cache import store_frame
+from loader import load_sales
+
+INGEST_WORKERS = int(os.environ.get('SALES_INGEST_WORKERS', os.cpu_count() or 1))
+
+# Seconds a finished job stays in the registry, so that every session waiting on it sees how it ended
+# (a failed one only until the failure is reported: uploading the file again then parses it again)
+FINISHED_TTL = 600
+
+# Reentrant: a done-callback may run in the thread that is holding it
+_lock = threading.RLock()
+_jobs = {}
+_pool = None
+_jobs_dir = None
+
+
+def _init_worker(threads):
+    import pyarrow as pa
+
+    import normalize
+
+    pa.set_cpu_count(threads)
+    normalize.NORMALIZE_THREADS = threads
+
+
+def _executor():
+    global _pool, _jobs_dir
+    if _pool is None:
+        # Not forked from the server process, whose other threads may hold locks a forked child inherits
+        # locked: workers fork from a single-threaded fork server that has this module (and with it
+        # loader, pandas and pyarrow) imported already. Each worker still imports the main module once
+        # as it starts; under Streamlit that is the app script, which outside a session draws nothing
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload([__name__])
+        _pool = ProcessPoolExecutor(max_workers=INGEST_WORKERS, mp_context=context,
+                                    initializer=_init_worker,
+                                    initargs=(max(1, (os.cpu_count() or 1) // INGEST_WORKERS),))
+    if _jobs_dir is None:
+        _jobs_dir = tempfile.mkdtemp(prefix='sales_ingest_')
+        atexit.register(shutil.rmtree, _jobs_dir, True)
+    return _pool
+
+
+def _write_progress(path, rows_read, total_rows):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'rows_read': rows_read, 'total_rows': total_rows}, f)
+    os.replace(tmp_path, path)
+
+
+def ingest_upload(upload_key, path, progress_path):
+    """Parse the upload at path into the disk cache under upload_key (run in a worker).
+
+    Returns None once the frame is in the disk cache, or the frame itself
+    when it could not be stored there (write failed, or past the size budget).
+    """
+    _write_progress(progress_path, None, None)
+    df = load_sales(path, progress=lambda rows_read, total_rows: _write_progress(progress_path, rows_read, total_rows))
+    if store_frame(upload_key, df):
+        return None
+    return df
+
+
+def _finish(job, future):
+    global _pool
+    with _lock:
+        job['error'] = future.exception()
+        # A frame the worker could not store stays with the job until take_frame() hands it over
+        job['frame'] = future.result() if job['error'] is None else None
+        job['finished'] = time.time()
+        pool, job['pool'] = job['pool'], None
+        if isinstance(job['error'], BrokenProcessPool) and pool is _pool:
+            # A worker died (e.g. out of memory): the pool takes no more jobs. Shut it down (its other
+            # workers and queued jobs with it) and start a new one for the next job
+            pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+    for path in (job['path'], job['progress_path']):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _prune():
+    now = time.time()
+    for upload_key in [key for key, job in _jobs.items() if job['finished'] and now - job['finished'] > FINISHED_TTL]:
+        del _jobs[upload_key]
+
+
+def submit_upload(upload_key, uploaded_file):
+    """Start parsing uploaded_file in the background, unless a job for the same content exists already.
+
+    Returns the job_status() of the (new or existing) job.
+    """
+    with _lock:
+        _prune()
+        if upload_key in _jobs:
+            return job_status(upload_key)
+        pool = _executor()
+        # Named after the upload's extension, which decides how it is read
+        path = os.path.join(_jobs_dir, upload_key + os.path.splitext(uploaded_file.name)[1])
+        with open(path, 'wb') as f:
+            f.write(uploaded_file.getbuffer())
+        job = {'path': path, 'progress_path': path + '.progress', 'finished': None, 'error': None, 'frame': None,
+               'pool': pool}
+        future = pool.submit(ingest_upload, upload_key, path, job['progress_path'])
+        _jobs[upload_key] = job
+        future.add_done_callback(lambda future: _finish(job, future))
+        return job_status(upload_key)
+
+
+def take_frame(upload_key):
+    """The frame a finished job could not store in the disk cache, handed over once; otherwise None"""
+    with _lock:
+        job = _jobs.get(upload_key)
+        if job is None:
+            return None
+        frame, job['frame'] = job['frame'], None
+        return frame
+
+
+def discard_job(upload_key):
+    """Forget the upload's job, so that the next submit_upload() starts a new one"""
+    with _lock:
+        _jobs.pop(upload_key, None)
+
+
+def job_status(upload_key):
+    """State of the upload's job, or None if there is none (never submitted, or long finished).
+
+    {'state': 'queued' | 'running' | 'done' | 'failed', 'rows_read',
+    'total_rows', 'error'}: rows_read is None until the worker has read a
+    first batch of rows, total_rows also when the file does not say, and
+    error is the exception a failed job raised.
+    """
+    with _lock:
+        job = _jobs.get(upload_key)
+    if job is None:
+        return None
+    status = {'state': 'queued', 'rows_read': None, 'total_rows': None, 'error': None}
+    if job['finished'] is not None:
+        status['error'] = job['error']
+        status['state'] = 'failed' if status['error'] is not None else 'done'
+        return status
+    # The pool marks a job running as soon as it is queued for a worker: only the
+    # progress file, written first thing by the worker, shows that it has started
+    try:
+        with open(job['progress_path']) as f:
+            status.update(json.load(f))
+        status['state'] = 'running'
+    except (FileNotFoundError, ValueError):
+        pass
+    return status
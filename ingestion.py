@@ -0,0 +1,849 @@
+"""Sales sheet ingestion engines.
+
+The default engine opens the workbook with openpyxl's read-only reader and
+streams the worksheet XML in blocks, decoding only the cells of the columns
+we actually use straight into typed NumPy column buffers instead of going
+through pd.read_excel's cell-by-cell Python parser.
+
+CSV, Parquet and Feather exports skip Excel altogether and are read with
+pyarrow (multithreaded CSV parsing, column projection and memory mapping for
+the columnar formats), producing the same raw frames as the Excel engines.
+openpyxl itself is only imported once a workbook is actually opened.
+"""
+import functools
+import os
+import re
+from html import unescape
+from xml.etree.ElementTree import fromstring, iterparse
+
+import numpy as np
+import pandas as pd
+
+SALES_SHEET = 'Sales'
+
+# Column aliases for the SALES sheet (matched case-insensitively)
+REQUIRED_COLUMN_ALIASES = {
+    'Style': ['Style_ID', 'STYLE_ID', 'StyleID', 'SKU', 'STYLE CODE', 'STYLE-CODE', 'Style Code'],
+    'Year': ['YEAR', 'Year', 'SALES_YEAR', 'Sale Year'],
+    'Month': ['MONTH', 'Month', 'SALES_MONTH', 'Sale Month'],
+    'Sales Qty': ['Qty', 'QTY', 'sales Qty', 'sales_Qty', 'Sales_Qty', 'Sales Qty', 'Quantity', 'Sales_QTY', 'SALES'],
+    'Opening Stock': ['Opening_stock', 'Opening Stock', 'OPENING_STOCK', 'Opening_Stock',
+                      'opening stock', 'OpeningStock', 'OP_STOCK', 'Opening_Stock_Qty']
+}
+
+ADDITIONAL_COLUMN_ALIASES = {
+    'Subcategory': ['Subcategory', 'SUBCATEGORY', 'Sub_Category'],
+    'Season': ['Season', 'SEASON'],
+    'Brand': ['Brand', 'BRAND'],
+    'Color': ['Color', 'COLOR'],
+    'Heel_Type_1': ['Heel_Type 1', 'Heel Type 1', 'HEEL_TYPE_1', 'Heel_Type_1'],
+    'Maketplace': ['Maketplace', 'MAKETPLACE', 'Marketplace', 'MARKETPLACE'],
+    'Closing_stock': ['Closing_stock', 'Closing Stock', 'CLOSING_STOCK'],
+    'Date': ['Date', 'DATE']
+}
+
+# Rows decoded between two progress callbacks
+BATCH_ROWS = 20000
+
+# Bytes of inflated worksheet XML decoded per block
+BLOCK_BYTES = 1 << 20
+
+# File extensions read through pyarrow rather than an Excel engine
+ARROW_FORMATS = {'csv': 'csv', 'parquet': 'parquet', 'pq': 'parquet', 'feather': 'feather', 'arrow': 'feather'}
+
+# Rows per frame handed to the loader by iter_sales_chunks (0 reads the sheet as one frame)
+CHUNK_ROWS = int(os.environ.get('SALES_CHUNK_ROWS', 250000))
+
+# Cell kinds seen in a column, used to reproduce pd.read_excel's dtypes
+_NUMBER, _TEXT, _DATE = 1, 2, 4
+
+_CELL_RE = re.compile(
+    rb'<c r="([A-Z]+)(\d+)"([^>]*?)(?:/>|>(?:<f[^>]*/>|<f[^>]*>[^<]*</f>)?'
+    rb'(?:<v>([^<]*)</v>|<is>(.*?)</is>)?</c>)',
+    re.S,
+)
+_TYPE_ATTR_RE = re.compile(rb'\bt="(\w+)"')
+_STYLE_ATTR_RE = re.compile(rb'\bs="(\d+)"')
+_INLINE_TEXT_RE = re.compile(rb'<t(?:\s[^>]*)?>([^<]*)</t>')
+_MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_VALUE_TAG = _MAIN_NS + 'v'
+_SI_TAG = _MAIN_NS + 'si'
+_TEXT_TAG = _MAIN_NS + 't'
+_RUN_TAG = _MAIN_NS + 'r'
+# The header row sits in the first few KB of the worksheet
+_HEADER_BLOCK_BYTES = 64 << 10
+_WORKSHEET_RE = re.compile(rb'<((?:[\w.-]+:)?)worksheet\b[^>]*>')
+_SHEET_DATA_RE = re.compile(rb'<(?:[\w.-]+:)?sheetData\b[^>]*?(/?)>')
+_DIMENSION_RE = re.compile(rb'<(?:[\w.-]+:)?dimension\b[^>]*?\bref="([^"]*)"')
+_DIGITS = '0123456789'
+# Text pd.read_excel reads as missing, and as booleans, by default
+_NA_STRINGS = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN', '<NA>',
+               'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null']
+_BOOL_STRINGS = {'True': True, 'TRUE': True, 'true': True, 'False': False, 'FALSE': False, 'false': False}
+
+
+def find_column(columns, possible_names):
+    """Return the first column matching one of possible_names (case-insensitive)"""
+    cols_upper = {str(col).strip().upper(): col for col in columns}
+    for name in possible_names:
+        if name.upper() in cols_upper:
+            return cols_upper[name.upper()]
+    return None
+
+
+def resolve_sales_columns(header):
+    """Resolve the standardized Sales columns against a header row.
+
+    Returns (required, additional): required maps every REQUIRED_COLUMN_ALIASES
+    key to the matching header name or None, additional holds only the
+    optional columns that were found.
+    """
+    required = {key: find_column(header, aliases) for key, aliases in REQUIRED_COLUMN_ALIASES.items()}
+    additional = {}
+    for standard_name, aliases in ADDITIONAL_COLUMN_ALIASES.items():
+        found_col = find_column(header, aliases)
+        if found_col is not None:
+            additional[standard_name] = found_col
+    return required, additional
+
+
+def _column_letters(index):
+    """0-based column index -> Excel column letters (0 -> 'A')"""
+    letters = ''
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _column_index(letters):
+    """Excel column letters -> 0-based column index ('A' -> 0)"""
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - 64
+    return index - 1
+
+
+@functools.lru_cache(maxsize=None)
+def stream_engine_supported():
+    """Whether the installed openpyxl has the reader internals _open_sheet builds on.
+
+    The stream engine drives openpyxl's ExcelReader step by step and reads
+    a few of its private attributes (the workbook parser's sheet list, the
+    date styles of the stylesheet). When a release drops them, workbooks
+    are read with pd.read_excel instead.
+    """
+    try:
+        from openpyxl import Workbook
+        from openpyxl.packaging.manifest import Manifest
+        from openpyxl.reader.excel import ExcelReader
+        from openpyxl.reader.workbook import WorkbookParser
+        from openpyxl.styles.stylesheet import apply_stylesheet  # noqa: F401
+        from openpyxl.xml.constants import SHARED_STRINGS  # noqa: F401
+    except ImportError:
+        return False
+    workbook = Workbook()
+    return (all(hasattr(ExcelReader, name) for name in ('read_manifest', 'read_strings', 'read_workbook'))
+            and hasattr(WorkbookParser, 'find_sheets') and hasattr(Manifest, 'find')
+            and isinstance(getattr(workbook, '_date_formats', None), dict) and hasattr(workbook, 'epoch'))
+
+
+def _open_sheet(source, sheet_name, strings=True):
+    """Open the raw XML stream of a worksheet using openpyxl's read-only reader.
+
+    Only the manifest, shared strings, workbook and stylesheet are parsed; the
+    other worksheets are never touched. Returns (book, stream), book holding
+    the zip archive ('archive', to close once done), 'shared_strings',
+    'date_styles' (style ids of date formats), 'epoch' and the archive path
+    of the shared string table ('strings_path'). With strings=False the
+    shared strings are left for the caller to read (see _read_shared_strings)
+    and the styles are not read.
+
+    Every use of openpyxl's private reader API is kept here; see
+    stream_engine_supported().
+    """
+    from openpyxl.reader.excel import ExcelReader
+    from openpyxl.styles.stylesheet import apply_stylesheet
+    from openpyxl.xml.constants import SHARED_STRINGS
+
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    reader = ExcelReader(source, read_only=True, data_only=True)
+    try:
+        reader.read_manifest()
+        if strings:
+            reader.read_strings()
+        reader.read_workbook()
+        if strings:
+            apply_stylesheet(reader.archive, reader.wb)
+
+        part = reader.package.find(SHARED_STRINGS)
+        book = {
+            'archive': reader.archive,
+            'shared_strings': list(reader.shared_strings),
+            'date_styles': reader.wb._date_formats,
+            'epoch': reader.wb.epoch,
+            'strings_path': part.PartName[1:] if part is not None else None,
+        }
+        for sheet, rel in reader.parser.find_sheets():
+            if sheet.name == sheet_name:
+                return book, reader.archive.open(rel.target)
+    except BaseException:
+        reader.archive.close()
+        raise
+    reader.archive.close()
+    raise ValueError(f"Worksheet named '{sheet_name}' not found")
+
+
+def _read_shared_strings(book, count):
+    """Decode only the first count entries of the shared string table"""
+    strings = []
+    if book['strings_path'] is None or not count:
+        return strings
+    with book['archive'].open(book['strings_path']) as src:
+        for _, el in iterparse(src):
+            if el.tag == _SI_TAG:
+                # Plain text or rich text runs; phonetic hints (rPh) are not content
+                texts = el.findall(_TEXT_TAG) or el.findall(_RUN_TAG + '/' + _TEXT_TAG)
+                strings.append(''.join(t.text or '' for t in texts))
+                el.clear()
+                if len(strings) >= count:
+                    break
+    return strings
+
+
+def source_format(source):
+    """Lower-case file extension of an upload or path ('xlsx', 'csv', ...)"""
+    return os.path.splitext(str(getattr(source, 'name', source)))[1].lstrip('.').lower()
+
+
+def scan_sales_header(source, sheet_name=SALES_SHEET):
+    """Read only the header row of the Sales sheet.
+
+    The data rows are never decoded and only the shared strings the header
+    refers to are read, so this costs milliseconds whatever the sheet size.
+    CSV, Parquet and Feather files report their column names instead.
+    """
+    if source_format(source) in ARROW_FORMATS:
+        return _arrow_column_names(source)
+    if source_format(source) == 'xls' or not stream_engine_supported():
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        return [str(col) for col in pd.read_excel(source, sheet_name=sheet_name, nrows=0).columns]
+
+    book, src = _open_sheet(source, sheet_name, strings=False)
+    try:
+        with src:
+            for _, wrapper, block in _iter_sheet_blocks(src, block_bytes=_HEADER_BLOCK_BYTES):
+                row = list(fromstring(wrapper[0] + block + wrapper[1]))
+                cells = list(row[0]) if row else []
+                indices = [int(c.find(_VALUE_TAG).text) for c in cells
+                           if c.get('t') == 's' and c.find(_VALUE_TAG) is not None]
+                shared_strings = _read_shared_strings(book, max(indices, default=-1) + 1)
+                values = [_cell_value(c, shared_strings) for c in cells]
+                return [str(value) for value in values if value is not None]
+    finally:
+        book['archive'].close()
+    return []
+
+
+def _finish_column(chunks, kinds):
+    """Concatenate the per-block buffers of a column into its final typed array.
+
+    Mirrors pd.read_excel's typing: integral numbers become int64 when nothing
+    is missing, pure date columns become datetime64 and columns holding text
+    are typed by _infer_text_column.
+    """
+    if not chunks:
+        return np.empty(0, dtype=np.float64)
+
+    if kinds in (0, _NUMBER):
+        values = np.concatenate(chunks)
+        if len(values) and not np.isnan(values).any() and np.array_equal(values, np.trunc(values)):
+            return values.astype(np.int64)
+        return values
+
+    # Blocks without any text are buffered as float
+    parts = []
+    for chunk in chunks:
+        if chunk.dtype != object:
+            chunk = np.array([None if v != v else (int(v) if v.is_integer() else v) for v in chunk.tolist()],
+                             dtype=object)
+        parts.append(chunk)
+    values = np.concatenate(parts)
+
+    if kinds == _DATE:
+        return pd.to_datetime(values).to_numpy()
+    return _infer_text_column(values)
+
+
+def _infer_text_column(values):
+    """Type an object column the way pd.read_excel's text parser does.
+
+    Blank cells and pandas' default NA strings ('n/a', 'NA', '#N/A', 'NULL',
+    ...) become NaN; a column that is then all numbers (numeric text
+    included) or all booleans takes their dtype, anything else stays object
+    with integral numbers kept as ints.
+    """
+    # pd.read_excel reads a blank cell as '', which is an NA string
+    values[pd.isna(values)] = ''
+    missing = pd.Series(values, copy=False).isin(_NA_STRINGS).to_numpy()
+    values[missing] = np.nan
+    try:
+        return pd.to_numeric(values)
+    except (ValueError, TypeError):
+        pass
+
+    # Equal cells take the first one's value, as pd.read_excel's parser leaves them: a True
+    # after a 1 reads as 1, a 0 after a False as False (text cells can only equal text)
+    if pd.api.types.infer_dtype(values, skipna=True) != 'string':
+        first = {}
+        for i in np.flatnonzero(~missing):
+            values[i] = first.setdefault(values[i], values[i])
+
+    # Booleans when every other cell is one; with missing cells the column stays object
+    flags = np.zeros(len(values), dtype=bool)
+    for i in np.flatnonzero(~missing):
+        value = values[i]
+        flag = _BOOL_STRINGS.get(value) if isinstance(value, str) else value
+        if not isinstance(flag, (bool, np.bool_)):
+            return values
+        flags[i] = flag
+    if missing.any():
+        flags = flags.astype(object)
+        flags[missing] = np.nan
+    return flags
+
+
+def _iter_sheet_blocks(src, block_bytes=None):
+    """Cut a worksheet XML stream into blocks of complete <row> elements.
+
+    Yields (total_rows, wrapper, block). The first block is the header row on
+    its own. wrapper is the (start, end) worksheet tag pair that makes a block
+    parseable XML with all namespace declarations in scope. total_rows comes
+    from the <dimension> element and is None when the sheet does not declare it.
+    """
+    block_bytes = block_bytes or BLOCK_BYTES
+    buf = b''
+    while True:
+        data = src.read(block_bytes)
+        buf += data
+        match = _SHEET_DATA_RE.search(buf)
+        if match or not data:
+            break
+    if not match or match.group(1):
+        # No <sheetData> or an empty <sheetData/>
+        return
+
+    worksheet_tag = _WORKSHEET_RE.search(buf, 0, match.start())
+    prefix = worksheet_tag.group(1)
+    wrapper = (worksheet_tag.group(0), b'</' + prefix + b'worksheet>')
+    row_end = b'</' + prefix + b'row>'
+    sheet_data_end = b'</' + prefix + b'sheetData>'
+    dimension = _DIMENSION_RE.search(buf, 0, match.start())
+    total_rows = None
+    if dimension and b':' in dimension.group(1):
+        total_rows = int(dimension.group(1).split(b':')[1].lstrip(b'ABCDEFGHIJKLMNOPQRSTUVWXYZ')) - 1
+
+    buf = buf[match.end():]
+    first = True
+    while True:
+        end = buf.find(sheet_data_end)
+        cut = buf.find(row_end) if first else buf.rfind(row_end)
+        if cut >= 0 and (end < 0 or cut < end):
+            cut += len(row_end)
+            block, buf = buf[:cut], buf[cut:]
+        elif end >= 0:
+            block, buf = buf[:end], b''
+        else:
+            block = b''
+        if block:
+            first = False
+            yield total_rows, wrapper, block
+            continue
+        if end >= 0:
+            return
+        data = src.read(block_bytes)
+        if not data:
+            return
+        buf += data
+
+
+def _cell_kind(attrs, date_styles):
+    """Cell type of a <c> attribute string: 'n', 'date' or the raw t= value"""
+    cell_type = _TYPE_ATTR_RE.search(attrs)
+    cell_type = cell_type.group(1).decode() if cell_type else 'n'
+    if cell_type == 'n' and date_styles:
+        style = _STYLE_ATTR_RE.search(attrs)
+        if style and int(style.group(1)) in date_styles:
+            return 'date'
+    return cell_type
+
+
+def _scan_block(block, wanted, sheet):
+    """Decode a block of rows with one regex pass and vectorized NumPy conversion.
+
+    Returns (rows, [(chunk, kinds), ...]) in buffer position order, or None
+    when the block holds cells the scanner does not recognise (no r=
+    attribute, namespace prefixes...) and must go through the tree parser.
+    """
+    from openpyxl.utils.datetime import from_excel
+
+    cells = _CELL_RE.findall(block)
+    if len(cells) != block.count(b'<c'):
+        return None
+    if not cells:
+        return 0, [(np.empty(0), 0) for _ in wanted]
+
+    letters, row_refs, attrs, raw_values, inline = (np.array(part) for part in zip(*cells))
+    row_refs = row_refs.astype(np.int64)
+    has_value = (raw_values != b'') | (inline != b'')
+    in_use = np.isin(letters, sheet['wanted_letters']) & has_value
+    # As with pd.read_excel, every row up to the last one holding a value in any
+    # column is kept, blank ones included; blank rows after it wait for a later block
+    first_row = sheet['next_row']
+    n_rows = int(row_refs[has_value].max()) - first_row + 1 if has_value.any() else 0
+    sheet['next_row'] = first_row + n_rows
+    sheet['row_number'] = int(row_refs.max())
+
+    columns = []
+    for letter in wanted:
+        mask = in_use & (letters == letter.encode())
+        if not mask.any():
+            columns.append((np.full(n_rows, np.nan), 0))
+            continue
+        index = row_refs[mask] - first_row
+        values = raw_values[mask]
+        cell_attrs, inverse = np.unique(attrs[mask], return_inverse=True)
+        cell_kinds = np.array([_cell_kind(a, sheet['date_styles']) for a in cell_attrs.tolist()])[inverse]
+
+        if (cell_kinds == 'n').all():
+            chunk = np.full(n_rows, np.nan)
+            chunk[index] = values.astype(np.float64)
+            columns.append((chunk, _NUMBER))
+            continue
+
+        chunk = np.full(n_rows, None, dtype=object)
+        kinds = 0
+        for kind in np.unique(cell_kinds).tolist():
+            sel = cell_kinds == kind
+            if kind == 'n':
+                decoded = [int(v) if v.is_integer() else v for v in values[sel].astype(np.float64).tolist()]
+                kinds |= _NUMBER
+            elif kind == 'date':
+                decoded = [from_excel(v, sheet['epoch']) for v in values[sel].astype(np.float64).tolist()]
+                kinds |= _DATE
+            elif kind == 's':
+                decoded = sheet['shared_array'][values[sel].astype(np.int64)]
+                kinds |= _TEXT
+            elif kind == 'inlineStr':
+                decoded = [unescape(b''.join(_INLINE_TEXT_RE.findall(v)).decode()) for v in inline[mask][sel].tolist()]
+                kinds |= _TEXT
+            elif kind == 'str':
+                decoded = [unescape(v.decode()) for v in values[sel].tolist()]
+                kinds |= _TEXT
+            elif kind == 'b':
+                decoded = [v == b'1' for v in values[sel].tolist()]
+                kinds |= _TEXT
+            elif kind == 'd':
+                decoded = [pd.Timestamp(v.decode()).to_pydatetime() for v in values[sel].tolist()]
+                kinds |= _DATE
+            else:
+                # Error cells ('e') stay missing
+                continue
+            target = index[sel]
+            if isinstance(decoded, list):
+                holder = np.empty(len(decoded), dtype=object)
+                holder[:] = decoded
+                decoded = holder
+            chunk[target] = decoded
+        columns.append((chunk, kinds))
+    return n_rows, columns
+
+
+def _parse_block(block, wrapper, wanted, sheet):
+    """Decode a block of rows through the C tree builder (fallback for _scan_block)"""
+    from openpyxl.utils.datetime import from_excel
+
+    positions = sheet['positions']
+    last_index, last_letters = sheet['last_index'], sheet['last_letters']
+    shared_strings, date_styles, epoch = sheet['shared_strings'], sheet['date_styles'], sheet['epoch']
+    kinds = [0] * len(wanted)
+    filled_rows = {}
+    first_row = last_row = sheet['next_row']
+
+    for row in fromstring(wrapper[0] + block + wrapper[1]):
+        ref = row.get('r')
+        row_number = sheet['row_number'] = int(ref) if ref else sheet['row_number'] + 1
+        # Cells are stored in ascending column order, so when the cell at
+        # last_index is that column every wanted cell sits at its own index
+        if len(row) > last_index and (row[last_index].get('r') or last_letters).rstrip(_DIGITS) == last_letters:
+            cells = [(pos, row[index]) for pos, index in positions]
+        else:
+            cells = []
+            for position, c in enumerate(row):
+                ref = c.get('r')
+                pos = wanted.get(ref.rstrip(_DIGITS) if ref else _column_letters(position))
+                if pos is not None:
+                    cells.append((pos, c))
+
+        values = [None] * len(wanted)
+        filled = False
+        for pos, c in cells:
+            if not len(c):
+                continue
+            cell_type = c.get('t')
+            if cell_type is None or cell_type == 'n':
+                # A formula cell holds <f> before its cached <v>
+                v = c[0]
+                if v.tag != _VALUE_TAG:
+                    v = c.find(_VALUE_TAG)
+                if v is None or v.text is None:
+                    continue
+                value = float(v.text)
+                if value.is_integer():
+                    value = int(value)
+                style = c.get('s')
+                if style is not None and int(style) in date_styles:
+                    value = from_excel(value, epoch)
+                    kinds[pos] |= _DATE
+                else:
+                    kinds[pos] |= _NUMBER
+            else:
+                value = _cell_value(c, shared_strings)
+                if value is None:
+                    continue
+                kinds[pos] |= _DATE if cell_type == 'd' else _TEXT
+            values[pos] = value
+            filled = True
+
+        if filled:
+            filled_rows[row_number] = values
+        if filled or any(_has_value(c) for c in row):
+            last_row = row_number + 1
+
+    # Blank rows up to the last row holding a value are kept, as pd.read_excel does
+    blank = [None] * len(wanted)
+    rows = [filled_rows.get(row_number, blank) for row_number in range(first_row, last_row)]
+    sheet['next_row'] = last_row
+
+    columns = []
+    for pos, column in enumerate(zip(*rows) if rows else [()] * len(wanted)):
+        if kinds[pos] in (0, _NUMBER):
+            # None becomes NaN
+            columns.append((np.array(column, dtype=np.float64), kinds[pos]))
+        else:
+            chunk = np.empty(len(column), dtype=object)
+            chunk[:] = column
+            columns.append((chunk, kinds[pos]))
+    return len(rows), columns
+
+
+def _has_value(c):
+    """Whether a <c> element holds a value (pd.read_excel keeps the rows up to the last such cell)"""
+    if c.get('t') == 'inlineStr':
+        return len(c) > 0
+    v = c.find(_VALUE_TAG)
+    return v is not None and v.text is not None
+
+
+def _build_frame(header, chunks, kinds):
+    # Release each column's block buffers as soon as it is concatenated, and
+    # keep the finished arrays as they are instead of consolidating them
+    columns = {}
+    for pos, name in enumerate(header):
+        columns[name] = _finish_column(chunks[pos], kinds[pos])
+        chunks[pos] = None
+    return pd.DataFrame(columns, copy=False)
+
+
+def read_sales_stream(source, usecols=None, progress=None, sheet_name=SALES_SHEET, batch_rows=BATCH_ROWS):
+    """Stream a worksheet block by block and build typed NumPy column buffers.
+
+    Only the cells of the selected columns are ever decoded. usecols is either
+    None (all columns), a list of header names or a callable taking a header
+    name, as with pd.read_excel. progress, when given, is called as
+    progress(rows_read, total_rows) about every batch_rows rows; total_rows is
+    None when the sheet does not declare its dimension.
+    """
+    for frame in iter_sales_stream(source, usecols, progress, sheet_name, batch_rows):
+        return frame
+    return pd.DataFrame()
+
+
+def iter_sales_stream(source, usecols=None, progress=None, sheet_name=SALES_SHEET, batch_rows=BATCH_ROWS,
+                      chunk_rows=None):
+    """Like read_sales_stream, but yield a frame every chunk_rows rows.
+
+    Each chunk is typed on its own (a column can be int64 in one chunk and
+    float64 or object in the next). With chunk_rows=None the whole sheet is
+    yielded as a single frame.
+    """
+    book, src = _open_sheet(source, sheet_name)
+    sheet = {
+        'shared_strings': book['shared_strings'],
+        'date_styles': book['date_styles'],
+        'epoch': book['epoch'],
+    }
+    shared_array = np.empty(len(book['shared_strings']), dtype=object)
+    shared_array[:] = book['shared_strings']
+    sheet['shared_array'] = shared_array
+
+    header = None
+    wanted = {}          # column letters -> buffer position
+    chunks = []          # per-column list of block arrays
+    kinds = []
+    rows_read = 0
+    chunk_read = 0
+    reported = 0
+
+    try:
+        with src:
+            for total_rows, wrapper, block in _iter_sheet_blocks(src):
+                if header is None:
+                    # First row holds the column names
+                    header = []
+                    for row in fromstring(wrapper[0] + block + wrapper[1]):
+                        sheet['row_number'] = int(row.get('r') or 1)
+                        sheet['next_row'] = sheet['row_number'] + 1
+                        for position, c in enumerate(row):
+                            ref = c.get('r')
+                            letters = ref.rstrip(_DIGITS) if ref else _column_letters(position)
+                            header.append((letters, _cell_value(c, sheet['shared_strings'])))
+                    names = [str(name) for _, name in header if name is not None]
+                    if usecols is None:
+                        keep = set(names)
+                    elif callable(usecols):
+                        keep = {name for name in names if usecols(name)}
+                    else:
+                        keep = set(usecols)
+                    positions = []
+                    for letters, name in header:
+                        if name is not None and str(name) in keep:
+                            positions.append((len(wanted), _column_index(letters)))
+                            wanted[letters] = len(wanted)
+                    last_index = max((index for _, index in positions), default=0)
+                    sheet.update(
+                        positions=positions,
+                        last_index=last_index,
+                        last_letters=_column_letters(last_index),
+                        wanted_letters=np.array([letters.encode() for letters in wanted]),
+                    )
+                    header = [str(name) for letters, name in header if letters in wanted]
+                    chunks = [[] for _ in header]
+                    kinds = [0] * len(header)
+                    continue
+                if not wanted:
+                    continue
+
+                decoded = _scan_block(block, wanted, sheet)
+                if decoded is None:
+                    decoded = _parse_block(block, wrapper, wanted, sheet)
+                n_rows, columns = decoded
+                for pos, (chunk, chunk_kinds) in enumerate(columns):
+                    chunks[pos].append(chunk)
+                    kinds[pos] |= chunk_kinds
+
+                rows_read += n_rows
+                chunk_read += n_rows
+                if progress is not None and rows_read - reported >= batch_rows:
+                    reported = rows_read
+                    progress(rows_read, total_rows)
+
+                if chunk_rows is not None and chunk_read >= chunk_rows:
+                    yield _build_frame(header, chunks, kinds)
+                    chunks = [[] for _ in header]
+                    kinds = [0] * len(header)
+                    chunk_read = 0
+    finally:
+        book['archive'].close()
+
+    if progress is not None:
+        progress(rows_read, rows_read)
+
+    if header is None:
+        return
+    # The remainder, or the whole sheet when not chunking (even if it has no rows)
+    if chunk_read or chunk_rows is None or rows_read == 0:
+        yield _build_frame(header, chunks, kinds)
+
+
+def _cell_value(c, shared_strings):
+    """Decode a single <c> element (slow path for headers and rare cell types)"""
+    cell_type = c.get('t')
+    if cell_type == 'inlineStr':
+        return ''.join(c.itertext()) if len(c) else None
+    v = c.find(_VALUE_TAG)
+    if v is None or v.text is None:
+        return None
+    text = v.text
+    if cell_type == 's':
+        return shared_strings[int(text)]
+    if cell_type == 'b':
+        return text == '1'
+    if cell_type in ('str', 'd'):
+        return pd.Timestamp(text).to_pydatetime() if cell_type == 'd' else text
+    if cell_type == 'e':
+        return None
+    value = float(text)
+    return int(value) if value.is_integer() else value
+
+
+def _arrow_input(source):
+    """A pyarrow input for an upload or path: memory-mapped for files on disk,
+    a zero-copy view of the bytes for in-memory uploads"""
+    import pyarrow as pa
+
+    if isinstance(source, (str, os.PathLike)):
+        return pa.memory_map(os.fspath(source), 'r')
+    if hasattr(source, 'getbuffer'):
+        return pa.BufferReader(pa.py_buffer(source.getbuffer()))
+    source.seek(0)
+    return pa.BufferReader(source.read())
+
+
+def _arrow_column_names(source):
+    from pyarrow import csv, ipc, parquet
+
+    kind = ARROW_FORMATS[source_format(source)]
+    with _arrow_input(source) as src:
+        if kind == 'csv':
+            # Only the first block is parsed to infer the schema
+            return csv.open_csv(src).schema.names
+        if kind == 'parquet':
+            return parquet.read_schema(src).names
+        return ipc.open_file(src).schema.names
+
+
+def read_arrow_table(source, usecols=None):
+    """Read a CSV, Parquet or Feather file into a pyarrow Table.
+
+    usecols (None, a list of names or a callable, as for the Excel engines)
+    is pushed down into the reader, so unused columns are never parsed or,
+    for Parquet and Feather, even read from the file.
+    """
+    from pyarrow import csv, feather, parquet
+
+    kind = ARROW_FORMATS[source_format(source)]
+    columns = usecols
+    if callable(usecols):
+        columns = [name for name in _arrow_column_names(source) if usecols(name)]
+    elif usecols is not None:
+        columns = list(usecols)
+
+    src = _arrow_input(source)
+    if kind == 'csv':
+        # Blocks of the file are parsed on all cores (use_threads is on by default)
+        options = csv.ConvertOptions(include_columns=columns) if columns is not None else None
+        return csv.read_csv(src, convert_options=options)
+    if kind == 'parquet':
+        return parquet.read_table(src, columns=columns)
+    return feather.read_table(src, columns=columns)
+
+
+def iter_arrow_chunks(source, usecols=None, progress=None, chunk_rows=None):
+    """Read a CSV, Parquet or Feather file and hand it out as frames of chunk_rows rows.
+
+    The Arrow table stays columnar and compact; only one chunk at a time is
+    converted to pandas. With chunk_rows=None the whole table is one frame.
+    """
+    table = read_arrow_table(source, usecols)
+    total_rows = table.num_rows
+    step = chunk_rows or total_rows or 1
+    for start in range(0, max(total_rows, 1), step):
+        frame = table.slice(start, step).to_pandas()
+        if progress is not None:
+            progress(min(start + step, total_rows), total_rows)
+        yield frame
+
+
+def read_sales_arrow(source, usecols=None, progress=None):
+    """Columnar engine: the whole CSV, Parquet or Feather file as one frame"""
+    for frame in iter_arrow_chunks(source, usecols, progress):
+        return frame
+
+
+def read_sales_pandas(source, usecols=None, progress=None, sheet_name=SALES_SHEET):
+    """Reference engine: plain pd.read_excel"""
+    sales_df = pd.read_excel(source, sheet_name=sheet_name, usecols=usecols)
+    if progress is not None:
+        progress(len(sales_df), len(sales_df))
+    return sales_df
+
+
+INGESTION_ENGINES = {
+    'stream': read_sales_stream,
+    'pandas': read_sales_pandas,
+}
+
+DEFAULT_ENGINE = os.environ.get('SALES_INGESTION_ENGINE', 'stream')
+
+
+def _select_engine(source, engine):
+    engine = engine or DEFAULT_ENGINE
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    if source_format(source) in ARROW_FORMATS:
+        return 'arrow'
+    if source_format(source) == 'xls' or (engine == 'stream' and not stream_engine_supported()):
+        engine = 'pandas'
+    if engine not in INGESTION_ENGINES:
+        raise ValueError(f"Unknown ingestion engine '{engine}'. Available: {', '.join(INGESTION_ENGINES)}")
+    return engine
+
+
+def read_sales_sheet(source, engine=None, usecols=None, progress=None):
+    """Read the Sales sheet with the configured ingestion engine.
+
+    Legacy .xls workbooks are not zip/XML based and always go through pandas;
+    CSV, Parquet and Feather files always go through pyarrow.
+    """
+    engine = _select_engine(source, engine)
+    if engine == 'arrow':
+        return read_sales_arrow(source, usecols=usecols, progress=progress)
+    return INGESTION_ENGINES[engine](source, usecols=usecols, progress=progress)
+
+
+def iter_sales_chunks(source, engine=None, usecols=None, progress=None, chunk_rows=None):
+    """Read the Sales sheet as a sequence of frames of about chunk_rows rows.
+
+    Only the stream engine can stop part-way through a sheet; the pandas
+    engine yields the whole sheet as one chunk.
+    """
+    engine = _select_engine(source, engine)
+    if engine == 'arrow':
+        yield from iter_arrow_chunks(source, usecols=usecols, progress=progress, chunk_rows=chunk_rows or CHUNK_ROWS or None)
+    elif engine == 'stream':
+        yield from iter_sales_stream(source, usecols=usecols, progress=progress,
+                                     chunk_rows=chunk_rows or CHUNK_ROWS or None)
+    else:
+        yield INGESTION_ENGINES[engine](source, usecols=usecols, progress=progress)
+
+
+def concat_chunks(frames):
+    """Concatenate per-chunk frames, keeping categorical columns categorical.
+
+    Chunks are categorized independently, so the same column carries
+    different categories in each of them; those are unioned (sorted, as
+    astype('category') would produce) before concatenating.
+    """
+    frames = [frame for frame in frames if frame is not None]
+    if len(frames) == 1:
+        return frames[0]
+    frames = [frame.copy(deep=False) for frame in frames]
+    for col in frames[0].columns:
+        dtypes = [frame[col].dtype for frame in frames if col in frame.columns]
+        if not all(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes):
+            continue
+        if all(dtype == dtypes[0] for dtype in dtypes[1:]):
+            # Already aligned, e.g. an ordered MONTH_NAME: keep its categories' order
+            continue
+        categories = dtypes[0].categories
+        for dtype in dtypes[1:]:
+            categories = categories.union(dtype.categories)
+        categories = categories.sort_values()
+        for frame in frames:
+            if not frame[col].cat.categories.equals(categories):
+                frame[col] = frame[col].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,117 @@
+"""Opt-in timing of the dashboard's stages, rerun by rerun.
+
+Off unless the page is opened with ?timing=1 or the server runs with
+SALES_TIMING=1. When on, every rerun collects a RerunTimings: the script
+wraps each stage (loading, filtering, aggregation, figure construction,
+sending tables to the browser) in stage(), stages may nest, and the
+breakdown is shown in the sidebar. With SALES_TIMING_LOG set, every rerun is
+also appended to that file as one JSON line for offline analysis.
+
+Memory is the resident set size of the whole server process, read from
+/proc (Linux only, otherwise missing): rss_mb after the stage, its change
+over the stage, and the stage's peak. Other sessions running at the same
+time show up in these figures too.
+"""
+import json
+import os
+import time
+from contextlib import contextmanager
+
+LOG_PATH = os.environ.get('SALES_TIMING_LOG')
+
+_TRUE = ('1', 'true', 'yes', 'on')
+
+
+def timing_requested(query_value=None):
+    """Whether timing is on: ?timing=1 (query_value) or SALES_TIMING=1"""
+    values = (query_value, os.environ.get('SALES_TIMING'))
+    return any(str(value).strip().lower() in _TRUE for value in values if value is not None)
+
+
+def _status_mb(field):
+    try:
+        with open('/proc/self/status') as status:
+            return round(int(next(l for l in status if l.startswith(field)).split()[1]) / 1024, 1)
+    except (OSError, StopIteration):
+        return None
+
+
+def rss_mb():
+    """Current RSS of this process in MB (None off Linux)"""
+    return _status_mb('VmRSS')
+
+
+def peak_rss_mb():
+    """Peak RSS of this process in MB since the last reset_peak_rss() (None off Linux)"""
+    return _status_mb('VmHWM')
+
+
+def reset_peak_rss():
+    # Writing 5 to clear_refs resets VmHWM to the current RSS (Linux 4.0+)
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def _max(*values):
+    values = [value for value in values if value is not None]
+    return max(values) if values else None
+
+
+class RerunTimings:
+    """Stages of one rerun: the whole script, or a fragment rerunning on its own"""
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.context = {}
+        self.stages = []
+        self._open = []
+        self._started = time.time()
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        """Time the block as stage name, nested in the stage currently open"""
+        if self._open:
+            # The peak is reset for this stage: fold the enclosing stage's peak so far into it first
+            self._open[-1]['peak_rss_mb'] = _max(self._open[-1]['peak_rss_mb'], peak_rss_mb())
+        reset_peak_rss()
+        entry = {'stage': name, 'depth': len(self._open), 'ms': None,
+                 'rss_mb': None, 'rss_delta_mb': None, 'peak_rss_mb': None}
+        # Listed in the order the stages start, each enclosing stage before its children
+        self.stages.append(entry)
+        self._open.append(entry)
+        rss_before = rss_mb()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry['ms'] = round((time.perf_counter() - start) * 1000, 3)
+            entry['rss_mb'] = rss_mb()
+            if entry['rss_mb'] is not None and rss_before is not None:
+                entry['rss_delta_mb'] = round(entry['rss_mb'] - rss_before, 1)
+            entry['peak_rss_mb'] = _max(entry['peak_rss_mb'], peak_rss_mb())
+            self._open.pop()
+            if self._open:
+                self._open[-1]['peak_rss_mb'] = _max(self._open[-1]['peak_rss_mb'], entry['peak_rss_mb'])
+
+    def record(self):
+        """Plain (JSON-serializable) summary of the rerun so far"""
+        return {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self._started)),
+            'scope': self.scope,
+            'total_ms': round((time.perf_counter() - self._start) * 1000, 3),
+            'context': dict(self.context),
+            'stages': [dict(entry) for entry in self.stages],
+        }
+
+
+def append_log(record, path=None):
+    """Append record as one JSON line to path (default SALES_TIMING_LOG); no-op without a path"""
+    path = path or LOG_PATH
+    if not path:
+        return
+    with open(path, 'a') as f:
+        f.write(json.dumps(record, default=str) + '\n')
@@ -0,0 +1,122 @@
+"""Stock KPIs derived from the processed sales rows, once per upload.
+
+Every processed row is one style in one marketplace in one month. Next to
+SALES_PERCENTAGE, add_stock_kpis() adds:
+
+    EXPECTED_CLOSING_STOCK  opening stock - sales
+    CLOSING_STOCK_VARIANCE  reported closing stock - expected closing stock
+                            (missing when the file has no Closing_stock)
+    CLOSING_STOCK           reported closing stock, else the expected one
+    CUM_SALES_QTY           sales of the style in that marketplace up to and
+                            including the month
+    CUM_SELL_THROUGH        CUM_SALES_QTY / (CUM_SALES_QTY + CLOSING_STOCK) * 100
+    STOCK_COVER_MONTHS      months the closing stock lasts at the style's
+                            average monthly sales so far (calendar months
+                            since its first month, months without a row
+                            included)
+
+The running figures are grouped cumulative sums: rows are put in series
+order once with a stable sort (which keeps each series in period order),
+the whole column is cumsummed in one go and every series' offset is
+subtracted again.
+"""
+import numpy as np
+import pandas as pd
+
+from dedup import composite_key, stable_order
+
+KPI_COLUMNS = ['EXPECTED_CLOSING_STOCK', 'CLOSING_STOCK_VARIANCE', 'CLOSING_STOCK',
+               'CUM_SALES_QTY', 'CUM_SELL_THROUGH', 'STOCK_COVER_MONTHS']
+
+# A reported closing stock this far from opening - sales counts as a mismatch
+_TOLERANCE = 1e-6
+
+
+def sell_through(cum_sales, closing_stock):
+    """Units sold so far as a % of units sold plus units still on hand (0 when there are neither)"""
+    cum_sales = np.asarray(cum_sales, dtype=np.float64)
+    on_hand = np.maximum(np.asarray(closing_stock, dtype=np.float64), 0)
+    denominator = cum_sales + on_hand
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, cum_sales / denominator * 100, 0)
+
+
+def elapsed_months(years, months, first_years, first_months):
+    """Calendar months from a first (year, month) up to and including (year, month)"""
+    years = np.asarray(years, dtype=np.int64)
+    months = np.asarray(months, dtype=np.int64)
+    return (years - first_years) * 12 + (months - first_months) + 1
+
+
+def stock_cover(closing_stock, cum_sales, months):
+    """Closing stock in months of average sales so far (missing while nothing has sold).
+
+    months is the number of calendar months cum_sales was sold over (see elapsed_months).
+    """
+    on_hand = np.maximum(np.asarray(closing_stock, dtype=np.float64), 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        monthly_sales = np.asarray(cum_sales, dtype=np.float64) / np.asarray(months, dtype=np.float64)
+        return np.where(monthly_sales > 0, on_hand / monthly_sales, np.nan)
+
+
+def grouped_cumsum(values, key, span):
+    """Running sum of values within each key value, in row order, and each row's group start.
+
+    The group start is the position of the first row with the same key.
+    span is the number of values key can take (see dedup.composite_key).
+    """
+    n = len(values)
+    order = stable_order(key, span)
+    sorted_key = key[order]
+    positions = np.arange(n)
+    starts = np.concatenate(([True], sorted_key[1:] != sorted_key[:-1])) if n else np.array([], dtype=bool)
+    group_start = np.maximum.accumulate(np.where(starts, positions, 0)) if n else positions
+
+    sorted_values = values[order]
+    running = np.cumsum(sorted_values)
+    # Sum of everything before the group, taken at the group's first row
+    running -= (running - sorted_values)[group_start]
+
+    cum = np.empty(n, dtype=np.float64)
+    first = np.empty(n, dtype=np.int64)
+    cum[order] = running
+    first[order] = order[group_start]
+    return cum, first
+
+
+def add_stock_kpis(df, series_keys, closing_col=None):
+    """Add KPI_COLUMNS to a period-sorted frame in place and return reconciliation counts.
+
+    series_keys identify one stock series (style, marketplace); closing_col
+    is the reported closing stock column, if the file has one.
+    """
+    opening = df['OPENING_STOCK'].to_numpy(dtype=np.float64)
+    sales = df['SALES_QTY'].to_numpy(dtype=np.float64)
+    expected = opening - sales
+
+    if closing_col is not None and closing_col in df.columns:
+        reported = pd.to_numeric(df[closing_col], errors='coerce').to_numpy(dtype=np.float64)
+    else:
+        reported = np.full(len(df), np.nan)
+    variance = reported - expected
+    closing = np.where(np.isnan(reported), expected, reported)
+
+    key, _, span = composite_key(df, series_keys)
+    cum_sales, first = grouped_cumsum(sales, key, span)
+    # Rows are in period order, so a series' first row holds its first month
+    years = df['YEAR'].to_numpy(dtype=np.int64)
+    months = df['MONTH'].to_numpy(dtype=np.int64)
+    months = elapsed_months(years, months, years[first], months[first])
+
+    df['EXPECTED_CLOSING_STOCK'] = expected
+    df['CLOSING_STOCK_VARIANCE'] = variance
+    df['CLOSING_STOCK'] = closing
+    df['CUM_SALES_QTY'] = cum_sales
+    df['CUM_SELL_THROUGH'] = sell_through(cum_sales, closing)
+    df['STOCK_COVER_MONTHS'] = stock_cover(closing, cum_sales, months)
+
+    reported_rows = ~np.isnan(reported)
+    return {
+        'closing_reported_rows': int(reported_rows.sum()),
+        'closing_mismatch_rows': int((np.abs(variance[reported_rows]) > _TOLERANCE).sum()),
+    }
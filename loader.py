@@ -0,0 +1,174 @@
+"""The loading pipeline: one upload in, the processed sales frame out.
+
+load_sales() resolves the Sales sheet's columns from its header, streams
+only those columns in chunks, cleans and collapses duplicate records chunk
+by chunk, and adds the month names, sales % and stock KPIs. It uses no
+Streamlit: the app runs it in the script thread or, through ingest_jobs, in
+a worker process, so progress goes to a callback and problems are raised.
+"""
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+
+from dedup import collapse_duplicates
+from ingestion import concat_chunks, iter_sales_chunks, resolve_sales_columns, scan_sales_header
+from kpis import add_stock_kpis
+from normalize import normalize_columns
+from quality import new_profile, profile_numeric, profile_text, summarize_profile
+
+# Text dimensions are stored as category: each distinct value once plus integer codes,
+# which keeps the cached frame small and lets every groupby work on codes
+TEXT_DIMENSIONS = ['Subcategory', 'Season', 'Brand', 'Color', 'Heel_Type_1', 'Maketplace']
+
+MONTH_NAMES = {1: 'January', 2: 'February', 3: 'March', 4: 'April', 5: 'May', 6: 'June', 7: 'July',
+               8: 'August', 9: 'September', 10: 'October', 11: 'November', 12: 'December'}
+
+
+class MissingColumnsError(ValueError):
+    """The Sales sheet lacks required columns"""
+
+    def __init__(self, missing, available):
+        # Both kept in args, so the error survives pickling back from a worker process
+        super().__init__(missing, available)
+        self.missing = missing
+        self.available = available
+
+    def __str__(self):
+        return f"Missing required columns in Sales sheet: {', '.join(self.missing)}"
+
+
+def load_sales(source, progress=None, stage=None):
+    """Processed frame of one upload (an uploaded file or a path).
+
+    progress(rows_read, total_rows) is called as the sheet is read
+    (total_rows may be None); stage(name) returns a context manager timing
+    the named step. Raises MissingColumnsError when a required column is
+    missing.
+    """
+    stage = stage or (lambda name: nullcontext())
+
+    # Resolve every column from the header row alone, before any data is parsed
+    header = scan_sales_header(source)
+    required_cols_sales, additional_cols = resolve_sales_columns(header)
+
+    missing_sales = [k for k, v in required_cols_sales.items() if v is None]
+
+    if missing_sales:
+        raise MissingColumnsError(missing_sales, [col.strip() for col in header])
+
+    sales_style_col = required_cols_sales['Style']
+    sales_year_col = required_cols_sales['Year']
+    sales_month_col = required_cols_sales['Month']
+    sales_qty_col = required_cols_sales['Sales Qty']
+    opening_stock_col = required_cols_sales['Opening Stock']
+
+    # Stream only the resolved columns out of the Sales sheet, in chunks
+    usecols = list(dict.fromkeys(list(required_cols_sales.values()) + list(additional_cols.values())))
+
+    # Handle duplicate sales records silently (counted for the data quality panel).
+    # Year and Month lead the key, so the collapsed rows come out ordered by period
+    duplicate_subset = ['YEAR', 'MONTH', 'STYLE_ID']
+
+    # Check if Maketplace column exists and add it to subset
+    if 'Maketplace' in additional_cols:
+        duplicate_subset.append('Maketplace')
+
+    # Profile of the raw values (before trimming / coercion) for the data quality panel
+    quality_profile = new_profile()
+    numeric_cols = {'YEAR': sales_year_col, 'MONTH': sales_month_col,
+                    'SALES_QTY': sales_qty_col, 'OPENING_STOCK': opening_stock_col}
+
+    def clean_chunk(sales_df):
+        numeric = {}
+        for standard_name, found_col in numeric_cols.items():
+            numeric[standard_name] = pd.to_numeric(sales_df[found_col], errors='coerce')
+            profile_numeric(quality_profile, standard_name, sales_df[found_col], numeric[standard_name])
+
+        # PROPERLY TRIM TEXT COLUMNS to remove leading/trailing spaces and convert to UPPERCASE
+        # (STYLE_ID for consistency). Text columns may also come dictionary-encoded, as category, from
+        # Parquet / Feather files. The columns are independent and normalized in parallel, each one
+        # value per distinct value, reusing the factorization the column is profiled with
+        text_columns = {'STYLE_ID': (sales_df[sales_style_col], True)}
+        for standard_name, found_col in additional_cols.items():
+            is_text = sales_df[found_col].dtype == 'object' or isinstance(sales_df[found_col].dtype, pd.CategoricalDtype)
+            factorized = pd.factorize(sales_df[found_col]) if is_text else None
+            if standard_name in TEXT_DIMENSIONS:
+                profile_text(quality_profile, standard_name, sales_df[found_col], factorized)
+            if is_text:
+                text_columns[standard_name] = (sales_df[found_col], standard_name in TEXT_DIMENSIONS, factorized)
+        normalized = normalize_columns(text_columns)
+
+        # Create clean dataframe with standardized names
+        sales_clean = pd.DataFrame({
+            'STYLE_ID': normalized['STYLE_ID'],
+            'YEAR': numeric['YEAR'],
+            'MONTH': numeric['MONTH'],
+            'SALES_QTY': numeric['SALES_QTY'].fillna(0),
+            'OPENING_STOCK': numeric['OPENING_STOCK'].fillna(0)
+        })
+
+        # Add additional columns from sales if they exist
+        for standard_name, found_col in additional_cols.items():
+            sales_clean[standard_name] = normalized.get(standard_name, sales_df[found_col])
+        return sales_clean
+
+    dedup_stats = {'rows_in': 0, 'missing_key_rows': 0, 'duplicates_collapsed': 0}
+
+    def collapse_chunk(sales_clean, raw=False):
+        # Sum SALES_QTY, take the first value of every other column
+        collapsed, stats = collapse_duplicates(sales_clean, duplicate_subset, ['SALES_QTY'])
+        if raw:
+            dedup_stats['rows_in'] += stats['rows_in']
+        dedup_stats['missing_key_rows'] += stats['missing_key_rows']
+        dedup_stats['duplicates_collapsed'] += stats['duplicates_collapsed']
+        return collapsed
+
+    # Read, clean and collapse the sheet one chunk at a time. Sums and first values
+    # combine across chunks, so the collapsed chunks are merged (and collapsed again)
+    # whenever they outgrow what has been merged so far: memory stays bounded by one
+    # chunk plus the collapsed output rather than the whole raw sheet
+    with stage("Read, clean and collapse chunks"):
+        sales_clean = None
+        pending = []
+        pending_rows = 0
+        for sales_df in iter_sales_chunks(source, usecols=usecols, progress=progress):
+            collapsed = collapse_chunk(clean_chunk(sales_df), raw=True)
+            del sales_df
+            if sales_clean is None:
+                sales_clean = collapsed
+                continue
+            pending.append(collapsed)
+            pending_rows += len(collapsed)
+            if pending_rows >= len(sales_clean):
+                sales_clean = collapse_chunk(concat_chunks([sales_clean] + pending))
+                pending, pending_rows = [], 0
+    if pending:
+        sales_clean = collapse_chunk(concat_chunks([sales_clean] + pending))
+
+    # A column read as numbers in one chunk and text in another comes back as plain objects
+    for col in TEXT_DIMENSIONS:
+        if col in sales_clean.columns and sales_clean[col].dtype == 'object':
+            sales_clean[col] = sales_clean[col].astype(str).str.strip().str.upper().astype('category')
+
+    # Rows are ordered by (YEAR, MONTH), so each period is one contiguous block (one partition of the dataset store)
+    sales_clean.attrs['dedup'] = dedup_stats
+    sales_clean.attrs['quality'] = summarize_profile(quality_profile)
+
+    # Add month name for display
+    sales_clean['MONTH_NAME'] = pd.Categorical(sales_clean['MONTH'].map(MONTH_NAMES),
+                                               categories=list(MONTH_NAMES.values()), ordered=True)
+
+    # Calculate sales percentage (Sales Qty / Opening Stock)
+    # Handle division by zero and cases where opening stock is 0
+    sales_clean['SALES_PERCENTAGE'] = np.where(
+        sales_clean['OPENING_STOCK'] > 0,
+        (sales_clean['SALES_QTY'] / sales_clean['OPENING_STOCK']) * 100,
+        0
+    )
+
+    # Stock KPIs (closing stock reconciliation, sell-through, stock cover), computed once here:
+    # each style in each marketplace is one stock series, followed month by month
+    with stage("Stock KPIs"):
+        sales_clean.attrs['stock'] = add_stock_kpis(sales_clean, duplicate_subset[2:], closing_col='Closing_stock')
+    return sales_clean
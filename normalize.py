@@ -0,0 +1,110 @@
+"""Trimming and upper-casing of the loader's text columns, in parallel.
+
+A text column of a chunk holds a few hundred distinct values (a few
+thousand STYLE_IDs) over hundreds of thousands of rows, so normalize_text()
+works on the distinct values: the column is factorized, only its unique
+values are trimmed and upper-cased, and the row codes are mapped onto the
+result (several raw spellings may end up as one value). Apart from the
+factorization, the cost grows with the number of distinct values, not
+with the rows. The factorization can be handed in when the caller has
+one already, as the loader does with the one it profiles the column with.
+
+The unique values go through pyarrow compute kernels (trim, upper-case),
+which release the GIL, and the columns of a chunk are handed to a thread
+pool. The kernels produce the same strings as str.strip() / str.upper() on
+ASCII text; values with any other character go through pandas instead.
+
+SALES_NORMALIZE_THREADS sets the number of threads (default: one per CPU);
+1 normalizes the columns one after the other in the calling thread.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+NORMALIZE_THREADS = int(os.environ.get('SALES_NORMALIZE_THREADS', os.cpu_count() or 1))
+
+# What str.strip() removes from ASCII text
+_ASCII_WHITESPACE = ' \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f'
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    global _pools_lock
+    # A forked process (e.g. an ingestion worker, forked from the fork server) inherits the pools but none of their threads
+    _pools.clear()
+    _pools_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _normalize_strings(strings):
+    """str.strip().upper() of every string in an object array"""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    array = pa.array(strings, type=pa.string())
+    if pc.all(pc.string_is_ascii(array)).as_py() is False:
+        return pd.Series(strings, dtype=object).str.strip().str.upper().to_numpy(dtype=object)
+    return pc.ascii_upper(pc.ascii_trim(array, characters=_ASCII_WHITESPACE)).to_numpy(zero_copy_only=False)
+
+
+def _text_codes(values, factorized):
+    """Codes of values and the text of each code, as values.astype(str) reads them"""
+    codes, uniques = factorized if factorized is not None else pd.factorize(values)
+    uniques = np.asarray(uniques, dtype=object)
+    if pd.api.types.infer_dtype(uniques, skipna=False) not in ('string', 'empty'):
+        # Values that are equal but read differently as text (1 and 1.0) must stay apart
+        codes, uniques = pd.factorize(values.astype(str))
+        return codes, np.asarray(uniques, dtype=object)
+
+    missing = codes < 0
+    if missing.any():
+        # Missing values read as 'nan' / 'None'
+        missing_codes, missing_text = pd.factorize(values[missing].astype(str))
+        codes = codes.copy()
+        codes[missing] = len(uniques) + missing_codes
+        uniques = np.concatenate((uniques, np.asarray(missing_text, dtype=object)))
+    return codes, uniques
+
+
+def normalize_text(values, categorical=False, factorized=None):
+    """values.astype(str).str.strip().str.upper(), as a category if categorical.
+
+    factorized is pd.factorize(values), if the caller has it already.
+    """
+    codes, uniques = _text_codes(values, factorized)
+    label_codes, labels = pd.factorize(_normalize_strings(uniques), sort=categorical)
+    codes = label_codes[codes]
+    if categorical:
+        # Categories in sorted order, as astype('category') lays them out
+        values_out = pd.Categorical.from_codes(codes, categories=pd.Index(labels, dtype=object))
+    else:
+        values_out = np.asarray(labels, dtype=object).take(codes)
+    return pd.Series(values_out, index=values.index, name=values.name)
+
+
+def _pool(threads):
+    with _pools_lock:
+        if threads not in _pools:
+            _pools[threads] = ThreadPoolExecutor(threads, thread_name_prefix='normalize')
+        return _pools[threads]
+
+
+def normalize_columns(columns, threads=None):
+    """normalize_text() of every column in columns, spread over threads.
+
+    columns maps a name to the arguments of normalize_text(): (values,
+    categorical) or (values, categorical, factorized).
+    """
+    threads = NORMALIZE_THREADS if threads is None else threads
+    if threads <= 1 or len(columns) <= 1:
+        return {name: normalize_text(*args) for name, args in columns.items()}
+    pool = _pool(threads)
+    futures = {name: pool.submit(normalize_text, *args) for name, args in columns.items()}
+    return {name: future.result() for name, future in futures.items()}
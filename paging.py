@@ -0,0 +1,80 @@
+"""Server-side sorting and paging of the dashboard tables.
+
+st.dataframe serializes every row it is handed to Arrow and ships it to the
+browser on each rerun, so a Color or Subcategory table with thousands of
+labels costs the same at every interaction however little of it is shown.
+Tables longer than a page are instead sorted on the server and only the
+requested page is sent: table_page() first picks out the rows ranked up to
+the end of that page with np.partition, and only those are ordered, so the
+payload stays at page_size rows whatever the dimension's cardinality.
+
+The page itself is handed over as a pyarrow Table (arrow_table()), which
+st.dataframe writes out as it is. Given a pandas frame it would first run
+pa.Table.from_pandas, most of the cost of sending a page: labels would be
+re-encoded and the pandas schema (index, dtypes) serialized with them.
+"""
+import numpy as np
+import pandas as pd
+
+# Rows sent to the browser per table page
+PAGE_ROWS = 50
+
+
+def page_count(n_rows, page_size=PAGE_ROWS):
+    return max(1, -(-n_rows // page_size))
+
+
+def _sort_key(values, ascending):
+    """Float64 key that orders the column ascending (labels by their text)"""
+    if isinstance(values.dtype, pd.CategoricalDtype) or values.dtype == object:
+        key, _ = pd.factorize(values.astype(str), sort=True)
+        key = key.astype(np.float64)
+        key[values.isna().to_numpy()] = np.nan
+    else:
+        key = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    # Missing values last either way
+    key = np.where(np.isnan(key), np.inf, key if ascending else -key)
+    return key
+
+
+def table_page(table, sort_col, ascending=False, page=1, page_size=PAGE_ROWS):
+    """Rows on page (1-based) of table sorted by sort_col, ties kept in table order"""
+    start = (page - 1) * page_size
+    stop = min(start + page_size, len(table))
+    if start >= stop:
+        return table.iloc[0:0]
+
+    key = _sort_key(table[sort_col], ascending)
+    if stop < len(table):
+        # Only rows ranked before stop can be on the page: those below the
+        # stop-th key, plus the earliest rows tied with it
+        boundary = np.partition(key, stop - 1)[stop - 1]
+        below = np.flatnonzero(key < boundary)
+        tied = np.flatnonzero(key == boundary)[:stop - len(below)]
+        candidates = np.concatenate((below, tied))
+    else:
+        candidates = np.arange(len(table))
+
+    order = candidates[np.lexsort((candidates, key[candidates]))]
+    return table.iloc[order[start:stop]].reset_index(drop=True)
+
+
+def arrow_table(table):
+    """table as a pyarrow Table, column by column and without the index.
+
+    Categorical columns stay dictionary-encoded, on their own codes and
+    categories; missing values (NaN, None) become nulls.
+    """
+    import pyarrow as pa
+
+    arrays = {}
+    for col in table.columns:
+        values = table[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes = values.cat.codes.to_numpy()
+            arrays[col] = pa.DictionaryArray.from_arrays(
+                codes, pa.array(values.cat.categories.to_numpy(), from_pandas=True),
+                mask=codes < 0, ordered=values.cat.ordered)
+        else:
+            arrays[col] = pa.array(values, from_pandas=True)
+    return pa.table(arrays)
@@ -0,0 +1,125 @@
+"""Data-quality profile of an upload, taken from the raw values while loading.
+
+The loader trims and upper-cases text columns and coerces the numeric ones,
+after which neither stray spaces nor unreadable numbers can be seen any more.
+profile_text() / profile_numeric() are folded over every raw chunk before it
+is cleaned; summarize_profile() turns the result into plain counts and lists
+that are stored in the processed frame's attrs (and so in the disk cache)
+next to the duplicate statistics; merge_summaries() combines those of
+several uploads. quality_tables() renders them for the Data Quality Check
+panel without touching the rows again.
+
+Text columns are profiled per distinct value: each chunk is factorized once,
+and only its distinct values are stripped and compared.
+"""
+import numpy as np
+import pandas as pd
+
+# Distinct raw values kept as examples per text column
+SAMPLE_SIZE = 5
+
+
+def new_profile():
+    return {'text': {}, 'numeric': {}}
+
+
+def profile_text(profile, name, raw, factorized=None):
+    """Fold one chunk of a raw text column into profile (factorized: pd.factorize(raw), if already done)"""
+    entry = profile['text'].setdefault(name, {'counts': None, 'samples': [], 'null_rows': 0})
+    codes, uniques = factorized if factorized is not None else pd.factorize(raw)
+    present = codes >= 0
+    entry['null_rows'] += int(len(codes) - present.sum())
+
+    # Occurrences per distinct value, keyed by its text as the loader reads it
+    labels = pd.Index(np.asarray(uniques, dtype=object)).astype(str)
+    counts = pd.Series(np.bincount(codes[present], minlength=len(labels)), index=labels)
+    if not labels.is_unique:
+        # e.g. 1 and '1' in the same column
+        counts = counts.groupby(level=0, sort=False).sum()
+    entry['counts'] = counts if entry['counts'] is None else entry['counts'].add(counts, fill_value=0)
+
+    # factorize lists values in order of first appearance
+    for value in counts.index:
+        if len(entry['samples']) >= SAMPLE_SIZE:
+            break
+        if value not in entry['samples']:
+            entry['samples'].append(value)
+
+
+def profile_numeric(profile, name, raw, coerced):
+    """Fold one chunk of a raw numeric column and its pd.to_numeric(errors='coerce') result into profile"""
+    entry = profile['numeric'].setdefault(name, {'null_rows': 0, 'non_numeric_rows': 0})
+    missing = raw.isna().to_numpy()
+    entry['null_rows'] += int(missing.sum())
+    # Present in the file but not readable as a number
+    entry['non_numeric_rows'] += int((coerced.isna().to_numpy() & ~missing).sum())
+
+
+def _text_summary(values, samples, trimmed_rows, null_rows):
+    values = pd.Index(sorted(values), dtype=object)
+    return {
+        'values': list(values),
+        'unique_raw': len(values),
+        'unique_clean': int(values.str.strip().str.upper().nunique()),
+        'samples': list(samples),
+        'trimmed_rows': int(trimmed_rows),
+        'null_rows': int(null_rows),
+    }
+
+
+def summarize_profile(profile):
+    """Plain (JSON-serializable) summary of an accumulated profile.
+
+    Per text column: its distinct values as read (values, unique_raw), the
+    number left after trimming / upper-casing (unique_clean), samples, rows
+    that had leading/trailing spaces (trimmed_rows) and missing rows
+    (null_rows). Per numeric column: null_rows and non_numeric_rows.
+    """
+    text = {}
+    for name, entry in profile['text'].items():
+        counts = entry['counts'] if entry['counts'] is not None else pd.Series(dtype=np.int64)
+        labels = counts.index.astype(str)
+        trimmed_rows = counts[labels.str.strip() != labels].sum()
+        text[name] = _text_summary(labels, entry['samples'], trimmed_rows, entry['null_rows'])
+    numeric = {name: dict(entry) for name, entry in profile['numeric'].items()}
+    return {'text': text, 'numeric': numeric}
+
+
+def merge_summaries(summaries):
+    """One summary for several uploads, as if their rows had been profiled together"""
+    text = {}
+    numeric = {}
+    for summary in summaries:
+        for name, stats in summary.get('text', {}).items():
+            entry = text.setdefault(name, {'values': set(), 'samples': [], 'trimmed_rows': 0, 'null_rows': 0})
+            entry['values'].update(stats['values'])
+            for value in stats['samples']:
+                if len(entry['samples']) < SAMPLE_SIZE and value not in entry['samples']:
+                    entry['samples'].append(value)
+            entry['trimmed_rows'] += stats['trimmed_rows']
+            entry['null_rows'] += stats['null_rows']
+        for name, stats in summary.get('numeric', {}).items():
+            entry = numeric.setdefault(name, {'null_rows': 0, 'non_numeric_rows': 0})
+            for col in entry:
+                entry[col] += stats[col]
+    text = {name: _text_summary(entry['values'], entry['samples'], entry['trimmed_rows'], entry['null_rows'])
+            for name, entry in text.items()}
+    return {'text': text, 'numeric': numeric}
+
+
+def quality_tables(summary):
+    """(text columns, numeric columns) display frames of a summarized profile"""
+    text_df = pd.DataFrame([{
+        'Column': name,
+        'Unique Values': stats['unique_raw'],
+        'Unique After Cleaning': stats['unique_clean'],
+        'Sample Values': ', '.join(stats['samples']),
+        'Rows With Leading/Trailing Spaces': stats['trimmed_rows'],
+        'Missing Values': stats['null_rows'],
+    } for name, stats in summary.get('text', {}).items()])
+    numeric_df = pd.DataFrame([{
+        'Column': name,
+        'Missing Values': stats['null_rows'],
+        'Not Numeric': stats['non_numeric_rows'],
+    } for name, stats in summary.get('numeric', {}).items()])
+    return text_df, numeric_df
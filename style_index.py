@@ -0,0 +1,95 @@
+"""Per-style lookups on the processed sales frame.
+
+The frame is ordered by period, so one style's rows are scattered over the
+whole of it. build_style_index() groups the row positions by STYLE_ID once
+per upload: the rows of the i-th style (in sorted order) are
+rows[bounds[i]:bounds[i + 1]], in period order. The sorted style codes
+double as the type-ahead search structure: every style starting with a
+prefix lies in one contiguous range found with two binary searches.
+"""
+import numpy as np
+import pandas as pd
+
+from analytics import MEASURES, sales_percentage
+from kpis import elapsed_months, sell_through, stock_cover
+
+
+def build_style_index(df):
+    """Sorted STYLE_ID labels and, per label, the positions of its rows"""
+    values = df['STYLE_ID']
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        labels = np.asarray(values.cat.categories.astype(str))
+    else:
+        codes, labels = pd.factorize(values)
+        labels = np.asarray(labels.astype(str))
+
+    # Renumber the codes so that they follow the labels' sorted order
+    label_order = np.argsort(labels, kind='stable')
+    rank = np.empty(len(labels), dtype=np.int64)
+    rank[label_order] = np.arange(len(labels))
+    labels = labels[label_order].astype(str)
+    valid = codes >= 0
+    codes = rank[codes[valid]]
+    positions = np.flatnonzero(valid)
+
+    # Stable, so each style's rows stay in period order
+    rows = positions[np.argsort(codes, kind='stable')]
+    # Categories can outlive their rows (e.g. a style whose only rows had no Year): not offered
+    counts = np.bincount(codes, minlength=len(labels))
+    present = counts > 0
+    bounds = np.concatenate(([0], np.cumsum(counts[present])))
+    return {'labels': labels[present], 'rows': rows, 'bounds': bounds}
+
+
+def search_styles(style_index, query, limit=100):
+    """(first limit styles starting with query, number of matching styles)"""
+    prefix = query.strip().upper()
+    labels = style_index['labels']
+    start = np.searchsorted(labels, prefix, side='left')
+    # Every label with the prefix sorts before prefix followed by the highest code point
+    stop = np.searchsorted(labels, prefix + '\U0010ffff', side='left')
+    return labels[start:min(stop, start + limit)].tolist(), int(stop - start)
+
+
+def style_rows(style_index, style):
+    """Positions of the rows of style, in period order (empty if unknown)"""
+    labels = style_index['labels']
+    i = np.searchsorted(labels, style)
+    if i == len(labels) or labels[i] != style:
+        return np.array([], dtype=np.int64)
+    return style_index['rows'][style_index['bounds'][i]:style_index['bounds'][i + 1]]
+
+
+def style_history(df, style_index, style):
+    """Per-month sales / opening stock / sales % of one style, in date order.
+
+    With the stock KPIs loaded, also its closing stock, cumulative
+    sell-through and stock cover month by month.
+    """
+    rows = style_rows(style_index, style)
+    years = df['YEAR'].to_numpy()[rows]
+    months = df['MONTH'].to_numpy()[rows]
+
+    # The rows are in period order: every month (all marketplaces) is one run
+    if len(rows):
+        starts = np.flatnonzero(np.concatenate(([True], (years[1:] != years[:-1]) | (months[1:] != months[:-1]))))
+    else:
+        starts = np.array([], dtype=np.int64)
+    history = {'YEAR': years[starts], 'MONTH': months[starts]}
+    if 'MONTH_NAME' in df.columns:
+        history['MONTH_NAME'] = df['MONTH_NAME'].take(rows[starts]).to_numpy()
+    for col in MEASURES + ['CLOSING_STOCK']:
+        if col not in df.columns:
+            continue
+        values = df[col].to_numpy()[rows]
+        history[col] = np.add.reduceat(values, starts) if len(rows) else values
+    history['SALES_PERCENTAGE'] = sales_percentage(history['SALES_QTY'], history['OPENING_STOCK'])
+
+    if 'CLOSING_STOCK' in history:
+        # The style's own running KPIs, all marketplaces together
+        cum_sales = np.cumsum(history['SALES_QTY'])
+        history['CUM_SELL_THROUGH'] = sell_through(cum_sales, history['CLOSING_STOCK'])
+        months = elapsed_months(history['YEAR'], history['MONTH'], history['YEAR'][:1], history['MONTH'][:1])
+        history['STOCK_COVER_MONTHS'] = stock_cover(history['CLOSING_STOCK'], cum_sales, months)
+    return pd.DataFrame(history)
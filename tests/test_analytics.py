@@ -0,0 +1,148 @@
+"""Cube tables and record counts must match masks and groupbys over the raw rows."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics import (CUBE_DIMENSIONS, build_sales_cube, dimension_table, filter_cube, monthly_table, select_periods,
+                       selected_rows)
+from bitmap_index import build_bitmap_index, matching_rows
+
+MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+               'August', 'September', 'October', 'November', 'December']
+
+# (year, month) selections as the sidebar makes them; the frame has no December, so the last one is empty
+SELECTIONS = [('All', 'All'), (2023, 'All'), ('All', 2), (2024, 3), (2024, 12)]
+
+
+def make_frame(rows=4000, seed=0):
+    rng = np.random.default_rng(seed)
+
+    def pick(values, missing=0.0):
+        picked = np.array(values, dtype=object)[rng.integers(0, len(values), rows)]
+        picked[rng.random(rows) < missing] = None
+        return pd.Series(picked).astype('category')
+
+    months = rng.integers(1, 12, rows)
+    df = pd.DataFrame({
+        'YEAR': rng.integers(2023, 2025, rows),
+        'MONTH': months,
+        'SALES_QTY': rng.integers(0, 30, rows).astype(np.float64),
+        'OPENING_STOCK': rng.integers(0, 200, rows).astype(np.float64),
+        'Maketplace': pick(['MYNTRA', 'AJIO', 'NYKAA']),
+        'Season': pick([2023, 2024, 2025], missing=0.05),
+        'Subcategory': pick([f'SUB {i}' for i in range(8)]),
+        'Color': pick([f'COLOR {i}' for i in range(120)], missing=0.1),
+        'Brand': pick([f'BRAND {i}' for i in range(15)]),
+        'Heel_Type_1': pick(['FLAT', 'BLOCK', 'STILETTO'], missing=0.3),
+        'MONTH_NAME': pd.Categorical(np.array(MONTH_NAMES, dtype=object)[months - 1]),
+    })
+    return df.sort_values(['YEAR', 'MONTH'], kind='stable', ignore_index=True)
+
+
+def selection_mask(df, year, month):
+    mask = np.ones(len(df), dtype=bool)
+    if year != 'All':
+        mask &= (df['YEAR'] == year).to_numpy()
+    if month != 'All':
+        mask &= (df['MONTH'] == month).to_numpy()
+    return mask
+
+
+def groupby_table(rows, dimension):
+    """The table the dashboard built with a groupby per dimension"""
+    table = rows.groupby(dimension, observed=True).agg({'SALES_QTY': 'sum', 'OPENING_STOCK': 'sum'})
+    return table.sort_index()
+
+
+@pytest.fixture(scope='module')
+def df():
+    return make_frame()
+
+
+@pytest.fixture(scope='module')
+def cube(df):
+    return build_sales_cube(df)
+
+
+@pytest.mark.parametrize('year, month', SELECTIONS)
+def test_record_count(df, cube, year, month):
+    assert selected_rows(cube, select_periods(cube, year, month)) == selection_mask(df, year, month).sum()
+
+
+@pytest.mark.parametrize('year, month', SELECTIONS)
+def test_monthly_totals(df, cube, year, month):
+    rows = df[selection_mask(df, year, month)]
+    expected = rows.groupby(['YEAR', 'MONTH'], observed=True).agg(
+        {'SALES_QTY': 'sum', 'OPENING_STOCK': 'sum', 'MONTH_NAME': 'first'}).reset_index()
+    table = monthly_table(cube, select_periods(cube, year, month))
+
+    np.testing.assert_array_equal(table['YEAR'], expected['YEAR'])
+    np.testing.assert_array_equal(table['MONTH'], expected['MONTH'])
+    np.testing.assert_array_equal(table['MONTH_NAME'].astype(str), expected['MONTH_NAME'].astype(str))
+    np.testing.assert_allclose(table['SALES_QTY'], expected['SALES_QTY'])
+    np.testing.assert_allclose(table['OPENING_STOCK'], expected['OPENING_STOCK'])
+
+
+@pytest.mark.parametrize('year, month', SELECTIONS)
+@pytest.mark.parametrize('dimension', CUBE_DIMENSIONS)
+def test_dimension_table(df, cube, dimension, year, month):
+    rows = df[selection_mask(df, year, month)]
+    expected = groupby_table(rows, dimension)
+    table = dimension_table(cube, dimension, 'Label', select_periods(cube, year, month))
+
+    # Largest sellers first
+    assert (np.diff(table['SALES_QTY'].to_numpy()) <= 0).all()
+    table = table.set_index('Label').sort_index()
+    np.testing.assert_array_equal(table.index.astype(str), expected.index.astype(str))
+    np.testing.assert_allclose(table['SALES_QTY'], expected['SALES_QTY'])
+    np.testing.assert_allclose(table['OPENING_STOCK'], expected['OPENING_STOCK'])
+
+
+# Sidebar dimension filters: values of one dimension are ORed, dimensions are ANDed
+FILTERS = [
+    {'Brand': ['BRAND 3']},
+    {'Season': [2024, 2025]},
+    {'Maketplace': ['MYNTRA', 'AJIO'], 'Color': [f'COLOR {i}' for i in range(0, 120, 7)]},
+    {'Maketplace': ['NYKAA'], 'Season': [2023], 'Heel_Type_1': ['FLAT', 'BLOCK'], 'Subcategory': ['SUB 1', 'SUB 2']},
+    # Values the upload does not have match nothing
+    {'Brand': ['NO SUCH BRAND']},
+    {'Brand': ['BRAND 1', 'NO SUCH BRAND']},
+]
+
+
+@pytest.fixture(scope='module')
+def filter_index(cube):
+    return build_bitmap_index(cube['combinations'], CUBE_DIMENSIONS)
+
+
+def filter_mask(df, filters):
+    mask = np.ones(len(df), dtype=bool)
+    for col, values in filters.items():
+        mask &= df[col].isin(values).to_numpy()
+    return mask
+
+
+@pytest.mark.parametrize('year, month', SELECTIONS)
+@pytest.mark.parametrize('filters', FILTERS, ids=range(len(FILTERS)))
+def test_filtered_cube(df, cube, filter_index, filters, year, month):
+    rows = df[filter_mask(df, filters) & selection_mask(df, year, month)]
+    filtered = filter_cube(cube, matching_rows(filter_index, filters))
+    periods = select_periods(filtered, year, month)
+
+    assert selected_rows(filtered, periods) == len(rows)
+    monthly = monthly_table(filtered, periods)
+    assert monthly['SALES_QTY'].sum() == rows['SALES_QTY'].sum()
+    for dimension in CUBE_DIMENSIONS:
+        expected = groupby_table(rows, dimension)
+        table = dimension_table(filtered, dimension, 'Label', periods).set_index('Label').sort_index()
+        np.testing.assert_array_equal(table.index.astype(str), expected.index.astype(str))
+        np.testing.assert_allclose(table['SALES_QTY'], expected['SALES_QTY'])
+        np.testing.assert_allclose(table['OPENING_STOCK'], expected['OPENING_STOCK'])
+
+
+def test_matching_rows_against_masks(cube, filter_index):
+    combinations = cube['combinations']
+    assert len(matching_rows(filter_index, {})) == len(combinations)
+    for filters in FILTERS:
+        np.testing.assert_array_equal(matching_rows(filter_index, filters),
+                                      np.flatnonzero(filter_mask(combinations, filters)))
@@ -0,0 +1,96 @@
+"""Smoke tests of the dashboard page: the landing page and single / multi-file uploads render without errors."""
+import os
+import re
+
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+import dataset_store
+import disk_cache
+import ingest_jobs
+from bench import make_sales_columns, write_sales_workbook
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+
+pytestmark = pytest.mark.filterwarnings('ignore:Workbook contains no default style')
+
+
+def run_app(app_path, upload_paths):
+    """The dashboard, with the file uploader returning the files at upload_paths"""
+    import os
+
+    import streamlit as st
+    from streamlit.proto.Common_pb2 import FileURLs
+    from streamlit.runtime.uploaded_file_manager import UploadedFile, UploadedFileRec
+
+    def file_uploader(*args, **kwargs):
+        files = []
+        for path in upload_paths:
+            with open(path, 'rb') as f:
+                record = UploadedFileRec(path, os.path.basename(path), 'application/octet-stream', f.read())
+            files.append(UploadedFile(record, FileURLs()))
+        return files
+
+    st.file_uploader = file_uploader
+    with open(app_path) as f:
+        exec(compile(f.read(), app_path, 'exec'), {'__name__': '__main__'})
+
+
+@pytest.fixture(autouse=True)
+def empty_caches(tmp_path, monkeypatch):
+    """Uploads parsed in the script thread, into an empty disk cache and dataset store"""
+    monkeypatch.setattr(ingest_jobs, 'INGEST_WORKERS', 0)
+    monkeypatch.setattr(disk_cache, 'CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(dataset_store, 'STORE_DIR', str(tmp_path / 'cache' / 'store'))
+    st.cache_resource.clear()
+    yield
+    st.cache_resource.clear()
+
+
+@pytest.fixture(scope='module')
+def workbooks(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('uploads')
+    paths = []
+    for seed in range(2):
+        path = directory / f'sales{seed}.xlsx'
+        write_sales_workbook(path, make_sales_columns(2000, seed=seed, styles=200, duplicate_ratio=0.1))
+        paths.append(str(path))
+    return paths
+
+
+def loaded_records(at):
+    """Record count of the success message and of the sidebar filter summary"""
+    assert not at.exception
+    assert not at.error
+    [success] = at.success
+    [summary] = at.sidebar.info
+    loaded = int(re.search(r'([\d,]+) records processed', success.value).group(1).replace(',', ''))
+    selected = int(re.search(r'Records: ([\d,]+)', summary.value).group(1).replace(',', ''))
+    return loaded, selected, success.value
+
+
+def test_landing_page():
+    at = AppTest.from_file(APP_PATH, default_timeout=60).run()
+    assert not at.exception
+    assert not at.success
+
+
+def test_single_upload(workbooks):
+    at = AppTest.from_function(run_app, args=(APP_PATH, workbooks[:1]), default_timeout=120).run()
+    loaded, selected, message = loaded_records(at)
+    assert loaded == selected > 0
+    assert 'files' not in message
+    assert at.sidebar.selectbox[0].label == 'Select Year'
+
+
+def test_multi_file_upload(workbooks):
+    at = AppTest.from_function(run_app, args=(APP_PATH, workbooks), default_timeout=120).run()
+    loaded, selected, message = loaded_records(at)
+    assert loaded == selected > 0
+    assert 'from 2 files' in message
+
+    # Selecting a year narrows the records down to that year's
+    at.sidebar.selectbox[0].select_index(1).run()
+    _, in_year, _ = loaded_records(at)
+    assert 0 < in_year < loaded
@@ -0,0 +1,110 @@
+"""Duplicate collapsing must give what the original groupby gave, however the sheet is chunked."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import dedup
+import ingestion
+from bench import make_sales_columns, write_sales_workbook
+from dedup import collapse_duplicates
+from loader import load_sales
+
+KEYS = ['YEAR', 'MONTH', 'STYLE_ID', 'Maketplace']
+
+# bench.py writes workbooks without a default cell style, which openpyxl warns about
+pytestmark = pytest.mark.filterwarnings('ignore:Workbook contains no default style')
+
+
+def groupby_baseline(df, keys, sum_cols):
+    """The groupby the dashboard used to collapse duplicates with"""
+    agg = {col: 'sum' if col in sum_cols else 'first' for col in df.columns if col not in keys}
+    return df.groupby(keys, as_index=False, observed=True, sort=True).agg(agg)[list(df.columns)]
+
+
+def make_frame(rows, seed=0, styles=50, categorical=False):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'STYLE_ID': np.array([f'ST-{i:03d}' for i in range(styles)], dtype=object)[rng.integers(0, styles, rows)],
+        'YEAR': rng.integers(2023, 2025, rows),
+        'MONTH': rng.integers(1, 4, rows),
+        'SALES_QTY': rng.integers(0, 20, rows).astype(np.float64),
+        'OPENING_STOCK': rng.integers(0, 100, rows).astype(np.float64),
+        'Maketplace': np.array(['MYNTRA', 'AJIO', 'NYKAA'], dtype=object)[rng.integers(0, 3, rows)],
+        'Color': np.array(['RED', 'BLUE', None], dtype=object)[rng.integers(0, 3, rows)],
+    })
+    # Missing quantities are skipped by the sum, missing keys drop the row
+    df.loc[rng.random(rows) < 0.05, 'SALES_QTY'] = np.nan
+    df.loc[rng.random(rows) < 0.02, 'Maketplace'] = None
+    if categorical:
+        for col in ('STYLE_ID', 'Maketplace', 'Color'):
+            df[col] = df[col].astype('category')
+    return df
+
+
+@pytest.mark.parametrize('categorical', [False, True], ids=['object', 'category'])
+@pytest.mark.parametrize('styles', [5, 50, 5000])
+def test_collapse_matches_groupby(categorical, styles):
+    df = make_frame(3000, styles=styles, categorical=categorical)
+    collapsed, stats = collapse_duplicates(df, KEYS, ['SALES_QTY'])
+    expected = groupby_baseline(df, KEYS, ['SALES_QTY'])
+    pd.testing.assert_frame_equal(collapsed, expected)
+    assert stats['rows_in'] == len(df)
+    assert stats['missing_key_rows'] == df[KEYS].isna().any(axis=1).sum()
+    assert stats['duplicates_collapsed'] == len(df) - stats['missing_key_rows'] - len(expected)
+
+
+def test_collapse_without_duplicates_keeps_rows():
+    df = make_frame(200).drop_duplicates(KEYS).dropna(subset=KEYS)
+    collapsed, stats = collapse_duplicates(df, KEYS, ['SALES_QTY'])
+    assert stats['duplicates_collapsed'] == 0
+    pd.testing.assert_frame_equal(collapsed, groupby_baseline(df, KEYS, ['SALES_QTY']))
+
+
+def test_collapse_with_redensified_key(monkeypatch):
+    # A tiny limit forces the composite key to be re-ranked between key columns
+    monkeypatch.setattr(dedup, '_KEY_LIMIT', 64)
+    df = make_frame(2000, styles=500)
+    collapsed, _ = collapse_duplicates(df, KEYS, ['SALES_QTY', 'OPENING_STOCK'])
+    pd.testing.assert_frame_equal(collapsed, groupby_baseline(df, KEYS, ['SALES_QTY', 'OPENING_STOCK']))
+
+
+@pytest.fixture(scope='module')
+def workbook(tmp_path_factory):
+    path = tmp_path_factory.mktemp('dedup') / 'sales.xlsx'
+    write_sales_workbook(path, make_sales_columns(3000, styles=300, duplicate_ratio=0.2))
+    return path
+
+
+@pytest.mark.parametrize('chunk_rows', [70, 700, 1000])
+def test_chunked_load_matches_single_pass(workbook, monkeypatch, chunk_rows):
+    monkeypatch.setattr(ingestion, 'CHUNK_ROWS', 0)
+    whole = load_sales(workbook)
+    monkeypatch.setattr(ingestion, 'CHUNK_ROWS', chunk_rows)
+    chunked = load_sales(workbook)
+    pd.testing.assert_frame_equal(chunked, whole)
+    assert chunked.attrs['dedup'] == whole.attrs['dedup']
+
+
+def test_load_matches_read_excel_groupby(workbook, monkeypatch):
+    monkeypatch.setattr(ingestion, 'CHUNK_ROWS', 700)
+    df = load_sales(workbook)
+
+    # The original pipeline: read_excel, trim and upper-case the keys, groupby
+    raw = pd.read_excel(workbook, sheet_name='Sales')
+    baseline = pd.DataFrame({
+        'STYLE_ID': raw['Style_ID'].astype(str).str.strip().str.upper(),
+        'YEAR': raw['YEAR'],
+        'MONTH': raw['MONTH'],
+        'Maketplace': raw['Maketplace'].astype(str).str.strip().str.upper(),
+        'SALES_QTY': raw['Qty'],
+        'OPENING_STOCK': raw['Opening_stock'],
+    }).groupby(['STYLE_ID', 'YEAR', 'MONTH', 'Maketplace'], as_index=False).agg(
+        {'SALES_QTY': 'sum', 'OPENING_STOCK': 'first'})
+
+    assert len(df) == len(baseline)
+    assert df['SALES_QTY'].sum() == baseline['SALES_QTY'].sum()
+    merged = df.astype({'STYLE_ID': str, 'Maketplace': str}).merge(
+        baseline, on=['STYLE_ID', 'YEAR', 'MONTH', 'Maketplace'], suffixes=('', '_baseline'))
+    assert len(merged) == len(baseline)
+    np.testing.assert_array_equal(merged['SALES_QTY'], merged['SALES_QTY_baseline'])
+    np.testing.assert_array_equal(merged['OPENING_STOCK'], merged['OPENING_STOCK_baseline'])
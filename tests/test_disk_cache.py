@@ -0,0 +1,65 @@
+"""The disk cache and the dataset store share one size budget."""
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import dataset_store
+import disk_cache
+from dataset_store import append_upload, has_upload, read_uploads
+from disk_cache import evict, has_frame, store_frame
+
+
+def make_upload(seed, rows=2000):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'YEAR': np.repeat([2024, 2025], rows // 2),
+        'MONTH': np.tile([1, 2], rows // 2),
+        'STYLE_ID': [f'ST-{i}' for i in rng.integers(0, 10 ** 6, rows)],
+        'SALES_QTY': rng.random(rows),
+    }).sort_values(['YEAR', 'MONTH'], ignore_index=True)
+
+
+def disk_usage(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """An empty cache, with the dataset store in it as by default"""
+    monkeypatch.setattr(disk_cache, 'CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(dataset_store, 'STORE_DIR', str(tmp_path / 'store'))
+    return tmp_path
+
+
+def test_store_counts_against_the_budget(cache_dir):
+    for seed, key in enumerate(['old', 'new']):
+        append_upload(key, make_upload(seed))
+        time.sleep(0.01)
+    store_frame('cached', make_upload(2))
+    budget = disk_usage(cache_dir) - 1
+    read_uploads(['old'])
+
+    evict(max_bytes=budget)
+
+    # 'new' was used least recently (reading 'old' marked it as used); it goes as a whole
+    assert not has_upload('new')
+    assert not any('new.parquet' in names for _, _, names in os.walk(cache_dir))
+    assert has_upload('old')
+    assert has_frame('cached')
+    assert disk_usage(cache_dir) <= budget
+
+
+def test_other_versions_are_pruned(cache_dir, monkeypatch):
+    for version in (1, 2):
+        monkeypatch.setattr(disk_cache, 'CACHE_VERSION', version)
+        monkeypatch.setattr(dataset_store, 'CACHE_VERSION', version)
+        store_frame(f'upload{version}', make_upload(version))
+        append_upload(f'upload{version}', make_upload(version))
+
+    evict()
+
+    assert sorted(os.listdir(cache_dir)) == ['store', 'upload2-v2.parquet']
+    assert os.listdir(cache_dir / 'store') == ['v2']
@@ -0,0 +1,96 @@
+"""Uploads parsed by the ingestion workers end up in the disk cache, and failures are reported."""
+import io
+import os
+import signal
+import sys
+import time
+import types
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+import pytest
+
+import disk_cache
+import ingest_jobs
+from bench import make_sales_columns, write_sales_workbook
+from disk_cache import load_frame
+from ingest_jobs import job_status, submit_upload
+from loader import load_sales
+
+pytestmark = pytest.mark.filterwarnings('ignore:Workbook contains no default style')
+
+
+def upload(path, name=None):
+    """An uploaded file as the page hands it to submit_upload()"""
+    with open(path, 'rb') as f:
+        uploaded_file = io.BytesIO(f.read())
+    uploaded_file.name = name or os.path.basename(path)
+    return uploaded_file
+
+
+def wait_for(upload_key, timeout=120):
+    deadline = time.time() + timeout
+    while (status := job_status(upload_key))['state'] in ('queued', 'running'):
+        assert time.time() < deadline, status
+        time.sleep(0.1)
+    return status
+
+
+@pytest.fixture(scope='module')
+def cache_dir(tmp_path_factory):
+    """One disk cache for the module, set before the fork server starts, so that the workers store into it"""
+    path = str(tmp_path_factory.mktemp('cache'))
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv('SALES_CACHE_DIR', path)
+        patch.setattr(disk_cache, 'CACHE_DIR', path)
+        patch.setattr(ingest_jobs, 'INGEST_WORKERS', 1)
+        # Workers import the main module as they start: not the AppTest script a test before may have left there
+        patch.setitem(sys.modules, '__main__', types.ModuleType('__main__'))
+        yield path
+        if ingest_jobs._pool is not None:
+            ingest_jobs._pool.shutdown(cancel_futures=True)
+            ingest_jobs._pool = None
+
+
+@pytest.fixture(scope='module')
+def workbook(tmp_path_factory):
+    path = tmp_path_factory.mktemp('uploads') / 'sales.xlsx'
+    write_sales_workbook(path, make_sales_columns(3000, seed=0, styles=300, duplicate_ratio=0.1))
+    return str(path)
+
+
+def test_worker_stores_the_frame(cache_dir, workbook):
+    status = submit_upload('parsed', upload(workbook))
+    assert status['state'] in ('queued', 'running')
+
+    assert wait_for('parsed') == {'state': 'done', 'rows_read': None, 'total_rows': None, 'error': None}
+    pd.testing.assert_frame_equal(load_frame('parsed'), load_sales(workbook))
+    assert ingest_jobs.take_frame('parsed') is None
+
+
+def test_worker_reports_failures(cache_dir, tmp_path):
+    path = tmp_path / 'broken.xlsx'
+    path.write_bytes(b'not a workbook')
+    submit_upload('broken', upload(path))
+
+    status = wait_for('broken')
+    assert status['state'] == 'failed'
+    assert status['error'] is not None
+    assert load_frame('broken') is None
+
+
+def test_dead_worker_replaces_the_pool(cache_dir, workbook):
+    submit_upload('killed', upload(workbook))
+    pool = ingest_jobs._pool
+    for process in list(pool._processes.values()):
+        os.kill(process.pid, signal.SIGKILL)
+
+    status = wait_for('killed')
+    assert status['state'] == 'failed'
+    assert isinstance(status['error'], BrokenProcessPool)
+    # The broken pool is shut down, and the next upload goes to a new one
+    assert pool._processes is None
+    submit_upload('after', upload(workbook, name='again.xlsx'))
+    assert ingest_jobs._pool is not pool
+    assert wait_for('after')['state'] == 'done'
+    assert load_frame('after') is not None
@@ -0,0 +1,172 @@
+"""The stream engine must read a Sales sheet exactly as pd.read_excel does."""
+import datetime as dt
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import pytest
+
+import ingestion
+from ingestion import iter_sales_chunks, iter_sales_stream, read_sales_sheet, read_sales_stream, scan_sales_header
+
+# One column per case; rows repeat the pattern so that blocks of different kinds mix
+EDGE_COLUMNS = {
+    'Style_ID': [' st-1', 'ST-2 ', 'st-3', 'ST-4'],
+    'numbers_na': [1, 'n/a', 3, None],
+    'ints_na': [1, 2, 'NA', 4],
+    'floats_text': [1.5, 'x', 2, None],
+    'text_missing': ['a', None, 'b', 'NULL'],
+    'numeric_text': ['3', '4', '5', '6'],
+    'numeric_text_mixed': ['3', 4, 'x', None],
+    'bools': [True, False, True, False],
+    'bools_na': [True, None, False, 'N/A'],
+    'bool_text': ['True', 'false', 'TRUE', 'False'],
+    'bools_numbers': [1, True, 'x', False],
+    'bools_zero': ['TRUE', False, False, 0],
+    'dates': [dt.datetime(2024, 1, 1), dt.datetime(2024, 2, 1), dt.datetime(2024, 3, 1), dt.datetime(2024, 4, 1)],
+    'dates_na': [dt.datetime(2024, 1, 1), None, 'n/a', dt.datetime(2024, 2, 1)],
+    'dates_text': [dt.datetime(2024, 1, 1), 'x', None, dt.datetime(2024, 2, 1)],
+    'all_na': ['n/a', None, '#N/A', None],
+    'na_lookalikes': [' n/a', 'None', 'nan', 'null'],
+    'blank': [None, None, None, None],
+    'escaped': ['A&B', '<red>', 'x "y"', None],
+}
+
+
+def write_workbook(path, columns, rows, shared_strings=False):
+    """Write columns (repeated to rows rows) to the Sales sheet of an .xlsx.
+
+    openpyxl writes text as inline strings; with shared_strings the sheet is
+    rewritten to refer to a shared string table instead, as Excel saves it.
+    """
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'Sales'
+    ws.append(list(columns))
+    for r in range(rows):
+        ws.append([values[r % len(values)] for values in columns.values()])
+    wb.save(path)
+    if shared_strings:
+        _share_strings(path)
+    return path
+
+
+def _share_strings(path):
+    with zipfile.ZipFile(path) as archive:
+        parts = {name: archive.read(name) for name in archive.namelist()}
+
+    strings = {}
+
+    def shared(match):
+        code = strings.setdefault(match.group(2), len(strings))
+        return b'<c r="%s" t="s"><v>%d</v></c>' % (match.group(1), code)
+
+    sheet = 'xl/worksheets/sheet1.xml'
+    parts[sheet] = re.sub(rb'<c r="(\w+)" t="inlineStr"><is><t[^>]*>(.*?)</t></is></c>', shared, parts[sheet])
+    items = b''.join(b'<si><t xml:space="preserve">%s</t></si>' % text for text in strings)
+    parts['xl/sharedStrings.xml'] = (
+        b'<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" count="%d" uniqueCount="%d">%s</sst>'
+        % (len(strings), len(strings), items))
+    parts['xl/_rels/workbook.xml.rels'] = parts['xl/_rels/workbook.xml.rels'].replace(
+        b'</Relationships>',
+        b'<Relationship Id="rIdSst" Target="sharedStrings.xml" Type="http://schemas.openxmlformats.org/'
+        b'officeDocument/2006/relationships/sharedStrings"/></Relationships>')
+    parts['[Content_Types].xml'] = parts['[Content_Types].xml'].replace(
+        b'</Types>',
+        b'<Override PartName="/xl/sharedStrings.xml" ContentType="application/'
+        b'vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/></Types>')
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in parts.items():
+            archive.writestr(name, data)
+
+
+@pytest.fixture(params=['scan', 'tree'])
+def parser(request, monkeypatch):
+    """Run each test through the regex scanner and through the tree-parser fallback"""
+    # Small blocks, so that a sheet is decoded in many blocks of different cell kinds
+    monkeypatch.setattr(ingestion, 'BLOCK_BYTES', 2048)
+    if request.param == 'tree':
+        monkeypatch.setattr(ingestion, '_scan_block', lambda block, wanted, sheet: None)
+    return request.param
+
+
+@pytest.mark.parametrize('shared_strings', [False, True], ids=['inline', 'shared'])
+def test_stream_matches_read_excel(tmp_path, parser, shared_strings):
+    path = write_workbook(tmp_path / 'edge.xlsx', EDGE_COLUMNS, rows=200, shared_strings=shared_strings)
+    expected = pd.read_excel(path, sheet_name='Sales')
+    pd.testing.assert_frame_equal(read_sales_stream(path), expected)
+
+
+def test_numeric_column_with_na_text_stays_numeric(tmp_path, parser):
+    columns = {'Style_ID': ['A', 'B', 'C'], 'Closing_stock': [3, 'n/a', None]}
+    path = write_workbook(tmp_path / 'closing.xlsx', columns, rows=3)
+    df = read_sales_stream(path)
+    assert df['Closing_stock'].dtype == np.float64
+    assert df['Closing_stock'].isna().tolist() == [False, True, True]
+
+
+def test_missing_text_is_nan(tmp_path, parser):
+    path = write_workbook(tmp_path / 'missing.xlsx', {'Style_ID': ['A', 'B'], 'Color': ['Red', None]}, rows=2)
+    assert read_sales_stream(path)['Color'].tolist()[1] is np.nan
+
+
+def test_usecols_and_blank_rows(tmp_path, parser):
+    path = write_workbook(tmp_path / 'blank_rows.xlsx', EDGE_COLUMNS, rows=40)
+    wb = openpyxl.load_workbook(path)
+    ws = wb['Sales']
+    ws.insert_rows(10, amount=3)
+    # A row holding a value only in a column that is not read
+    ws.cell(row=11, column=list(EDGE_COLUMNS).index('escaped') + 1, value='only here')
+    # Formatted but empty cells after the last row are not data
+    ws.cell(row=60, column=1).number_format = '0.00'
+    wb.save(path)
+    usecols = ['Style_ID', 'numbers_na', 'text_missing']
+    expected = pd.read_excel(path, sheet_name='Sales', usecols=usecols)
+    pd.testing.assert_frame_equal(read_sales_stream(path, usecols=usecols), expected)
+
+
+def test_chunks_add_up_to_the_sheet(tmp_path, parser):
+    columns = {'Style_ID': [f'ST-{i}' for i in range(7)], 'Qty': [1, 2, 'n/a', 4, 5, None, 7]}
+    path = write_workbook(tmp_path / 'chunks.xlsx', columns, rows=500)
+    chunks = list(iter_sales_stream(path, chunk_rows=60))
+    assert len(chunks) > 1
+    expected = pd.read_excel(path, sheet_name='Sales')
+    combined = pd.concat(chunks, ignore_index=True)
+    pd.testing.assert_series_equal(combined['Style_ID'], expected['Style_ID'])
+    np.testing.assert_array_equal(combined['Qty'].astype(np.float64), expected['Qty'])
+
+
+def test_escaped_text_in_shared_strings(tmp_path, parser):
+    columns = {'Style_ID': ['A&B', '<x>', escape('"q"')]}
+    path = write_workbook(tmp_path / 'escaped.xlsx', columns, rows=3, shared_strings=True)
+    pd.testing.assert_frame_equal(read_sales_stream(path), pd.read_excel(path, sheet_name='Sales'))
+
+
+def test_openpyxl_internals_are_available(tmp_path):
+    # The stream engine reads past openpyxl's public API; a release that changes it must fail here
+    ingestion.stream_engine_supported.cache_clear()
+    assert ingestion.stream_engine_supported()
+    path = write_workbook(tmp_path / 'styles.xlsx', {'Style_ID': ['A', 'B'], 'dates': [dt.datetime(2024, 1, 1)] * 2},
+                          rows=2, shared_strings=True)
+    book, src = ingestion._open_sheet(str(path), 'Sales')
+    try:
+        src.close()
+        assert book['shared_strings'][:3] == ['Style_ID', 'dates', 'A']
+        assert book['date_styles']
+        assert book['epoch'] == dt.datetime(1899, 12, 30)
+        assert book['strings_path'] == 'xl/sharedStrings.xml'
+    finally:
+        book['archive'].close()
+
+
+def test_without_openpyxl_internals_falls_back_to_read_excel(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingestion, 'stream_engine_supported', lambda: False)
+    monkeypatch.setattr(ingestion, '_open_sheet', None)
+    path = write_workbook(tmp_path / 'fallback.xlsx', EDGE_COLUMNS, rows=20, shared_strings=True)
+    expected = pd.read_excel(path, sheet_name='Sales')
+    assert scan_sales_header(path) == list(expected.columns)
+    pd.testing.assert_frame_equal(read_sales_sheet(path), expected)
+    pd.testing.assert_frame_equal(pd.concat(iter_sales_chunks(path, chunk_rows=5)), expected)
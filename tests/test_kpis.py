@@ -0,0 +1,83 @@
+"""Stock KPIs must match the pandas groupby computation they replace."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from dedup import composite_key
+from kpis import add_stock_kpis, grouped_cumsum, sell_through, stock_cover
+from style_index import build_style_index, style_history
+
+
+def test_stock_cover_counts_calendar_months():
+    # Style A sells in January and April only; style B in January, February and March
+    df = pd.DataFrame({
+        'STYLE_ID': ['A', 'B', 'B', 'B', 'A'],
+        'YEAR': [2024] * 5,
+        'MONTH': [1, 1, 2, 3, 4],
+        'SALES_QTY': [10.0, 3.0, 3.0, 3.0, 10.0],
+        'OPENING_STOCK': [100.0, 30.0, 27.0, 24.0, 90.0],
+        'Closing_stock': [90.0, 27.0, 24.0, 21.0, 80.0],
+    })
+    add_stock_kpis(df, ['STYLE_ID'], closing_col='Closing_stock')
+
+    # A: 20 sold over four months is 5 a month, so 80 on hand lasts 16 months
+    np.testing.assert_allclose(df['STOCK_COVER_MONTHS'], [9.0, 9.0, 8.0, 7.0, 16.0])
+    history = style_history(df, build_style_index(df), 'A')
+    np.testing.assert_allclose(history['STOCK_COVER_MONTHS'], [9.0, 16.0])
+
+
+def make_frame(rows, seed=0, categorical=False):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'STYLE_ID': np.array([f'ST-{i:03d}' for i in range(60)], dtype=object)[rng.integers(0, 60, rows)],
+        'Maketplace': np.array(['MYNTRA', 'AJIO', 'NYKAA'], dtype=object)[rng.integers(0, 3, rows)],
+        'YEAR': rng.integers(2023, 2025, rows),
+        'MONTH': rng.integers(1, 13, rows),
+        'SALES_QTY': rng.integers(0, 20, rows).astype(np.float64),
+        'OPENING_STOCK': rng.integers(0, 100, rows).astype(np.float64),
+    })
+    df['Closing_stock'] = df['OPENING_STOCK'] - df['SALES_QTY'] + rng.integers(-1, 2, rows) * (rng.random(rows) < 0.1)
+    df.loc[rng.random(rows) < 0.1, 'Closing_stock'] = np.nan
+    if categorical:
+        df = df.astype({'STYLE_ID': 'category', 'Maketplace': 'category'})
+    # Period order, as the loader returns rows (several rows of a series may share a period)
+    return df.sort_values(['YEAR', 'MONTH'], kind='stable', ignore_index=True)
+
+
+@pytest.mark.parametrize('rows', [0, 1, 3000])
+def test_grouped_cumsum_matches_groupby(rows):
+    df = make_frame(rows)
+    keys = ['STYLE_ID', 'Maketplace']
+    key, _, span = composite_key(df, keys)
+    cum, first = grouped_cumsum(df['SALES_QTY'].to_numpy(), key, span)
+
+    groups = df.groupby(keys, sort=False)
+    np.testing.assert_allclose(cum, groups['SALES_QTY'].cumsum())
+    np.testing.assert_array_equal(first, groups['SALES_QTY'].transform(lambda g: g.index[0]))
+
+
+@pytest.mark.parametrize('categorical', [False, True], ids=['object', 'category'])
+def test_add_stock_kpis_matches_groupby(categorical):
+    df = make_frame(3000, categorical=categorical)
+    keys = ['STYLE_ID', 'Maketplace']
+    stats = add_stock_kpis(df, keys, closing_col='Closing_stock')
+
+    # The pandas computation: groupby cumsum, and months from each series' first period
+    expected = df['OPENING_STOCK'] - df['SALES_QTY']
+    closing = df['Closing_stock'].fillna(expected)
+    period = df['YEAR'] * 12 + df['MONTH']
+    groups = df.groupby(keys, observed=True)
+    cum_sales = groups['SALES_QTY'].cumsum()
+    months = period - period.groupby([df[key] for key in keys], observed=True).transform('first') + 1
+
+    np.testing.assert_allclose(df['EXPECTED_CLOSING_STOCK'], expected)
+    np.testing.assert_allclose(df['CLOSING_STOCK_VARIANCE'], df['Closing_stock'] - expected)
+    np.testing.assert_allclose(df['CLOSING_STOCK'], closing)
+    np.testing.assert_allclose(df['CUM_SALES_QTY'], cum_sales)
+    np.testing.assert_allclose(df['CUM_SELL_THROUGH'], sell_through(cum_sales, closing))
+    np.testing.assert_allclose(df['STOCK_COVER_MONTHS'], stock_cover(closing, cum_sales, months))
+    reported = df['Closing_stock'].notna()
+    assert stats == {
+        'closing_reported_rows': reported.sum(),
+        'closing_mismatch_rows': (df['Closing_stock'] - expected)[reported].abs().gt(1e-6).sum(),
+    }
@@ -0,0 +1,42 @@
+"""Every page of a table must hold the rows a stable sort of the whole table puts there."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from paging import page_count, table_page
+
+
+def make_table(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    labels = np.array([f'LABEL {i:03d}' for i in range(rows)], dtype=object)
+    rng.shuffle(labels)
+    table = pd.DataFrame({
+        'Label': labels,
+        # Few distinct values: many ties
+        'Sales Qty': rng.integers(0, 5, rows).astype(np.int64),
+        'Sales %': rng.integers(0, 4, rows) * 12.5,
+        'Color': pd.Categorical(np.array(['RED', 'BLUE', 'GREEN'], dtype=object)[rng.integers(0, 3, rows)]),
+        'Row': np.arange(rows),
+    })
+    table.loc[rng.random(rows) < 0.1, 'Sales %'] = np.nan
+    table.loc[rng.random(rows) < 0.1, 'Color'] = np.nan
+    table.loc[rng.random(rows) < 0.1, 'Label'] = None
+    return table
+
+
+@pytest.mark.parametrize('rows', [0, 1, 49, 50, 51, 237])
+@pytest.mark.parametrize('page_size', [7, 50])
+@pytest.mark.parametrize('sort_col', ['Label', 'Sales Qty', 'Sales %', 'Color'])
+@pytest.mark.parametrize('ascending', [True, False], ids=['ascending', 'descending'])
+def test_pages_match_stable_sort(rows, page_size, sort_col, ascending):
+    table = make_table(rows)
+    expected = table.sort_values(sort_col, ascending=ascending, kind='stable', na_position='last',
+                                 ignore_index=True)
+    pages = page_count(len(table), page_size)
+    assert pages == max(1, -(-rows // page_size))
+
+    for page in range(1, pages + 1):
+        start = (page - 1) * page_size
+        pd.testing.assert_frame_equal(table_page(table, sort_col, ascending, page, page_size),
+                                      expected.iloc[start:start + page_size].reset_index(drop=True))
+    assert table_page(table, sort_col, ascending, pages + 1, page_size).empty
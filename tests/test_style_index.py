@@ -0,0 +1,45 @@
+"""The style index must hold exactly the styles that have rows, each with its rows in period order."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from loader import load_sales
+from style_index import build_style_index, search_styles, style_history, style_rows
+
+
+@pytest.mark.parametrize('categorical', [False, True], ids=['object', 'category'])
+def test_rows_per_style(categorical):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'STYLE_ID': np.array(['B2', 'A1', 'C3', 'A10', None], dtype=object)[rng.integers(0, 5, 500)],
+        'YEAR': np.repeat([2023, 2024], 250),
+        'MONTH': np.tile(np.repeat([1, 2, 3, 4, 5], 50), 2),
+    })
+    if categorical:
+        df['STYLE_ID'] = df['STYLE_ID'].astype(pd.CategoricalDtype(['A1', 'A10', 'B2', 'C3', 'UNUSED']))
+    index = build_style_index(df)
+
+    assert search_styles(index, '') == (['A1', 'A10', 'B2', 'C3'], 4)
+    assert search_styles(index, 'a1') == (['A1', 'A10'], 2)
+    for style, rows in df.groupby('STYLE_ID', observed=True).indices.items():
+        np.testing.assert_array_equal(style_rows(index, style), rows)
+    assert len(style_rows(index, 'UNUSED')) == 0
+
+
+def test_styles_without_rows_are_not_offered(tmp_path):
+    # ORPHAN's only row has no Year: the loader drops it, but the category remains
+    path = tmp_path / 'orphan.xlsx'
+    pd.DataFrame({
+        'Style_ID': ['A1', 'A2', 'ORPHAN', 'A1'],
+        'YEAR': [2024, 2024, 'n/a', 2024],
+        'MONTH': [1, 1, 1, 2],
+        'Qty': [1, 2, 3, 4],
+        'Opening_stock': [10, 10, 10, 10],
+    }).to_excel(path, sheet_name='Sales', index=False)
+    df = load_sales(path)
+    index = build_style_index(df)
+
+    styles, total = search_styles(index, '')
+    assert styles == ['A1', 'A2'] and total == 2
+    for style in styles:
+        assert not style_history(df, index, style).empty
@@ -0,0 +1,70 @@
+"""Uploads are parsed once and served from disk after; several are merged through the dataset store."""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import dataset_store
+import disk_cache
+from bench import make_sales_columns, write_sales_workbook
+from dataset_store import has_upload
+from disk_cache import has_frame
+from loader import load_sales
+from uploads import NoRowsError, load_upload, merge_uploads
+
+pytestmark = pytest.mark.filterwarnings('ignore:Workbook contains no default style')
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """An empty disk cache, with the dataset store in it as by default"""
+    monkeypatch.setattr(disk_cache, 'CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(dataset_store, 'STORE_DIR', str(tmp_path / 'cache' / 'store'))
+
+
+def workbook(directory, seed, **columns):
+    path = directory / f'sales{seed}.xlsx'
+    write_sales_workbook(path, {**make_sales_columns(1000, seed=seed, styles=100, duplicate_ratio=0.1), **columns})
+    return str(path)
+
+
+def test_parsed_once(tmp_path):
+    path = workbook(tmp_path, 0)
+    calls = []
+    df = load_upload('upload', path, progress=lambda rows_read, total_rows: calls.append((rows_read, total_rows)))
+
+    assert calls[0] == (0, None)
+    assert calls[-1][0] > 0
+    assert has_frame('upload')
+    pd.testing.assert_frame_equal(df, load_sales(path))
+    # From the disk cache: the file itself is not read again
+    os.remove(path)
+    pd.testing.assert_frame_equal(load_upload('upload', path), df)
+
+
+def test_merged_through_the_store(tmp_path):
+    paths = [workbook(tmp_path, seed) for seed in range(2)]
+    parsed = []
+
+    def load(upload_key, path):
+        parsed.append(upload_key)
+        return load_upload(upload_key, path)
+
+    df = merge_uploads(['first', 'second'], paths, load=load)
+    assert parsed == ['first', 'second']
+    assert has_upload('first') and has_upload('second')
+    assert not has_frame('first') and not has_frame('second')
+    # Records in both files are merged: no (period, style, marketplace) twice
+    assert not df.duplicated(['YEAR', 'MONTH', 'STYLE_ID', 'Maketplace']).any()
+    np.testing.assert_allclose(df['SALES_QTY'].sum(), sum(load_sales(path)['SALES_QTY'].sum() for path in paths))
+
+    # A second set with the same files parses none of them again
+    pd.testing.assert_frame_equal(merge_uploads(['first', 'second'], paths, load=load), df)
+    assert parsed == ['first', 'second']
+
+
+def test_no_rows(tmp_path):
+    path = workbook(tmp_path, 0, YEAR=np.full(1000, 'n/a', dtype=object))
+    with pytest.raises(NoRowsError):
+        merge_uploads(['empty'], [path])
@@ -0,0 +1,124 @@
+"""Uploads in, the frame the dashboard analyzes out.
+
+load_upload() serves one upload from the first place that has it: the disk
+cache, the dataset store (once the upload has been merged with others), an
+ingestion worker that could not store it, and only then load_sales() in the
+calling thread, whose frame goes to the disk cache for the next time.
+merge_uploads() unions several uploads through the dataset store and merges
+the records they share. Like the loader, neither uses Streamlit: app.py
+caches and reports on them, bench.py times them, both through callbacks.
+"""
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+
+from dataset_store import append_upload, has_upload, read_uploads
+from dedup import collapse_duplicates
+from disk_cache import discard_frame, evict, load_frame, store_frame
+from ingest_jobs import take_frame
+from kpis import add_stock_kpis
+from loader import TEXT_DIMENSIONS, load_sales
+from quality import merge_summaries
+
+
+class NoRowsError(ValueError):
+    """None of the uploads has a row with a readable Year and Month"""
+
+    def __str__(self):
+        return "None of the uploaded files has rows with a readable Year and Month"
+
+
+def load_upload(upload_key, uploaded_file, progress=None, stage=None):
+    """Processed frame of one upload (an uploaded file or a path), keyed by its content hash.
+
+    progress and stage are passed on to load_sales() when the upload has to
+    be parsed here; progress(0, None) comes first, before the sheet is opened.
+    """
+    stage = stage or (lambda name: nullcontext())
+
+    # A previously processed copy of this exact upload: the disk cache, or the
+    # dataset store once the upload has been merged with others
+    with stage("Read disk cache"):
+        df = load_frame(upload_key)
+        if df is None and has_upload(upload_key):
+            df = read_uploads([upload_key])
+            df.attrs = df.attrs['uploads'][0]['attrs']
+    if df is None:
+        # Parsed by an ingestion worker that could not store it on disk
+        df = take_frame(upload_key)
+    if df is not None:
+        return df
+
+    if progress is not None:
+        progress(0, None)
+    df = load_sales(uploaded_file, progress=progress, stage=stage)
+
+    # Persist for future uploads of the same workbook (survives restarts)
+    with stage("Write disk cache"):
+        store_frame(upload_key, df)
+    return df
+
+
+def merge_uploads(upload_keys, uploaded_files, load=load_upload, stage=None):
+    """Union of several uploads (e.g. one workbook per month).
+
+    Each upload is parsed (by load(upload_key, uploaded_file)) only the first
+    time the dataset store sees it and kept there as one Parquet partition
+    per Year/Month; every later set of uploads containing it reads those
+    partitions back instead. Raises NoRowsError when the union is empty.
+    """
+    stage = stage or (lambda name: nullcontext())
+
+    with stage("Parse new uploads"):
+        for upload_key, uploaded_file in zip(upload_keys, uploaded_files):
+            if not has_upload(upload_key):
+                append_upload(upload_key, load(upload_key, uploaded_file))
+            # The store copy replaces the disk cache entry: one copy of each upload on disk
+            discard_frame(upload_key)
+
+    with stage("Read dataset store"):
+        sales_union = read_uploads(upload_keys)
+    # Keep the store within the disk cache budget (the uploads just read are the last to go)
+    evict()
+    manifests = sales_union.attrs['uploads']
+    if sales_union.empty:
+        raise NoRowsError()
+
+    # The same records in two files are merged exactly as within one file. Rows of a file
+    # without a Maketplace column have none: they are keyed as a marketplace of their own
+    # (codes, with the missing value last) instead of as a missing key, which would drop them
+    duplicate_subset = ['YEAR', 'MONTH', 'STYLE_ID']
+    if 'Maketplace' in sales_union.columns:
+        sales_union['MARKETPLACE_KEY'], _ = pd.factorize(sales_union['Maketplace'], sort=True, use_na_sentinel=False)
+        duplicate_subset.append('MARKETPLACE_KEY')
+    with stage("Merge uploads"):
+        sales_union, union_stats = collapse_duplicates(sales_union, duplicate_subset, ['SALES_QTY'])
+
+    # A dimension that is text in one file and numbers in another comes back as plain objects
+    for col in TEXT_DIMENSIONS:
+        if col in sales_union.columns and sales_union[col].dtype == 'object':
+            sales_union[col] = sales_union[col].astype(str).str.strip().str.upper().astype('category')
+
+    # Merged rows have a new Sales Qty
+    sales_union['SALES_PERCENTAGE'] = np.where(
+        sales_union['OPENING_STOCK'] > 0,
+        (sales_union['SALES_QTY'] / sales_union['OPENING_STOCK']) * 100,
+        0
+    )
+
+    # Running KPIs continue from one file's months into the next
+    with stage("Stock KPIs"):
+        stock_stats = add_stock_kpis(sales_union, duplicate_subset[2:], closing_col='Closing_stock')
+    sales_union = sales_union.drop(columns=duplicate_subset[3:])
+
+    dedup_stats = {'rows_in': 0, 'missing_key_rows': 0, 'duplicates_collapsed': union_stats['duplicates_collapsed']}
+    for manifest in manifests:
+        for stat, value in manifest['attrs'].get('dedup', {}).items():
+            dedup_stats[stat] += value
+    sales_union.attrs = {
+        'dedup': dedup_stats,
+        'quality': merge_summaries([manifest['attrs'].get('quality', {}) for manifest in manifests]),
+        'stock': stock_stats,
+    }
+    return sales_union